@@ -0,0 +1,291 @@
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileFilter;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.io.StringReader;
+import java.io.StringWriter;
+import java.util.ArrayList;
+import java.util.List;
+
+import edu.stanford.nlp.trees.DiskTreebank;
+import edu.stanford.nlp.trees.Tree;
+import edu.stanford.nlp.trees.TreePrint;
+import edu.stanford.nlp.trees.TreeReader;
+import edu.stanford.nlp.trees.TreeVisitor;
+import edu.stanford.nlp.trees.tregex.TregexMatcher;
+import edu.stanford.nlp.trees.tregex.TregexParseException;
+import edu.stanford.nlp.trees.tregex.TregexPattern;
+
+/**
+ * Answers Tregex searches for corpkit from one long-lived JVM.
+ *
+ * A request is a line of tab-separated arguments, as they would be given to
+ * tregex.sh, then the trees to search when -filter is given, then a line
+ * holding END. The reply is what tregex.sh writes to standard output, a line
+ * holding STDERR, what it writes to standard error, and a line holding END.
+ *
+ * A request line starting with BATCH holds pairs of names and patterns
+ * instead. Each tree is then read once and searched with every pattern, and
+ * the reply has a line of name, tab and matched words for each match.
+ *
+ * Searches go through the Tregex API, rather than TregexPattern.main, which
+ * keeps its options in static fields and may exit the JVM.
+ *
+ * Rebuild with: javac -cp stanford-tregex.jar -source 1.6 -target 1.6 TregexServer.java
+ */
+public class TregexServer {
+
+    static final String END = "__CORPKIT_END__";
+    static final String STDERR = "__CORPKIT_STDERR__";
+    static final String BATCH = "__CORPKIT_BATCH__";
+
+    /** Searched by tregex.sh when given no trees */
+    static final String DEFAULT_TREE = "(VP (VP (VBZ Try) (NP (NP (DT this) (NN wine)) "
+        + "(CC and) (NP (DT these) (NNS snails)))) (PUNCT .))";
+
+    public static void main(String[] args) throws IOException {
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, "UTF-8"));
+        PrintStream reply = new PrintStream(new FileOutputStream(FileDescriptor.out), false, "UTF-8");
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] request = line.length() == 0 ? new String[0] : line.split("\t", -1);
+            StringBuilder trees = new StringBuilder();
+            String treeLine;
+            while ((treeLine = in.readLine()) != null && !treeLine.equals(END)) {
+                trees.append(treeLine).append('\n');
+            }
+
+            StringWriter out = new StringWriter();
+            StringWriter err = new StringWriter();
+            PrintWriter pout = new PrintWriter(out);
+            PrintWriter perr = new PrintWriter(err);
+            try {
+                if (request.length > 0 && request[0].equals(BATCH)) {
+                    batch(request, trees.toString(), pout);
+                } else {
+                    new Search(request, pout, perr).run(trees.toString());
+                }
+            } catch (Throwable e) {
+                perr.print("Exception in thread \"main\" ");
+                e.printStackTrace(perr);
+            }
+            pout.flush();
+            perr.flush();
+
+            write(reply, out.toString());
+            reply.println(STDERR);
+            write(reply, err.toString());
+            reply.println(END);
+            reply.flush();
+        }
+    }
+
+    /** Search each tree with every pattern, matching each node once, as with -o */
+    static void batch(String[] request, String trees, PrintWriter out) throws IOException {
+        List names = new ArrayList();
+        List patterns = new ArrayList();
+        for (int n = 1; n + 1 < request.length; n += 2) {
+            names.add(request[n]);
+            patterns.add(TregexPattern.compile(request[n + 1]));
+        }
+        TreePrint words = new TreePrint("words");
+        TreeReader reader = new TregexPattern.TRegexTreeReaderFactory()
+            .newTreeReader(new BufferedReader(new StringReader(trees)));
+        Tree tree;
+        while ((tree = reader.readTree()) != null) {
+            for (int n = 0; n < patterns.size(); n++) {
+                TregexMatcher matcher = ((TregexPattern) patterns.get(n)).matcher(tree);
+                Tree last = null;
+                while (matcher.find()) {
+                    if (matcher.getMatch() == last) {
+                        continue;
+                    }
+                    last = matcher.getMatch();
+                    StringWriter match = new StringWriter();
+                    words.printTree(last, new PrintWriter(match));
+                    out.println(names.get(n) + "\t" + match.toString().trim());
+                }
+            }
+        }
+        reader.close();
+    }
+
+    static void write(PrintStream stream, String text) {
+        stream.print(text);
+        if (text.length() > 0 && !text.endsWith("\n")) {
+            stream.println();
+        }
+    }
+
+    /** One search, printing what tregex.sh would for the same arguments */
+    static class Search implements TreeVisitor {
+
+        String pattern;
+        String path;
+        boolean filter;
+        boolean count;
+        boolean wholeTree;
+        boolean filenames;
+        boolean oneMatchPerRootNode;
+        boolean treeNumbers;
+        boolean subtreeCodes;
+        boolean printTree;
+        List handles = new ArrayList();
+        TreePrint printer;
+
+        TregexPattern compiled;
+        DiskTreebank treebank;
+        PrintWriter out;
+        PrintWriter err;
+        int treeNumber = 0;
+        int matches = 0;
+
+        Search(String[] args, PrintWriter out, PrintWriter err) {
+            this.out = out;
+            this.err = err;
+            boolean oneline = false;
+            boolean words = false;
+            boolean value = false;
+            for (int n = 0; n < args.length; n++) {
+                String arg = args[n];
+                if (arg.equals("-filter")) {
+                    filter = true;
+                } else if (arg.equals("-C")) {
+                    count = true;
+                } else if (arg.equals("-w")) {
+                    wholeTree = true;
+                } else if (arg.equals("-f")) {
+                    filenames = true;
+                } else if (arg.equals("-o")) {
+                    oneMatchPerRootNode = true;
+                } else if (arg.equals("-n")) {
+                    treeNumbers = true;
+                } else if (arg.equals("-x")) {
+                    subtreeCodes = true;
+                } else if (arg.equals("-T")) {
+                    printTree = true;
+                } else if (arg.equals("-s")) {
+                    oneline = true;
+                } else if (arg.equals("-t")) {
+                    words = true;
+                } else if (arg.equals("-u")) {
+                    value = true;
+                } else if (arg.equals("-h") && n + 1 < args.length) {
+                    handles.add(args[++n]);
+                } else if (arg.startsWith("-") && arg.length() > 1) {
+                    throw new IllegalArgumentException("Unsupported option: " + arg);
+                } else if (pattern == null) {
+                    pattern = arg;
+                } else {
+                    path = arg;
+                }
+            }
+            // as with tregex.sh, -u wins over -s, and -s over -t
+            printer = new TreePrint(value ? "rootSymbolOnly" : oneline ? "oneline" : words ? "words" : "penn");
+        }
+
+        void run(String trees) throws IOException {
+            try {
+                compiled = TregexPattern.compile(pattern);
+            } catch (TregexParseException e) {
+                err.println("Error parsing expression: " + pattern);
+                err.println("Parse exception: " + e.toString());
+                return;
+            }
+            err.println("Pattern string:");
+            err.println(compiled.pattern());
+            err.println("Parsed representation:");
+            compiled.prettyPrint(err);
+
+            TregexPattern.TRegexTreeReaderFactory trf = new TregexPattern.TRegexTreeReaderFactory();
+            if (filter || path == null) {
+                if (!filter) {
+                    err.println("using default tree");
+                    trees = DEFAULT_TREE;
+                }
+                TreeReader reader = trf.newTreeReader(new BufferedReader(new StringReader(trees)));
+                Tree tree;
+                while ((tree = reader.readTree()) != null) {
+                    visitTree(tree);
+                }
+                reader.close();
+            } else {
+                err.println("Reading trees from file(s) " + path);
+                treebank = new DiskTreebank(trf, "UTF-8");
+                treebank.loadPath(new File(path), new FileFilter() {
+                    public boolean accept(File file) {
+                        return true;
+                    }
+                });
+                treebank.apply(this);
+            }
+
+            if (count) {
+                out.println(matches);
+            } else if (!subtreeCodes) {
+                err.println("There were " + matches + " matches in total.");
+            }
+        }
+
+        public void visitTree(Tree tree) {
+            treeNumber++;
+            if (printTree) {
+                out.print(treeNumber + ":");
+                out.println("Next tree read:");
+                printer.printTree(tree, out);
+            }
+            TregexMatcher matcher = compiled.matcher(tree);
+            Tree last = null;
+            while (matcher.find()) {
+                if (oneMatchPerRootNode) {
+                    if (matcher.getMatch() == last) {
+                        continue;
+                    }
+                    last = matcher.getMatch();
+                }
+                matches++;
+                if (filenames && treebank != null) {
+                    out.print("# ");
+                    out.println(treebank.getCurrentFilename());
+                }
+                if (subtreeCodes) {
+                    out.print(treeNumber);
+                    out.print(':');
+                    out.println(matcher.getMatch().nodeNumber(tree));
+                }
+                if (count || subtreeCodes) {
+                    continue;
+                }
+                if (treeNumbers) {
+                    out.print(treeNumber + ": ");
+                }
+                if (printTree) {
+                    out.println("Found a full match:");
+                }
+                if (wholeTree) {
+                    printer.printTree(tree, out);
+                } else if (!handles.isEmpty()) {
+                    if (printTree) {
+                        out.println("Here's the node you were interested in:");
+                    }
+                    for (int n = 0; n < handles.size(); n++) {
+                        Tree node = matcher.getNode((String) handles.get(n));
+                        if (node == null) {
+                            err.println("Error!!  There is no matched node \"" + handles.get(n)
+                                        + "\"!  Did you specify such a label in the pattern?");
+                        } else {
+                            printer.printTree(node, out);
+                        }
+                    }
+                } else {
+                    printer.printTree(matcher.getMatch(), out);
+                }
+            }
+        }
+    }
+}
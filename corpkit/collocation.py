@@ -0,0 +1,114 @@
+"""
+corpkit: association measures for collocates
+
+An interrogation with a `window` counts `node/collocate` pairs. Given the
+frequency of every token in the corpus, the functions here score all pairs
+at once with array maths: mutual information, t-score, log-Dice and
+log-likelihood.
+"""
+
+from __future__ import print_function
+
+MEASURES = ['mi', 't', 'logdice', 'll']
+
+def association_measures(observed, node_freq, coll_freq, total, span=1):
+    """
+    Score node/collocate pairs
+
+    Expected counts take the size of the window into account: a node seen
+    `R` times gives `R * span` chances to see a collocate.
+
+    :param observed: Times each collocate was seen near its node
+    :type observed: `numpy.ndarray`
+
+    :param node_freq: Frequency of each node
+    :type node_freq: `numpy.ndarray`
+
+    :param coll_freq: Frequency of each collocate
+    :type coll_freq: `numpy.ndarray`
+
+    :param total: Tokens in the corpus
+    :type total: `int`
+
+    :param span: Positions in each window, `2 * window`
+    :type span: `int`
+
+    :returns: `dict` -- measure name: `numpy.ndarray` of scores, plus `expected`
+    """
+    import numpy as np
+    obs = np.asarray(observed, dtype=float)
+    node = np.asarray(node_freq, dtype=float) * span
+    coll = np.asarray(coll_freq, dtype=float)
+    total = float(total)
+    expected = node * coll / total
+
+    # 2x2 contingency table: in the window or not, collocate or not
+    cells = [obs, node - obs, coll - obs, total - node - coll + obs]
+    rows = [node, node, total - node, total - node]
+    cols = [coll, total - coll, coll, total - coll]
+    ll = np.zeros(len(obs))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for o, r, c in zip(cells, rows, cols):
+            o = np.clip(o, 0, None)
+            e = r * c / total
+            ll += np.where(o > 0, o * np.log(o / e), 0.0)
+        scores = {'expected': expected,
+                  'mi': np.log2(obs / expected),
+                  't': (obs - expected) / np.sqrt(obs),
+                  'logdice': 14 + np.log2(2 * obs / (np.asarray(node_freq, dtype=float) + coll)),
+                  'll': np.where(obs < expected, -2 * ll, 2 * ll)}
+    return scores
+
+def collocation_table(pairs, frequencies, window, min_freq=2, sort_by='ll'):
+    """
+    Score the pairs counted by a collocate interrogation
+
+    :param pairs: Count of each `node/collocate` result
+    :type pairs: `pandas.Series`
+
+    :param frequencies: Count of each token in the corpus, shown
+                        in the same way as the nodes and collocates
+    :type frequencies: `pandas.Series`
+
+    :param window: Window size of the interrogation
+    :type window: `int`
+
+    :param min_freq: Drop pairs seen fewer times, before scoring
+    :type min_freq: `int`
+
+    :param sort_by: Measure to sort by
+    :type sort_by: `str`
+
+    :returns: `pandas.DataFrame` -- a row per pair, with `node`, `collocate`, `count`,
+              `expected` and a column for each measure
+    """
+    import numpy as np
+    import pandas as pd
+
+    names = pd.Index(pairs.index).astype(str)
+    parts = names.str.split('/')
+    half = parts.str.len() // 2
+    nodes = pd.Index(['/'.join(p[:h]) for p, h in zip(parts, half)])
+    colls = pd.Index(['/'.join(p[h:]) for p, h in zip(parts, half)])
+    counts = np.asarray(pairs.values, dtype=float)
+
+    # every match gives a pair for each position in its window, `none` at
+    # the edges of sentences, so a node's pairs add up to span times its count
+    span = 2 * window
+    codes, uniq = pd.factorize(nodes)
+    node_freq = (np.bincount(codes, weights=counts) / span)[codes]
+
+    keep = (counts >= min_freq) & (np.asarray(half) > 0) & \
+           ~colls.str.match(r'^none(/none)*$')
+    freqs = frequencies.groupby(level=0).sum()
+    coll_freq = freqs.reindex(colls[keep]).fillna(0).values
+    scores = association_measures(counts[keep], node_freq[keep], coll_freq,
+                                  frequencies.sum(), span=span)
+
+    df = pd.DataFrame({'node': nodes[keep], 'collocate': colls[keep],
+                       'count': counts[keep].astype(int)}, index=names[keep])
+    for name in ['expected'] + MEASURES:
+        df[name] = scores[name]
+    if sort_by:
+        df = df.sort_values(sort_by, ascending=False, kind='stable')
+    return df
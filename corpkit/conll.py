@@ -5,7 +5,8 @@ corpkit: process CONLL formatted data
 def parse_conll(f,
                 first_time=False,
                 just_meta=False,
-                usecols=None):
+                usecols=None,
+                cache=None):
     """
     Make a pandas.DataFrame with metadata from a CONLL-U file
     
@@ -14,10 +15,26 @@ def parse_conll(f,
         first_time (bool, optional): If True, add in sent index
         just_meta (bool, optional): Return only a metadata `dict`
         usecols (None, optional): Which columns must be parsed by pandas.read_csv
+        cache (None, optional): If None, load from a valid binary cache when
+            there is one. If True, also build the cache when there isn't.
+            If False, always parse the text.
     
     Returns:
         pandas.DataFrame: DataFrame containing tokens and a ._metadata attribute
     """
+    if cache is not False:
+        from corpkit.store import read_conll_cache, write_conll_cache
+        cached = read_conll_cache(f, usecols=usecols, just_meta=just_meta)
+        if cached is not None:
+            return cached
+        if cache:
+            # parse every column once, so the cache serves any later usecols
+            df = parse_conll(f, first_time=first_time, cache=False)
+            if df is None:
+                return
+            write_conll_cache(f, df=df)
+            return read_conll_cache(f, usecols=usecols, just_meta=just_meta)
+
     import pandas as pd
     try:
         from StringIO import StringIO
@@ -80,38 +97,295 @@ def parse_conll(f,
     df._metadata = metadata
     return df
 
+def iter_conll_sentences(f):
+    """
+    Read a CONLL-U file one sentence at a time, without loading the file
+
+    Args:
+        f (str): Filepath
+
+    Yields:
+        tuple: sentence number, metadata `dict` and a `list` of token lines
+    """
+    from collections import defaultdict
+
+    def finish(count, meta, lines):
+        return count, {k: ','.join(v) for k, v in meta.items()}, lines
+
+    count = 1
+    meta = defaultdict(set)
+    lines = []
+    with open(f, 'r') as fo:
+        for line in fo:
+            line = line.rstrip('\n')
+            if not line:
+                if lines or meta:
+                    yield finish(count, meta, lines)
+                    count += 1
+                    meta = defaultdict(set)
+                    lines = []
+                continue
+            if not line.startswith('#'):
+                lines.append(line)
+            else:
+                line = line.lstrip('# ')
+                if '=' in line:
+                    field, val = line.split('=', 1)
+                    meta[field].add(val)
+    if lines or meta:
+        yield finish(count, meta, lines)
+
+def iter_conll(f, chunksize=1, usecols=None):
+    """
+    Make pandas.DataFrames from a CONLL-U file, `chunksize` sentences at a
+    time, so that memory use is bounded by the chunk rather than the file
+
+    Args:
+        f (str): Filepath
+        chunksize (int, optional): Number of sentences per DataFrame
+        usecols (None, optional): Which columns must be parsed by pandas.read_csv
+
+    Yields:
+        pandas.DataFrame: DataFrame containing tokens and a ._metadata
+            attribute, indexed by sentence number within the whole file
+    """
+    import pandas as pd
+    try:
+        from StringIO import StringIO
+    except ImportError:
+        from io import StringIO
+    from corpkit.constants import CONLL_COLUMNS
+
+    def make_df(splitdata, metadata):
+        # head can only be as long as the list of cols in the df
+        head = CONLL_COLUMNS[:splitdata[0].count('\t')]
+        # a chunk could have only numbers in a text column, and pandas would
+        # then guess a different dtype than for the rest of the file
+        dtypes = {k: str for k in head if k not in ['i', 'g']}
+        data = '\n'.join(splitdata).replace('/', '-slash-') + '\n'
+        try:
+            df = pd.read_csv(StringIO(data), sep='\t', header=None,
+                             names=['s'] + head, index_col=['s', 'i'],
+                             usecols=usecols, dtype=dtypes)
+        except ValueError:
+            return
+        df._metadata = metadata
+        return df
+
+    splitdata = []
+    metadata = {}
+    for count, meta, lines in iter_conll_sentences(f):
+        metadata[count] = meta
+        for line in lines:
+            splitdata.append('%d\t%s' % (count, line))
+        if len(metadata) >= chunksize:
+            if splitdata:
+                df = make_df(splitdata, metadata)
+                if df is not None:
+                    yield df
+            splitdata = []
+            metadata = {}
+    if splitdata:
+        df = make_df(splitdata, metadata)
+        if df is not None:
+            yield df
+
+class DepGraph(object):
+    """
+    Dependency structure of a parsed file as integer arrays, so that governors,
+    dependents and distance from root can be found for many tokens at once.
+
+    Tokens are referred to by their row number in the DataFrame. Governors are
+    stored as row offsets, with -1 for root and -2 for a governor that is
+    not in the data. Dependents are stored CSR-style: with `ptr, rows = deps`,
+    the dependents of row `r` are `rows[ptr[r]:ptr[r+1]]`.
+    """
+
+    def __init__(self, df):
+        import numpy as np
+        self.nrows = len(df)
+        self.sents = np.asarray(df.index.get_level_values(0), dtype=np.int64)
+        self.toks = np.asarray(df.index.get_level_values(1), dtype=np.int64)
+        self._gov_ids = df['g'].values if 'g' in df.columns else None
+        self._dep_strings = df['d'].values if 'd' in df.columns else None
+        self._stride = int(self.toks.max()) + 2 if self.nrows else 1
+        keys = self.sents * self._stride + self.toks
+        self._sorter = None
+        if self.nrows and not (keys[1:] > keys[:-1]).all():
+            self._sorter = np.argsort(keys, kind='mergesort')
+        self._keys = keys
+        self._gov = None
+        self._deps = None
+
+    def _find(self, sents, toks):
+        """
+        Row numbers of (sent, tok) arrays, or -2 where not present
+        """
+        import numpy as np
+        sents = np.asarray(sents, dtype=np.int64)
+        toks = np.asarray(toks, dtype=np.int64)
+        out = np.full(len(sents), -2, dtype=np.int64)
+        if not self.nrows or not len(sents):
+            return out
+        wanted = sents * self._stride + toks
+        pos = np.searchsorted(self._keys, wanted, sorter=self._sorter)
+        pos = np.minimum(pos, self.nrows - 1)
+        if self._sorter is not None:
+            pos = self._sorter[pos]
+        found = (self._keys[pos] == wanted) & (toks >= 0) & (toks < self._stride)
+        out[found] = pos[found]
+        return out
+
+    def rows(self, idxs):
+        """
+        Row numbers for a list of (sent, tok) tuples or an index
+        """
+        import numpy as np
+        if hasattr(idxs, 'get_level_values'):
+            return self._find(idxs.get_level_values(0), idxs.get_level_values(1))
+        if not len(idxs):
+            return np.array([], dtype=np.int64)
+        arr = np.asarray(list(idxs), dtype=np.int64)
+        return self._find(arr[:, 0], arr[:, 1])
+
+    def labels(self, rows):
+        """
+        (sent, tok) tuples for row numbers
+        """
+        return list(zip(self.sents[rows].tolist(), self.toks[rows].tolist()))
+
+    @property
+    def gov(self):
+        import numpy as np
+        if self._gov is None:
+            if self._gov_ids is None:
+                self._gov = np.full(self.nrows, -2, dtype=np.int64)
+            else:
+                import pandas as pd
+                gids = pd.to_numeric(pd.Series(self._gov_ids), errors='coerce')
+                gids = gids.fillna(-1).values.astype(np.int64)
+                self._gov = self._find(self.sents, gids)
+                self._gov[gids == 0] = -1
+        return self._gov
+
+    @property
+    def deps(self):
+        """
+        CSR arrays of dependents, from the 'd' column or else from 'g'
+        """
+        import numpy as np
+        import pandas as pd
+        if self._deps is not None:
+            return self._deps
+        if self._dep_strings is not None:
+            split = pd.Series(self._dep_strings).astype(str).str.split(',')
+            lengths = split.str.len().values
+            owners = np.repeat(np.arange(self.nrows), lengths)
+            ids = pd.to_numeric(pd.Series(np.concatenate(split.values) if self.nrows else []),
+                                errors='coerce').fillna(0).values.astype(np.int64)
+            rows = self._find(self.sents[owners], ids)
+            # '0' means no dependents
+            keep = rows >= 0
+            owners, rows = owners[keep], rows[keep]
+        else:
+            owners = self.gov
+            rows = np.arange(self.nrows)
+            keep = owners >= 0
+            owners, rows = owners[keep], rows[keep]
+            order = np.argsort(owners, kind='mergesort')
+            owners, rows = owners[order], rows[order]
+        ptr = np.zeros(self.nrows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=self.nrows), out=ptr[1:])
+        self._deps = (ptr, rows)
+        return self._deps
+
+    def governors(self, rows):
+        """
+        Governor rows of rows: -1 for root, -2 if unavailable
+        """
+        import numpy as np
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.full(len(rows), -2, dtype=np.int64)
+        ok = rows >= 0
+        out[ok] = self.gov[rows[ok]]
+        return out
+
+    def dependents(self, rows):
+        """
+        Dependents of rows, as (position in `rows` of the governor, dependent row)
+        """
+        import numpy as np
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = np.where(rows >= 0, rows, self.nrows)
+        ptr, deprows = self.deps
+        ptr = np.append(ptr, ptr[-1])
+        starts, ends = ptr[rows], ptr[rows + 1]
+        lengths = ends - starts
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        if not len(owners):
+            return owners, np.array([], dtype=np.int64)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return owners, deprows[np.repeat(starts, lengths) + offsets]
+
+    def distance_to_root(self, rows, is_root, maxdist=20):
+        """
+        Number of steps from each row up to a token whose function is root
+
+        :param is_root: boolean array marking root tokens, by row
+        :returns: integer array, -1 where the root was not reached
+        """
+        import numpy as np
+        cur = np.asarray(rows, dtype=np.int64).copy()
+        dist = np.full(len(cur), -1, dtype=np.int64)
+        live = cur >= 0
+        for count in range(maxdist):
+            done = live & is_root[np.where(live, cur, 0)]
+            dist[done] = count
+            live &= ~done
+            if not live.any():
+                break
+            cur[live] = self.gov[cur[live]]
+            live &= cur >= 0
+        return dist
+
+def dep_graph(df):
+    """
+    Get the DepGraph for a DataFrame, building it only once per DataFrame
+    """
+    graph = df.__dict__.get('_dep_graph')
+    if graph is None or graph.nrows != len(df):
+        graph = DepGraph(df)
+        df.__dict__['_dep_graph'] = graph
+    return graph
+
 def get_dependents_of_id(idx, df=False, repeat=False, attr=False, coref=False):
     """
     Get dependents of a token
     """
     sent_id, tok_id = getattr(idx, 'name', idx)
-    deps = df.ix[sent_id, tok_id]['d'].split(',')
-    out = []
-    for govid in deps:
-        if attr:
-            # might not exist...
-            try:
-                tok = getattr(df.ix[sent_id,int(govid)], attr, False)
-                if tok:
-                    out.append(tok)
-            except (KeyError, IndexError):
-                pass
-        else:
-            out.append((sent_id, int(govid)))
-    return out
+    graph = dep_graph(df)
+    _, rows = graph.dependents(graph.rows([(sent_id, tok_id)]))
+    if attr:
+        if attr not in df.columns:
+            return []
+        return [tok for tok in df[attr].values[rows] if tok]
+    return graph.labels(rows)
 
 def get_governors_of_id(idx, df=False, repeat=False, attr=False, coref=False):
     """
     Get governors of a token
     """
-    
     # it can be a series or a tuple
     sent_id, tok_id = getattr(idx, 'name', idx)
-    # get the governor id
-    govid = df['g'].loc[sent_id, tok_id]
+    graph = dep_graph(df)
+    gov = graph.governors(graph.rows([(sent_id, tok_id)]))[0]
     if attr:
-        return getattr(df.loc[sent_id,govid], attr, 'root')
-    return [(sent_id, govid)]
+        if gov < 0 or attr not in df.columns:
+            return 'root'
+        return df[attr].values[gov]
+    if gov < 0:
+        return []
+    return graph.labels([gov])
 
 def get_match(idx, df=False, repeat=False, attr=False, **kwargs):
     """
@@ -209,9 +483,25 @@ def search_this(df, obj, attrib, pattern, adjacent=False, coref=False):
     # but, if the pattern is 'any', don't bother
     if hasattr(pattern, 'pattern') and pattern.pattern == r'.*':
         matches = df
+    # word lists are matched by set membership
+    elif hasattr(pattern, 'match_series'):
+        matches = df[pattern.match_series(df[attrib].fillna(''))]
     else:
         matches = df[df[attrib].fillna('').str.contains(pattern)]
 
+    # governors and dependents of all matches can be found at once
+    if obj in ['g', 'd', 'm'] and not adjacent:
+        if obj == 'm':
+            return list(matches.index)
+        graph = dep_graph(df)
+        rows = graph.rows(matches.index)
+        if obj == 'g':
+            _, found = graph.dependents(rows)
+        else:
+            found = graph.governors(rows)
+            found = found[found >= 0]
+        return list(set(graph.labels(found)))
+
     # functions for getting the needed object
     revmapping = {'g': get_dependents_of_id,
                   'd': get_governors_of_id,
@@ -225,9 +515,9 @@ def search_this(df, obj, attrib, pattern, adjacent=False, coref=False):
 
         if adjacent:
             if adjacent[0] == '+':
-                tomove = -int(adj[1])
+                tomove = -int(adjacent[1])
             elif adjacent[0] == '-':
-                tomove = int(adj[1])
+                tomove = int(adjacent[1])
             idx = (idx[0], idx[1] + tomove)
         
         for mindex in getfunc(idx, df=df, coref=coref):
@@ -336,22 +626,9 @@ def format_toks(to_process, show, df):
 def make_series(ser, df=False, obj=False,
                 att=False, adj=False):
     """
-    To apply to a DataFrame to add complex criteria, like 'gf'
+    To apply to a DataFrame to add coref criteria, like 'hw'. Governor,
+    dependent and distance values come from graph_series instead
     """
-    # distance mode
-    if att == 'a':
-        count = 0
-        if obj == 'g':
-            if ser[obj] == 0:
-                return '-1'
-            ser = df.loc[ser.name[0], ser['g']]
-        while count < 20:
-            if ser['mf'].lower() == 'root':
-                return str(count)
-            ser = df.loc[ser.name[0], ser['g']]
-            count += 1
-        return '20+'
-
     # h is head of this particular group
     if obj == 'h':
         cohead = ser['c']
@@ -381,25 +658,8 @@ def make_series(ser, df=False, obj=False,
         else:
             return just_cof.iloc[0]['m' + att]
 
-    if obj == 'g':
-        if ser[obj] == 0:
-            return 'root'
-        else:
-            try:
-                return df[att][ser.name[0], ser[obj]]
-            # this keyerror can happen if governor is punctuation, for example
-            except KeyError:
-                return
-
-    # if dependent, we need to return a df-like thing instead
-    elif obj == 'd':
-        #import pandas as pd
-        idxs = [(ser.name[0], int(i)) for i in ser[obj].split(',')]
-        dat = df[att].ix[idxs]
-        return dat
-
     # todo: fix everything below here
-    elif obj == 'r': # get the representative
+    if obj == 'r': # get the representative
         cohead = ser['c'].rstrip('*')
         refs = df[df['c'] == cohead + '*']
         return refs[att].ix[0]
@@ -421,36 +681,66 @@ def make_series(ser, df=False, obj=False,
 def joiner(ser):
     return ser.str.cat(sep='/') 
 
+def graph_series(dfss, graph, index, obj, att):
+    """
+    Get values of the governors or dependents of tokens, or their distance
+    from root, for every token in `index` at once
+
+    :param dfss: the DataFrame that `graph` was built from
+    :param index: (sent, token) index of tokens to get values for
+    :returns: Series. For dependents, a token's index is repeated once per
+              dependent, and tokens with no dependents get 'none'
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = graph.rows(index)
+
+    if att == 'a':
+        is_root = dfss['f'].fillna('').str.lower().values == 'root'
+        start = graph.governors(rows) if obj == 'g' else rows
+        dist = graph.distance_to_root(start, is_root)
+        vals = np.where(dist >= 0, dist.astype(str), '20+').astype(object)
+        if obj == 'g':
+            vals[start == -1] = '-1'
+        return pd.Series(vals, index=index)
+
+    col = att if att in dfss.columns else att[1:]
+    values = dfss[col]
+    if col == 'e':
+        values = values.str.replace('^O$', 'none', regex=True)
+    values = values.values
+
+    if obj == 'g':
+        gov = graph.governors(rows)
+        vals = np.empty(len(gov), dtype=object)
+        vals[gov >= 0] = values[gov[gov >= 0]]
+        vals[gov == -1] = 'root'
+        vals[gov == -2] = None
+        return pd.Series(vals, index=index)
+
+    # dependents
+    owners, deprows = graph.dependents(rows)
+    vals = values[deprows]
+    keep = pd.notnull(vals)
+    owners, vals = owners[keep], vals[keep]
+    nodeps = np.setdiff1d(np.arange(len(rows)), owners)
+    owners = np.concatenate([owners, nodeps])
+    vals = np.concatenate([vals, np.array(['none'] * len(nodeps), dtype=object)])
+    order = np.argsort(owners, kind='mergesort')
+    return pd.Series(vals[order], index=index[owners[order]])
+
 def make_new_for_dep(dfmain, dfdep, name):
     """
     If showind dependent, we have to make a whole new dataframe
 
     :param dfmain: dataframe with everything in it
-    :param dfdep: dataframe with just dependent
+    :param dfdep: series of dependent values, from graph_series
     """
-    import pandas as pd
-    import numpy as np
-    new = []
-    newd = []
-    index = []
-    for (i, ml), (_, dl) in zip(dfmain.iterrows(), dfdep.iterrows()):
-        if all(pd.isnull(i) for i in dl.values):
-            index.append(i)
-            new.append(ml)
-            newd.append('none')
-            continue
-        else:
-            for bit in dl:
-                if pd.isnull(bit):
-                    continue
-                index.append(i)
-                new.append(ml)
-                newd.append(bit)
-    
-    #todo: account for no matches
-    index = pd.MultiIndex.from_tuples(index, names=['s', 'i'])
-    newdf = pd.DataFrame(new, index=index)
-    newdf[name] = newd
+    if not dfmain.index.is_unique:
+        dfmain = dfmain[~dfmain.index.duplicated()]
+    newdf = dfmain.loc[dfdep.index].copy()
+    newdf[name] = dfdep.values
     return newdf
 
 def turn_pos_to_wc(ser, showval):
@@ -465,12 +755,15 @@ def turn_pos_to_wc(ser, showval):
     return news
 
 def concline_generator(matches, idxs, df, metadata,
-                       add_meta, category, fname, preserve_case=False):
+                       add_meta, category, fname, preserve_case=False,
+                       lazy=False):
     """
     Get all conclines
 
     :param matches: a list of formatted matches
     :param idxs: their (sent, word) idx
+    :param lazy: leave the left and right context as None, to be made later
+                 by `conc_contexts` for just the lines that are shown
     """
     conc_res = []
     # potential speedup: turn idxs into dict
@@ -494,8 +787,11 @@ def concline_generator(matches, idxs, df, metadata,
             if not preserve_case:
                 mid = mid.lower()
             ix = '%d,%d' % (s, i)
-            start = ' '.join(sent.loc[:i-1].values)
-            end = ' '.join(sent.loc[i+1:].values)
+            if lazy:
+                start, end = None, None
+            else:
+                start = ' '.join(sent.loc[:i-1].values)
+                end = ' '.join(sent.loc[i+1:].values)
             lin = [ix, category, fname, sname, start, mid, end]
             if add_meta:
                 for k, v in sorted(meta.items()):
@@ -521,7 +817,8 @@ def fast_simple_conc(dfss, idxs, show,
                      conc=False,
                      preserve_case=False,
                      gramsize=1,
-                     window=None):
+                     window=None,
+                     lazy=False):
     """
     Fast, simple concordancer, heavily conditional
     to save time.
@@ -537,6 +834,7 @@ def fast_simple_conc(dfss, idxs, show,
     dmode = any(x.startswith('d') for x in show)
     # make a quick copy if need be because we modify the df
     df = dfss.copy() if not simple else dfss
+    graph = dep_graph(dfss) if not simple else None
     # add text to df columns so that it resembles 'show' values
     lst = ['s', 'i', 'w', 'l', 'e', 'p', 'f']
 
@@ -589,12 +887,6 @@ def fast_simple_conc(dfss, idxs, show,
                 lst = ['s', 'i', 'w', 'l', 'f', 'p']
                 if att in lst and ob != 'm':
                     att = 'm' + att
-                if ob == 'm' and att != 'a':
-                    dfx = df[['m' + att]]
-                elif att == 'a':
-                    dfx = df[['mf', 'g']]
-                else:
-                    dfx = df[[ob, att]]
             # decide if we need to format everything
             if (not conc or only_format_match) and not adj:
                 to_proc = just_matches
@@ -603,6 +895,8 @@ def fast_simple_conc(dfss, idxs, show,
             # now we get or generate the new column
             if ob == 'm' and att != 'a':
                 ser = to_proc['m' + att]
+            elif ob in ['g', 'd'] or att == 'a':
+                ser = graph_series(dfss, graph, to_proc.index, ob, att)
             else:
                 ser = to_proc.apply(make_series, df=dfx, obj=ob, att=att, axis=1)
             if xmode:
@@ -665,7 +959,8 @@ def fast_simple_conc(dfss, idxs, show,
         conc_res = concline_generator(matches, idxs, df,
                                       metadata, add_meta,
                                       category, fname,
-                                      preserve_case=preserve_case)
+                                      preserve_case=preserve_case,
+                                      lazy=lazy)
 
     return list(matches), conc_res
 
@@ -683,6 +978,97 @@ def make_collocate_show(show, current):
         out.append(newn)
     return out
 
+def gram_show_bits(show, gramsize=1, window=None):
+    """
+    Get the per-token show values of an n-gram or collocate search, if
+    they can all be read straight from the CONLL columns
+
+    Returns:
+        list: show values for one token, or None
+    """
+    base = show
+    if gramsize > 1:
+        base = show[:len(show) // gramsize]
+        expected = list(base)
+        for i in range(1, gramsize):
+            expected += ['+%d%s' % (i, bit) for bit in base]
+        if show != expected:
+            return
+    if not base or not all(len(b) == 2 and b[0] == 'm' and b[1] in 'wlpxsife' for b in base):
+        return
+    return base
+
+def gather_grams(df, matches, bits, gramsize=1, window=None, preserve_case=False):
+    """
+    Make n-grams or collocates for a set of matches with one gather over
+    integer token codes, rather than shifting the whole DataFrame for each
+    offset. Tokens outside the match's sentence are shown as `none`.
+
+    Args:
+        df (pandas.DataFrame): The file, or the part of it being searched
+        matches (list): `(sent, token)` index tuples, sorted
+        bits (list): Show values for each token, from `gram_show_bits`
+        gramsize (int, optional): Size of n-grams
+        window (int, optional): Distance to look for collocates
+
+    Returns:
+        pandas.Series: formatted n-grams or collocates, indexed by match,
+            with every n-gram containing each match, or every collocate in
+            its window
+    """
+    import numpy as np
+    import pandas as pd
+
+    # each distinct token, formatted as per show, gets an integer code
+    cols = []
+    for bit in bits:
+        att = bit[-1]
+        if att in ['s', 'i']:
+            ser = df['m' + att]
+        elif att == 'x':
+            from corpkit.dictionaries.word_transforms import taglemma
+            ser = df['p'].map(lambda v: taglemma.get(str(v).lower(), str(v).lower()),
+                              na_action='ignore')
+        else:
+            ser = df[att]
+            if att == 'e':
+                ser = ser.replace('O', 'none')
+        cols.append(ser.fillna('none').astype(str))
+    tokens = cols[0].str.cat(others=cols[1:], sep='/') if len(cols) > 1 else cols[0]
+    codes, vocab = pd.factorize(tokens)
+    missing = len(vocab)
+    vocab = np.append(np.asarray(vocab, dtype=object), '/'.join(['none'] * len(bits)))
+    if not preserve_case:
+        vocab = np.array([v.lower() for v in vocab], dtype=object)
+
+    pos = df.index.get_indexer(pd.MultiIndex.from_tuples(matches, names=df.index.names)) \
+          if matches else np.array([], dtype=np.int64)
+    pos = pos[pos >= 0]
+    sents = df.index.codes[0] if hasattr(df.index, 'codes') else df.index.labels[0]
+    sents = np.asarray(sents)
+
+    # each row of spans is the token offsets of one result, per match
+    if window:
+        offsets = [o for o in range(-window, window + 1) if o]
+        spans = np.array([[0, o] for o in offsets])
+    else:
+        spans = np.array([list(range(-o, gramsize - o)) for o in range(gramsize)])
+    where = pos[:, None, None] + spans[None, :, :]
+    safe = np.clip(where, 0, max(len(codes) - 1, 0))
+    ok = (where >= 0) & (where < len(codes)) & (sents[safe] == sents[pos][:, None, None])
+    gathered = np.where(ok, codes[safe], missing)
+    gathered = gathered.reshape(-1, spans.shape[1])
+
+    # join only the distinct n-grams, then spread them back out
+    if len(gathered):
+        uniq, inverse = np.unique(gathered, axis=0, return_inverse=True)
+        joined = np.array(['/'.join(vocab[row]) for row in uniq], dtype=object)
+        values = joined[inverse.ravel()]
+    else:
+        values = np.array([], dtype=object)
+    index = df.index[np.repeat(pos, len(spans))]
+    return pd.Series(values, index=index)
+
 def show_this(df, matches, show, metadata, conc=False,
               coref=False, category=False, show_conc_metadata=False, **kwargs):
 
@@ -691,6 +1077,7 @@ def show_this(df, matches, show, metadata, conc=False,
     preserve_case = kwargs.get('preserve_case', False)
     gramsize = kwargs.get('gramsize', 1)
     window = kwargs.get('window', None)
+    lazy = kwargs.get('lazy_conc', False)
 
     matches = sorted(list(matches))
 
@@ -724,7 +1111,22 @@ def show_this(df, matches, show, metadata, conc=False,
                                 conc=conc,
                                 preserve_case=preserve_case,
                                 gramsize=gramsize,
-                                window=window)
+                                window=window,
+                                lazy=lazy)
+        bits = gram_show_bits(show, gramsize=gramsize, window=window)
+        if bits and (not conc or only_format_match):
+            grams = gather_grams(df, matches, bits,
+                                 gramsize=gramsize,
+                                 window=window,
+                                 preserve_case=preserve_case)
+            if not conc:
+                return list(grams), []
+            conc_out = concline_generator(grams, None, df['w'],
+                                          metadata, show_conc_metadata,
+                                          category, kwargs.get('filename', ''),
+                                          preserve_case=preserve_case,
+                                          lazy=lazy)
+            return list(grams), conc_out
         else:
             resbit = []
             concbit = []
@@ -791,10 +1193,90 @@ def determine_adjacent(original):
         adj = False
     return adj, original
 
+def metadata_frame(metadata, fields=None):
+    """
+    Hold the metadata of a file's sentences as a DataFrame
+
+    Args:
+        metadata (dict): metadata `dict` of each sentence, by sentence number
+        fields (list, optional): Fields to keep, by default all but `parse`
+
+    Returns:
+        pandas.DataFrame: a row per sentence and a column per field, with
+            `'none'` where a sentence lacks a field
+    """
+    import pandas as pd
+    sents = sorted(metadata)
+    if fields is None:
+        fields = sorted(set(k for d in metadata.values() for k in d) - set(['parse']))
+    data = dict((field, [metadata[s].get(field, 'none') for s in sents]) for field in fields)
+    return pd.DataFrame(data, index=sents, columns=fields)
+
+def metadata_mask(frame, feature, criteria, method='just'):
+    """
+    Find the sentences whose metadata value meets a criterion. Values may
+    hold several items separated by `;`, any of which can match. Each
+    distinct value is tested once.
+
+    Args:
+        frame (pandas.DataFrame): from `metadata_frame`
+        feature (str): Metadata field
+        criteria (str/regex/list): Pattern, or values to match
+        method (str, optional): `just` to keep matches, or `skip` to drop them
+
+    Returns:
+        numpy.ndarray: `bool` for each row of `frame`
+    """
+    import re
+    import numpy as np
+    import pandas as pd
+    from corpkit.constants import STRINGTYPE
+
+    if feature in frame.columns:
+        values = frame[feature].fillna('none').astype(str)
+    else:
+        values = pd.Series(['none'] * len(frame), index=frame.index)
+    codes, uniques = pd.factorize(values)
+
+    if isinstance(criteria, (list, set, tuple)):
+        criteria = [i.lower() for i in criteria]
+        if method == 'just':
+            test = lambda parts: any(i.lower() in criteria for i in parts)
+        else:
+            test = lambda parts: not any(i in criteria for i in parts)
+    elif isinstance(criteria, (re._pattern_type, STRINGTYPE)):
+        if isinstance(criteria, STRINGTYPE):
+            criteria = re.compile(criteria, re.IGNORECASE)
+        if method == 'just':
+            test = lambda parts: any(criteria.search(i) for i in parts)
+        else:
+            test = lambda parts: not any(criteria.search(i) for i in parts)
+    else:
+        return np.zeros(len(frame), dtype=bool)
+    if method not in ['just', 'skip']:
+        return np.zeros(len(frame), dtype=bool)
+    hit = np.array([bool(test(value.split(';'))) for value in uniques], dtype=bool)
+    return hit[codes] if len(hit) else np.zeros(len(frame), dtype=bool)
+
+def keep_sentences(df, metadata, sents):
+    """
+    Cut a DataFrame and its metadata down to some sentences, in one pass
+    over the sentence index
+    """
+    sents = list(sents)
+    out = df[df.index.get_level_values(0).isin(sents)]
+    # searches after a cut expect empty strings, not nan
+    out = out.fillna('')
+    out._metadata = dict((s, metadata[s]) for s in sents)
+    return out
+
 def cut_df_by_metadata(df, metadata, criteria, coref=False,
-                            feature='speaker', method='just'):
+                            feature='speaker', method='just', frame=None):
     """
     Keep or remove parts of the DataFrame based on metadata criteria
+
+    `frame`, from `metadata_frame`, can be passed in when cutting the same
+    file many times
     """
     if not criteria:
         df._metadata = metadata
@@ -803,51 +1285,31 @@ def cut_df_by_metadata(df, metadata, criteria, coref=False,
     if coref:
         df._metadata = metadata
         return df
-    import re
-    good_sents = []
-    new_metadata = {}
-    from corpkit.constants import STRINGTYPE
-    # could make the below more elegant ...
-    for sentid, data in sorted(metadata.items()):
-        meta_value = data.get(feature, 'none')
-        lst_met_vl = meta_value.split(';')
-        if isinstance(criteria, (list, set, tuple)):
-            criteria = [i.lower() for i in criteria]
-            if method == 'just':
-                if any(i.lower() in criteria for i in lst_met_vl):
-                    good_sents.append(sentid)
-                    new_metadata[sentid] = data
-            elif method == 'skip':
-                if not any(i in criteria for i in lst_met_vl):
-                    good_sents.append(sentid)
-                    new_metadata[sentid] = data
-        elif isinstance(criteria, (re._pattern_type, STRINGTYPE)):
-            if method == 'just':
-                if any(re.search(criteria, i, re.IGNORECASE) for i in lst_met_vl):
-                    good_sents.append(sentid)
-                    new_metadata[sentid] = data
-            elif method == 'skip':
-                if not any(re.search(criteria, i, re.IGNORECASE) for i in lst_met_vl):
-                    good_sents.append(sentid)
-                    new_metadata[sentid] = data
-
-    df = df.loc[good_sents]
-    df = df.fillna('')
-    df._metadata = new_metadata
-    return df
+    if frame is None:
+        frame = metadata_frame(metadata, [feature])
+    mask = metadata_mask(frame, feature, criteria, method=method)
+    return keep_sentences(df, metadata, frame.index[mask])
 
 def cut_df_by_meta(df, just_metadata, skip_metadata):
     """
-    Reshape a DataFrame based on filters
+    Reshape a DataFrame based on filters, combining every criterion into
+    one mask over sentences before cutting the tokens
     """
-    if df is not None:
-        if just_metadata:
-            for k, v in just_metadata.items():
-                df = cut_df_by_metadata(df, df._metadata, v, feature=k)
-        if skip_metadata:
-            for k, v in skip_metadata.items():
-                df = cut_df_by_metadata(df, df._metadata, v, feature=k, method='skip')
-    return df
+    if df is None or not (just_metadata or skip_metadata):
+        return df
+    import numpy as np
+    just_metadata = dict((k, v) for k, v in (just_metadata or {}).items() if v)
+    skip_metadata = dict((k, v) for k, v in (skip_metadata or {}).items() if v)
+    if not just_metadata and not skip_metadata:
+        return df
+    metadata = df._metadata
+    frame = metadata_frame(metadata, sorted(set(just_metadata) | set(skip_metadata)))
+    keep = np.ones(len(frame), dtype=bool)
+    for k, v in just_metadata.items():
+        keep &= metadata_mask(frame, k, v, method='just')
+    for k, v in skip_metadata.items():
+        keep &= metadata_mask(frame, k, v, method='skip')
+    return keep_sentences(df, metadata, frame.index[keep])
 
 
 def tgrep_searcher(f=False,
@@ -876,14 +1338,40 @@ def tgrep_searcher(f=False,
     Use tgrep for constituency grammar search
     """
 
+    from collections import defaultdict
     from corpkit.process import show_tree_as_per_option, tgrep
+    from corpkit.treestore import load_tree_store
+    from corpkit.treequery import compile_tree_query
     matches = []
     conc_out = []
     # in case search was a dict
     srch = search.get('t') if isinstance(search, dict) else search
     metcat = category if category else ''
+    # trees come from the file's saved tree store, if there is one. metadata
+    # may be a subset of the file, so a store to be saved reads it all
+    cache = kwargs.get('cache')
+    store = None
+    if fname:
+        store = load_tree_store(fname, metadata=None if cache else metadata, cache=cache)
+    query = None
+    if store is not None:
+        try:
+            query = compile_tree_query(srch)
+        except ValueError:
+            # named nodes, macros and so on are left to nltk
+            query = None
+    found = defaultdict(list)
+    if query is not None:
+        for sent_id, first, last, node in query.matches(store, sents=metadata.keys()):
+            found[sent_id].append(store.node(node, sent_id))
     for i, sent in metadata.items():
-        results = tgrep(sent['parse'], srch)
+        if query is not None:
+            results = found[i]
+        elif store is not None and i in store:
+            tree, nodes = store.tree(i, parented=True)
+            results = [store.node(nodes[id(r)], i) for r in tgrep(tree, srch) if id(r) in nodes]
+        else:
+            results = tgrep(sent['parse'], srch)
         sname = sent.get('speaker')
         metcat = category
         for res in results:
@@ -1011,7 +1499,7 @@ def get_stats(from_df=False, metadata=False, feature=False, root=False, **kwargs
     import re
     from corpkit.dictionaries.process_types import processes
     from collections import Counter, defaultdict
-    from corpkit.process import tregex_engine
+    from corpkit.process import tregex_batch
 
     def ispunct(s):
         import string
@@ -1049,33 +1537,20 @@ def get_stats(from_df=False, metadata=False, feature=False, root=False, **kwargs
     if not to_open.strip('\n'):
         return {}, {}
 
-    for name, q in sorted(tregex_qs.items()):
-        options = ['-o', '-t'] if name == 'Processes' else ['-o']
-        # c option removed, could cause memory problems
-        #ops = ['-%s' % i for i in translated_option] + ['-o', '-n']
-        res = tregex_engine(query=q, 
-                            options=options,
-                            corpus=to_open,  
-                            root=root)
-
-        #res = format_tregex(res)
-        if not res:
-            continue
+    # every pattern is matched in one pass over the trees
+    matches = tregex_batch(tregex_qs, to_open, root=root)
+    for name, res in matches.items():
+        result[name] = len(res)
 
-        concs = [False for i in res]
-        for (_, met, r), line in zip(res, concs):
-            result[name] = len(res)
-        if name != 'Processes':
-            continue
-        non_mat = 0
+    if matches['Processes']:
         for ptype in ['mental', 'relational', 'verbal']:
             reg = getattr(processes, ptype).words.as_regex(boundaries='l')
-            count = len([i for i in res if re.search(reg, i[-1])])
+            count = len([i for i in matches['Processes'] if re.search(reg, i)])
             nname = ptype.title() + ' processes'
             result[nname] = count
 
-        if root:
-            root.update()
+    if root:
+        root.update()
     return result, {}
 
 def get_corefs(df, matches):
@@ -1094,6 +1569,148 @@ def get_corefs(df, matches):
                 out.add(ix)
     return out
 
+def stream_pipeline(f, stream=True, **kwargs):
+    """
+    Run the pipeline over a file in chunks of sentences, adding up results
+    as we go, so that a huge file never needs to be in memory all at once
+
+    :param stream: Number of sentences per chunk, or `True` for the default
+    :type stream: `int`/`bool`
+
+    :returns: results as a `Counter` (or `int` in count mode, or a `dict` of
+              these by metadata value), and concordance lines
+    """
+    from collections import Counter, defaultdict
+    from corpkit.constants import STREAM_CHUNKSIZE
+
+    chunksize = STREAM_CHUNKSIZE if stream is True else int(stream)
+    maxconc, numconc = kwargs.get('maxconc', (False, 0))
+    countmode = kwargs.get('countmode')
+    by_metadata = kwargs.get('by_metadata')
+
+    def make_total():
+        return 0 if countmode else Counter()
+
+    def add(total, res):
+        if isinstance(res, int):
+            return total + res
+        total.update(res)
+        return total
+
+    def room_for(lines):
+        if maxconc is False or not maxconc:
+            return lines
+        return lines[:max(maxconc - numconc, 0)]
+
+    if by_metadata:
+        results = defaultdict(make_total)
+        conc_results = defaultdict(list)
+    else:
+        results = make_total()
+        conc_results = []
+
+    for chunk in iter_conll(f, chunksize=chunksize, usecols=kwargs.get('usecols')):
+        res, conc_res = pipeline(f, from_df=chunk, metadata=chunk._metadata, **kwargs)
+        if by_metadata:
+            for k, v in res.items():
+                results[k] = add(results[k], v)
+            for k, v in conc_res.items():
+                lines = room_for(v or [])
+                conc_results[k] += lines
+                numconc += len(lines)
+        else:
+            results = add(results, res)
+            lines = room_for(conc_res or [])
+            conc_results += lines
+            numconc += len(lines)
+
+    if by_metadata:
+        return dict(results), dict(conc_results)
+    return results, conc_results
+
+def multi_pipeline(f, searches, **kwargs):
+    """
+    Run a number of named searches over a file, reading the file only once
+
+    :param searches: query names and the search for each
+    :type searches: `OrderedDict`
+
+    :returns: `list` of (name, (results, conc lines)) tuples, in query order
+    """
+    kwargs.pop('stream', None)
+    kwargs.pop('index_hits', None)
+    df = parse_conll(f, usecols=kwargs.get('usecols'), cache=kwargs.get('cache'))
+    if df is None:
+        print('Problem reading data from %s.' % f)
+        empty = ({}, {}) if kwargs.get('by_metadata') else ([], [])
+        return [(name, empty) for name in searches]
+    out = []
+    for name, search in searches.items():
+        # the searches rename and add columns, so each gets its own frame
+        this_df = df.copy()
+        this_df._metadata = df._metadata
+        res = pipeline(f, search=search, from_df=this_df,
+                       metadata=df._metadata, **dict(kwargs))
+        out.append((name, res))
+    return out
+
+def filter_tokens(df, no_punct=True, is_a_word=r'[A-Za-z0-9]', no_closed=False):
+    """
+    Remove the tokens that are never searched or shown: punctuation, unless
+    `no_punct` is False, and closed class words if `no_closed`
+    """
+    if no_punct:
+        df = df[df['w'].fillna('').str.contains(is_a_word)]
+            
+        # remove brackets --- could it be done in one regex?
+        df = df[~df['w'].str.contains(r'^-.*B-$')]
+
+    if no_closed:
+        from corpkit.dictionaries import wordlists
+        crit = wordlists.closedclass.as_regex(boundaries='l', case_sensitive=False)
+        df = df[~df['w'].str.contains(crit)]
+    return df
+
+def conc_contexts(lines, preserve_case=False, **kwargs):
+    """
+    Make the left and right context of concordance lines stored only as
+    their position, reading each file once
+
+    Args:
+        lines (pandas.DataFrame): rows with the filepath (`f`), sentence
+            (`sent`) and token (`token`) of each match
+        preserve_case (bool, optional): Keep the case of the context
+        **kwargs: `no_punct`, `is_a_word` and `no_closed`, as the lines
+            were searched with
+
+    Returns:
+        tuple: lists of left and right context, in line order
+    """
+    left = [''] * len(lines)
+    right = [''] * len(lines)
+    fnames = list(lines['f'].astype(object))
+    order = sorted(range(len(lines)), key=lambda x: fnames[x])
+    sents = lines['sent'].values
+    tokens = lines['token'].values
+    df, current, sent_cache = None, None, {}
+    for n in order:
+        if fnames[n] != current:
+            current = fnames[n]
+            df = parse_conll(current, usecols=[0, 1, 2])
+            if df is not None:
+                df = filter_tokens(df, **kwargs)['w']
+            sent_cache = {}
+        if df is None:
+            continue
+        s, i = int(sents[n]), int(tokens[n])
+        if s not in sent_cache:
+            sent = df.loc[s]
+            sent_cache[s] = sent if preserve_case else sent.str.lower()
+        sent = sent_cache[s]
+        left[n] = ' '.join(sent.loc[:i-1].values)
+        right[n] = ' '.join(sent.loc[i+1:].values)
+    return left, right
+
 def pipeline(f=False,
              search=False,
              show=False,
@@ -1118,11 +1735,33 @@ def pipeline(f=False,
     if isinstance(show, str):
         show = [show]
 
+    # representative mentions can be in any sentence, so corefs need the whole
+    # file; adjacent tokens, n-grams and windows can run past the end of a chunk
+    needs_context = coref or any(i.startswith('r') or determine_adjacent(i)[0] for i in show or []) \
+                    or kwargs.get('gramsize', 1) > 1 or kwargs.get('window')
+    if kwargs.get('stream') and (from_df is False or from_df is None) and not needs_context:
+        return stream_pipeline(f,
+                               search=search,
+                               show=show,
+                               exclude=exclude,
+                               searchmode=searchmode,
+                               excludemode=excludemode,
+                               conc=conc,
+                               just_metadata=just_metadata,
+                               skip_metadata=skip_metadata,
+                               category=category,
+                               show_conc_metadata=show_conc_metadata,
+                               statsmode=statsmode,
+                               search_trees=search_trees,
+                               lem_instance=lem_instance,
+                               **kwargs)
+    kwargs.pop('stream', None)
+
     all_matches = []
     all_exclude = []
 
     if from_df is False or from_df is None:
-        df = parse_conll(f, usecols=kwargs.get('usecols'))
+        df = parse_conll(f, usecols=kwargs.get('usecols'), cache=kwargs.get('cache'))
         # can fail here if df is none
         if df is None:
             print('Problem reading data from %s.' % f)
@@ -1152,8 +1791,10 @@ def pipeline(f=False,
         concresultdict = {}
         # get all the possible values in the df for the feature of interest
         all_cats = set([i.get(feature, 'none') for i in list(df._metadata.values())])
+        frame = metadata_frame(df._metadata, [feature])
         for category in all_cats:
-            new_df = cut_df_by_metadata(df, df._metadata, category, feature=feature, method='just')
+            new_df = cut_df_by_metadata(df, df._metadata, category, feature=feature,
+                                        method='just', frame=frame)
             r, c = searcher(f=False,
                             fname=f,
                             search=search,
@@ -1193,16 +1834,9 @@ def pipeline(f=False,
                              "Try the corpus.conll_conform() method to " \
                              "convert the corpus to the latest format.")
 
-    if kwargs.get('no_punct', True):
-        df = df[df['w'].fillna('').str.contains(kwargs.get('is_a_word', r'[A-Za-z0-9]'))]
-            
-        # remove brackets --- could it be done in one regex?
-        df = df[~df['w'].str.contains(r'^-.*B-$')]
-
-    if kwargs.get('no_closed'):
-        from corpkit.dictionaries import wordlists
-        crit = wordlists.closedclass.as_regex(boundaries='l', case_sensitive=False)
-        df = df[~df['w'].str.contains(crit)]
+    df = filter_tokens(df, no_punct=kwargs.get('no_punct', True),
+                       is_a_word=kwargs.get('is_a_word', r'[A-Za-z0-9]'),
+                       no_closed=kwargs.get('no_closed'))
 
     if statsmode:
         return get_stats(df, metadata, False, root=kwargs.pop('root', False), **kwargs)
@@ -1226,9 +1860,15 @@ def pipeline(f=False,
                         and list(search.values())[0].pattern == r'.*':
         all_matches = list(df.index)
     else:
+        # matches already found in the corpus index need no searching
+        index_hits = kwargs.pop('index_hits', None) or {}
+        present = set(df.index) if index_hits else None
         for k, v in search.items():
-            adj, k = determine_adjacent(k)
-            res = search_this(df, k[0], k[-1], v, adjacent=adj, coref=coref)
+            if k in index_hits:
+                res = [r for r in index_hits[k] if r in present]
+            else:
+                adj, k = determine_adjacent(k)
+                res = search_this(df, k[0], k[-1], v, adjacent=adj, coref=coref)
             for r in res:
                 all_matches.append(r)
         all_matches = remove_by_mode(all_matches, searchmode, search)
@@ -1,5 +1,6 @@
 import sys
 import codecs
+import os
 
 # python 2/3 coompatibility
 PYTHON_VERSION = sys.version_info.major
@@ -77,4 +78,30 @@ CORENLP_URL  = 'http://nlp.stanford.edu/software/stanford-corenlp-full-2016-10-3
 
 # it can be very slow to load a bunch of unused metadata categories
 MAX_METADATA_FIELDS = 99
-MAX_METADATA_VALUES = 99
\ No newline at end of file
+MAX_METADATA_VALUES = 99
+
+# parsed conll files can be stored as binary column arrays here, so that
+# they don't need to be parsed from text every time they are searched
+CONLL_CACHE_DIR = os.path.join('data', '.cache')
+
+# interrogations run with cache_results=True are kept here, up to a size
+# limit in bytes, after which the least recently used are removed
+RESULT_CACHE_DIR = os.path.join('data', '.results')
+RESULT_CACHE_SIZE = 500 * 1024 * 1024
+
+# tregex queries go to a long-lived java process (see corpkit.tregex).
+# set TREGEX_WORKER to False to run tregex.sh for every query instead
+TREGEX_WORKER = True
+TREGEX_WORKER_MEMORY = '500m'
+
+# per-file results of interrogations run with incremental=True
+PARTIAL_RESULTS_DIR = os.path.join('data', '.partials')
+
+# parse trees flattened into arrays, saved by build_cache or with cache=True
+TREE_STORE_DIR = os.path.join('data', '.trees')
+
+# reference frequency lists for keyness, as memory-mapped vocab/count arrays
+REFERENCE_DIR = os.path.join('data', '.references')
+
+# number of sentences held in memory at once when streaming a CONLL file
+STREAM_CHUNKSIZE = 1000
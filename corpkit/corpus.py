@@ -247,6 +247,99 @@ class Corpus(object):
             with OPENER(f, 'w', encoding='utf-8') as fo:
                 fo.write('\n'.join(fdata))
 
+    def build_cache(self, rebuild=False):
+        """
+        Store each parsed file in the corpus as binary column arrays, so that
+        later interrogations can load files without parsing their text.
+        The parse trees of each file are stored too, as flat arrays used by
+        tgrep searches.
+
+        Cached files are used automatically by
+        :func:`~corpkit.corpus.Corpus.interrogate` and
+        :func:`~corpkit.corpus.File.document`. A cache is ignored, and can
+        be rebuilt, once its file is modified.
+
+        :Example:
+
+        >>> corpus.build_cache()
+        >>> corpus.interrogate({W: r'^t'})
+
+        :param rebuild: Rebuild the cache even for files that already have one
+        :type rebuild: `bool`
+
+        :returns: `None`
+        """
+        from corpkit.conll import parse_conll
+        from corpkit.store import write_conll_cache
+        from corpkit.treestore import write_tree_store, read_tree_store
+        if self.datatype != 'conll':
+            raise ValueError('Only parsed or tokenised corpora can be cached.')
+        fs = self.all_filepaths
+        for i, f in enumerate(fs, start=1):
+            if self.print_info:
+                print('Caching %s/%s' % (i, len(fs)))
+            if rebuild:
+                write_conll_cache(f)
+            metadata = parse_conll(f, just_meta=True, cache=True)
+            if rebuild or read_tree_store(f) is None:
+                write_tree_store(f, metadata=metadata)
+
+    def build_index(self):
+        """
+        Make an inverted index of the words, lemmata, POS tags, functions and
+        NER tags in the corpus, saved in `data/` next to the corpus dotfile.
+
+        Once built, :func:`~corpkit.corpus.Corpus.interrogate` uses the index
+        to skip files that cannot match, and to find matches without
+        scanning every token. Files modified after indexing are searched as
+        normal. Pass `use_index=False` to `interrogate` to ignore the index.
+
+        :Example:
+
+        >>> corpus.build_index()
+        >>> corpus.interrogate({L: 'sociolinguistics'})
+
+        :returns: path to the index file
+        """
+        from corpkit.index import build_index
+        if self.datatype != 'conll':
+            raise ValueError('Only parsed or tokenised corpora can be indexed.')
+        return build_index(self, print_info=self.print_info)
+
+    def build_ngram_index(self, layers=['w', 'l', 'p']):
+        """
+        Make a suffix-array index of the word, lemma and POS layers of the
+        corpus, saved in `data/` next to the corpus dotfile. N-gram frequency
+        tables, and the count, positions and concordance of any n-gram, can
+        then be read from the index without searching the corpus files.
+        N-grams never cross sentence or subcorpus boundaries.
+
+        :Example:
+
+        >>> corpus.build_ngram_index()
+        >>> ngrams = corpus.ngram_index
+        >>> ngrams.table(gramsize=3, layer='l').results
+        >>> ngrams.count('in the')
+        >>> ngrams.contexts('in the', window=5)
+
+        :param layers: CONLL columns to index
+        :type layers: `list`
+        :returns: path to the index directory
+        """
+        from corpkit.ngramindex import build_ngram_index
+        if self.datatype != 'conll':
+            raise ValueError('Only parsed or tokenised corpora can be indexed.')
+        return build_ngram_index(self, layers=layers, print_info=self.print_info)
+
+    @property
+    def ngram_index(self):
+        """
+        The corpus' n-gram index, or `None` if it has not been built, or a
+        file has been added, changed or removed since. See :func:`~corpkit.corpus.Corpus.build_ngram_index`
+        """
+        from corpkit.ngramindex import load_ngram_index
+        return load_ngram_index(self)
+
     @lazyprop
     def all_files(self):
         """
@@ -289,6 +382,47 @@ class Corpus(object):
         #todo: subcorpora names are lost?
         return vectoriser, vec
 
+    def collocates(self, search, window=4, show=['w'], min_freq=2, sort_by='ll', **kwargs):
+        """
+        Find the collocates of matches, scored by mutual information
+        (`mi`), t-score (`t`), log-Dice (`logdice`) and log-likelihood
+        (`ll`). Pairs are counted in one interrogation, and the frequency of
+        each collocate is read from the n-gram index if one has been built
+        for the layer in `show` (see
+        :func:`~corpkit.corpus.Corpus.build_ngram_index`), or else counted
+        with a second interrogation.
+
+        :Example:
+
+        >>> colls = corpus.collocates({L: 'risk'}, window=4, show=[L], min_freq=3)
+        >>> colls[colls['count'] > 10].sort_values('logdice').head()
+
+        :param window: Tokens to look at either side of each match
+        :type window: `int`
+        :param min_freq: Drop pairs seen fewer times, before scoring
+        :type min_freq: `int`
+        :param sort_by: Measure to sort by
+        :type sort_by: `str`
+
+        Other arguments go to :func:`~corpkit.corpus.Corpus.interrogate`.
+
+        :returns: `pandas.DataFrame` with a row per pair
+        """
+        if isinstance(show, STRINGTYPE):
+            show = [show]
+        preserve_case = kwargs.get('preserve_case', False)
+        pairs = self.interrogate(search, show=show, window=window, **kwargs)
+
+        frequencies = None
+        layers = [s[-1] for s in show]
+        index = self.ngram_index if len(layers) == 1 else None
+        if index is not None and layers[0] in index.layers:
+            frequencies = index.table(1, layer=layers[0], preserve_case=preserve_case)
+        if frequencies is None:
+            kwa = {k: v for k, v in kwargs.items() if k not in ['conc', 'no_punct', 'exclude']}
+            frequencies = self.interrogate({'w': 'any'}, show=show, no_punct=False, **kwa)
+        return pairs.collocates(frequencies, min_freq=min_freq, sort_by=sort_by)
+
 
     def __str__(self):
         """
@@ -370,7 +504,8 @@ class Corpus(object):
     def features(self):
         """
         Generate and show basic stats from the corpus, including number of 
-        sentences, clauses, process types, etc.
+        sentences, clauses, process types, etc. The clause and process
+        patterns are all matched in a single pass over each file's trees.
 
         :Example:
 
@@ -509,6 +644,27 @@ class Corpus(object):
             add_df_to_dotfile(self.path, lexi, typ='lexicon', subcorpora=self.symbolic)
             return lexi
 
+    def save_reference(self, name=None):
+        """
+        Store the corpus lexicon as a reference corpus for keyness, as
+        memory-mapped arrays in `data/`. Once saved, it is loaded once per
+        session, however many times it is used.
+
+        :Example:
+
+        >>> reference = corpus.save_reference()
+        >>> other.interrogate({W: 'any'}).edit('k', reference)
+
+        :param name: Name to store the reference under, by default the
+                     corpus name
+        :type name: `str`
+        :returns: the name, which can be passed as a reference corpus
+        """
+        from corpkit.reference import save_reference
+        name = name or self.name
+        save_reference(self.lexicon, name)
+        return name
+
     def configurations(self, search, **kwargs):
         """
         Get the overall behaviour of tokens or lemmas matching a regular 
@@ -679,12 +835,20 @@ class Corpus(object):
                      completion
         :type save: `str`
 
-        :param gramsize: Size of n-grams (default 1, i.e. unigrams)
+        :param gramsize: Size of n-grams (default 1, i.e. unigrams). N-grams
+                         do not run across sentence boundaries: positions
+                         outside the sentence are shown as `none`.
         :type gramsize: `int`
 
-        :param multiprocess: How many parallel processes to run
+        :param multiprocess: How many parallel processes to run. Files are
+                             shared out between processes largest first, so
+                             uneven subcorpora don't leave processes idle
         :type multiprocess: `int`/`bool` (`bool` determines automatically)
 
+        :param file_scheduler: When multiprocessing, share out work by file
+                               rather than one process per subcorpus
+        :type file_scheduler: `bool`
+
         :param files_as_subcorpora: (**Deprecated, use subcorpora=files**). Treat each file as a subcorpus, ignoring 
                                     actual subcorpora if present
         :type files_as_subcorpora: `bool`
@@ -723,12 +887,65 @@ class Corpus(object):
                         of results (i.e. 0.1 will remove 10 per cent)
         :type discard: ``int``/``float``
 
+        :param cache: Build a binary cache of each file as it is read, so that
+                      later interrogations can skip parsing the CONLL text,
+                      and save the trees of files searched with tgrep.
+                      Existing caches are used whatever this is set to, unless
+                      it is `False`. See :func:`~corpkit.corpus.Corpus.build_cache`.
+        :type cache: ``bool``
+
+        :param stream: Read each file a chunk of sentences at a time, adding
+                       up counts as it goes, to keep memory use low for very
+                       large files. Pass an `int` to set the number of
+                       sentences per chunk. Coreference searches, and those
+                       showing adjacent tokens, n-grams or collocates, still
+                       read whole files.
+        :type stream: ``bool``/``int``
+
+        :param sparse: Keep results as a sparse matrix, for searches with very
+                       many distinct results, such as n-grams. `edit`, `rel`
+                       and `topwords` work without making it dense; use
+                       `results.to_frame()` or `results[entries]` for pandas
+                       objects. Needs `scipy`.
+        :type sparse: ``bool``
+
+        :param cache_results: Store the result on disk, and load it instead of
+                              searching again when the same query is run on
+                              the unchanged corpus, even in a later session.
+                              Stored results are dropped when the corpus
+                              metadata is deleted.
+        :type cache_results: ``bool``
+
+        :param incremental: Keep the results of each file on disk. When the
+                            query is run again, only files that are new or
+                            have changed are searched, and removed files are
+                            dropped.
+        :type incremental: ``bool``
+
+        :param single_pass: When `search` is a dict of named queries, read each
+                            file once and run all of the queries on it, rather
+                            than interrogating the corpus once per query. Not
+                            used for tree searches, or when `multiprocess` is
+                            set, as each query then runs in its own process.
+        :type single_pass: ``bool``
+
         :returns: A :class:`corpkit.interrogation.Interrogation` object, with 
                   `.query`, `.results`, `.totals` attributes. If multiprocessing is 
                   invoked, result may be multiindexed.
         """
         from corpkit.interrogator import interrogator
         import pandas as pd
+
+        # the same search of an unchanged corpus can be loaded from disk
+        if kwargs.pop('cache_results', False):
+            from corpkit.memo import result_key, load_result, store_result
+            key = result_key(self, search, *args, **kwargs)
+            res = load_result(self, key)
+            if res is None:
+                res = self.interrogate(search, *args, **kwargs)
+                store_result(self, key, res)
+            return res
+
         par = kwargs.pop('multiprocess', None)
         kwargs.pop('corpus', None)
 
@@ -763,20 +980,15 @@ class Corpus(object):
 
         kwargs.pop('subcorpora', False)
 
-        if par and self.subcorpora:
-            if isinstance(par, int):
-                kwargs['multiprocess'] = par
-            res = interrogator(self.subcorpora, search,
-                                subcorpora=subcorpora, *args, **kwargs)
-        else:
-            kwargs['multiprocess'] = par
-            res = interrogator(self, search,
-                                subcorpora=subcorpora, *args, **kwargs)
+        # the interrogator decides how to share the corpus between processes
+        kwargs['multiprocess'] = par
+        res = interrogator(self, search,
+                            subcorpora=subcorpora, *args, **kwargs)
 
         if kwargs.get('conc', False) == 'only':
             return res
 
-        from corpkit.interrogation import Interrodict
+        from corpkit.interrogation import Interrodict, SparseResults
         if isinstance(res, Interrodict) and kwargs.get('use_interrodict'):
             return res
         elif isinstance(res, Interrodict) and not kwargs.get('use_interrodict', False):
@@ -797,6 +1009,15 @@ class Corpus(object):
                 longest = max([len(str(i)) if str(i).isdigit() else 1 for i in ind])
                 res.results.index = [str(i).zfill(longest) for i in ind]
                 res.results = res.results.sort_index().astype(int)
+        elif isinstance(res.results, SparseResults):
+            # the same order as dense results, without making them dense
+            if res.results.shape[1]:
+                order = res.results.sum().sort_values(ascending=False).index
+                res.results = res.results.take(columns=res.results.columns.get_indexer(order))
+            if ind and all(i == 'none' or str(i).isdigit() for i in ind):
+                longest = max([len(str(i)) if str(i).isdigit() else 1 for i in ind])
+                res.results.index = pd.Index([str(i).zfill(longest) for i in ind])
+                res.results = res.results.take(rows=res.results.index.argsort())
         else:
             show = res.query.get('show', [])
             outs = []
@@ -848,9 +1069,12 @@ class Corpus(object):
 
     def delete_metadata(self):
         """
-        Delete metadata for corpus. May be needed if corpus is changed
+        Delete metadata for corpus. May be needed if corpus is changed.
+        Stored interrogation results for the corpus are deleted too.
         """
         import os
+        from corpkit.memo import delete_results
+        delete_results(self)
         os.remove(os.path.join('data', '.%s.json' % self.name))
 
     @lazyprop
@@ -1019,10 +1243,25 @@ class Corpus(object):
         :param only_unique: Return only unique lines
         :type only_unique: `bool`
 
-        :param maxconc: Maximum number of concordance lines
+        :param maxconc: Maximum number of concordance lines. Files stop being
+                        read once this many lines have been found, also when
+                        multiprocessing
         :type maxconc: `int`
 
-        :returns: A :class:`corpkit.interrogation.Concordance` instance, with 
+        :param file_order: Order to search files in: `'random'` across the
+                           corpus, or `'stratified'`, shuffled within each
+                           subcorpus and interleaved by subcorpus size, so
+                           that `maxconc` lines are a fair sample. By default,
+                           files are searched in order
+        :type file_order: `str`
+
+        :param lazy_conc: Keep only the position of each match, and make the
+                          left and right context from the corpus when lines
+                          are formatted or rendered. Returns a
+                          :class:`corpkit.interrogation.LazyConcordance`
+        :type lazy_conc: `bool`
+
+        :returns: A :class:`corpkit.interrogation.Concordance` instance, with
                   columns showing filename, subcorpus name, speaker name, left 
                   context, match and right context.
         """
@@ -1266,10 +1505,12 @@ class File(Corpus):
         Get an OrderedDict of Tree objects in a File
         """
         if self.datatype == 'conll':
-            from nltk import Tree
             from collections import OrderedDict
-            return OrderedDict({k: Tree.fromstring(v['parse']) \
-                                for k, v in sorted(self.document._metadata.items())})
+            from corpkit.treestore import load_tree_store
+            store = load_tree_store(self.path)
+            if store is None:
+                return OrderedDict()
+            return OrderedDict((k, store.tree(k)[0]) for k in sorted(store.sents))
         else:
             raise AttributeError('Data must be parsed to get trees.')
 
@@ -130,6 +130,31 @@ def editor(interrogation,
     else:
         dataframe1 = interrogation
 
+    # sparse results can be filtered, scaled and sorted as they are. for
+    # anything else, filtering first leaves less to turn into a DataFrame
+    from corpkit.interrogation import SparseResults
+    if isinstance(dataframe1, SparseResults):
+        dataframe1 = filter_sparse(dataframe1,
+                                   just_entries=just_entries,
+                                   skip_entries=skip_entries,
+                                   just_subcorpora=just_subcorpora,
+                                   skip_subcorpora=skip_subcorpora)
+        unsupported = [merge_entries, merge_subcorpora, replace_names,
+                       replace_subcorpus_names, projection, just_totals,
+                       keep_stats, remove_above_p, spelling, kwargs]
+        sparse_sorts = [False, True, 'total', 'most', 'infreq', 'least', 'name', 'reverse']
+        if operation in [None, '%', '/', '*'] and sort_by in sparse_sorts \
+            and not any(unsupported) and not isinstance(denominator, DataFrame):
+            return edit_sparse(interrogation, dataframe1,
+                               operation=operation,
+                               denominator=denominator,
+                               sort_by=sort_by,
+                               keep_top=keep_top,
+                               span_entries=span_entries,
+                               span_subcorpora=span_subcorpora,
+                               query=locs)
+        dataframe1 = dataframe1.to_frame()
+
     the_time_started = strftime("%Y-%m-%d %H:%M:%S")
 
     pd.options.mode.chained_assignment = None
@@ -621,53 +646,20 @@ def editor(interrogation,
         return_conc = True
     # do concordance work
     if return_conc:
-        if just_entries:
-            if isinstance(just_entries, int):
-                just_entries = [just_entries]
-            if isinstance(just_entries, STRINGTYPE):
-                df = df[df['m'].str.contains(just_entries)]
-            if isinstance(just_entries, list):
-                if all(isinstance(e, STRINGTYPE) for e in just_entries):
-                    mp = df['m'].map(lambda x: x in just_entries)
-                    df = df[mp]
-                else:
-                    df = df.ix[just_entries]
-
-        if skip_entries:
-            if isinstance(skip_entries, int):
-                skip_entries = [skip_entries]
-            if isinstance(skip_entries, STRINGTYPE):
-                df = df[~df['m'].str.contains(skip_entries)]
-            if isinstance(skip_entries, list):
-                if all(isinstance(e, STRINGTYPE) for e in skip_entries):
-                    mp = df['m'].map(lambda x: x not in skip_entries)
-                    df = df[mp]
-                else:
-                    df = df.drop(skip_entries, axis=0)
-
-        if just_subcorpora:
-            if isinstance(just_subcorpora, int):
-                just_subcorpora = [just_subcorpora]
-            if isinstance(just_subcorpora, STRINGTYPE):
-                df = df[df['c'].str.contains(just_subcorpora)]
-            if isinstance(just_subcorpora, list):
-                if all(isinstance(e, STRINGTYPE) for e in just_subcorpora):
-                    mp = df['c'].map(lambda x: x in just_subcorpora)
-                    df = df[mp]
-                else:
-                    df = df.ix[just_subcorpora]
-
-        if skip_subcorpora:
-            if isinstance(skip_subcorpora, int):
-                skip_subcorpora = [skip_subcorpora]
-            if isinstance(skip_subcorpora, STRINGTYPE):
-                df = df[~df['c'].str.contains(skip_subcorpora)]
-            if isinstance(skip_subcorpora, list):
-                if all(isinstance(e, STRINGTYPE) for e in skip_subcorpora):
-                    mp = df['c'].map(lambda x: x not in skip_subcorpora)
-                    df = df[mp]
-                else:
-                    df = df.drop(skip_subcorpora, axis=0)
+        # each distinct match or subcorpus name is tested once, by category
+        for crit, col, keep in [(just_entries, 'm', True),
+                                (skip_entries, 'm', False),
+                                (just_subcorpora, 'c', True),
+                                (skip_subcorpora, 'c', False)]:
+            if not crit:
+                continue
+            if isinstance(crit, int):
+                crit = [crit]
+            if isinstance(crit, list) and not all(isinstance(e, STRINGTYPE) for e in crit):
+                df = df.ix[crit] if keep else df.drop(crit, axis=0)
+                continue
+            mask = category_mask(df[col], crit)
+            df = df[mask] if keep else df[~mask]
 
         return Concordance(df)
 
@@ -944,10 +936,10 @@ def editor(interrogation,
     lns = None
     if isinstance(getattr(interrogation, 'concordance', None), Concordance):
         try:
-            col_crit = interrogation.concordance['m'].map(lambda x: x in list(df.columns))
-            ind_crit = interrogation.concordance['c'].map(lambda x: x in list(df.index))
-            lns = interrogation.concordance[col_crit]
-            lns = lns.loc[ind_crit]
+            conc = interrogation.concordance
+            keep = category_mask(conc['m'], list(df.columns)) & \
+                   category_mask(conc['c'], list(df.index))
+            lns = conc[keep]
             lns = Concordance(lns)
         except ValueError:
             lns = None
@@ -963,3 +955,118 @@ def editor(interrogation,
 
 
 
+
+def category_mask(ser, crit):
+    """
+    Find the rows of a column whose value matches a regex, or is in a list,
+    testing each distinct value only once via category codes
+
+    :returns: `numpy.ndarray` of `bool`
+    """
+    import numpy as np
+    from corpkit.dictionaries.process_types import Wordlist
+    if ser.dtype.name != 'category':
+        ser = ser.astype('category')
+    cats = ser.cat.categories
+    if isinstance(crit, (list, Wordlist)):
+        hit = np.asarray(cats.isin(list(crit)), dtype=bool)
+    else:
+        hit = np.asarray(cats.astype(str).str.contains(crit), dtype=bool)
+    # missing values have code -1, and match nothing
+    return np.append(hit, False)[np.asarray(ser.cat.codes)]
+
+def filter_sparse(results, just_entries=False, skip_entries=False,
+                  just_subcorpora=False, skip_subcorpora=False):
+    """
+    Keep or skip entries and subcorpora of sparse results, by name or regex
+
+    :returns: :class:`corpkit.interrogation.SparseResults`
+    """
+    import numpy as np
+    from corpkit.dictionaries.process_types import Wordlist
+
+    def matches(labels, crit):
+        if isinstance(crit, (list, Wordlist)):
+            return np.asarray(labels.isin(list(crit)))
+        return np.asarray(labels.str.contains(crit), dtype=bool)
+
+    cols = np.ones(len(results.columns), dtype=bool)
+    if skip_entries:
+        cols &= ~matches(results.columns, skip_entries)
+    if just_entries:
+        cols &= matches(results.columns, just_entries)
+    rows = np.ones(len(results.index), dtype=bool)
+    if skip_subcorpora:
+        rows &= ~matches(results.index, skip_subcorpora)
+    if just_subcorpora:
+        rows &= matches(results.index, just_subcorpora)
+    if cols.all() and rows.all():
+        return results
+    return results.take(rows=np.flatnonzero(rows), columns=np.flatnonzero(cols))
+
+def edit_sparse(interrogation, results, operation=None, denominator=False,
+                sort_by=False, keep_top=False, span_entries=False,
+                span_subcorpora=False, query=None):
+    """
+    Do relative frequencies, sorting and trimming without making sparse
+    results dense
+
+    :returns: :class:`corpkit.interrogation.Interrogation` with
+              :class:`corpkit.interrogation.SparseResults` as results
+    """
+    import numpy as np
+    import pandas as pd
+    from scipy.sparse import diags
+    from corpkit.interrogation import Interrogation, SparseResults, Concordance
+
+    if span_entries:
+        results = results.take(columns=np.arange(len(results.columns))[span_entries[0]:span_entries[1]])
+    if span_subcorpora:
+        results = results.take(rows=np.arange(len(results.index))[span_subcorpora[0]:span_subcorpora[1]])
+
+    mat = results.matrix
+    totals = results.sum(axis=1)
+    if operation is not None:
+        if denominator.__class__ == Interrogation:
+            denominator = denominator.totals
+        if isinstance(denominator, pd.Series):
+            denom = denominator.reindex(results.index).values.astype(float)
+        else:
+            denom = np.asarray(mat.sum(axis=1)).ravel().astype(float)
+        grand = float(mat.sum())
+        colsums = results.sum()
+        if operation == '*':
+            totals = colsums * grand
+            scale = denom
+        else:
+            with np.errstate(divide='ignore'):
+                scale = np.where(denom == 0, 0.0, 1.0 / denom)
+            totals = colsums / grand
+            if operation == '%':
+                totals = totals * 100.0
+                scale = scale * 100.0
+        mat = diags(scale).dot(mat).tocsr()
+
+    columns = np.arange(mat.shape[1])
+    sort_by = {'most': 'total', True: 'total', 'least': 'infreq'}.get(sort_by, sort_by)
+    if sort_by in ['total', 'infreq']:
+        sums = np.asarray(mat.sum(axis=0)).ravel()
+        columns = np.argsort(-sums if sort_by == 'total' else sums, kind='mergesort')
+    elif sort_by == 'name':
+        columns = np.argsort(np.asarray(results.columns, dtype=object).astype(str), kind='mergesort')
+    elif sort_by == 'reverse':
+        columns = columns[::-1]
+    if keep_top:
+        columns = columns[:keep_top]
+
+    out = SparseResults(mat, results.index, results.columns).take(columns=columns)
+    if operation is not None:
+        totals = totals.reindex(out.columns)
+
+    lns = None
+    conc = getattr(interrogation, 'concordance', None)
+    if isinstance(conc, Concordance):
+        keep = conc['m'].isin(out.columns) & conc['c'].isin(out.index)
+        lns = Concordance(conc[keep])
+
+    return Interrogation(results=out, totals=totals, query=query, concordance=lns)
@@ -0,0 +1,259 @@
+"""
+corpkit: inverted index of token values in a parsed corpus
+
+For each of the word, lemma, POS, function and NER columns, the index maps
+every value to the (file, sentence, token) positions where it occurs. A search
+pattern is matched against the much smaller set of distinct values, so that
+files that cannot match are never opened, and matching tokens are known
+before a file is read.
+"""
+
+from __future__ import print_function
+
+# columns that are worth indexing: the rest are numbers or derived values
+INDEXED_COLUMNS = ['w', 'l', 'p', 'f', 'e']
+
+def index_path(corpus):
+    """
+    Get the path of the index file for a corpus, next to its dotfile
+
+    :param corpus: Path to corpus, or Corpus object
+    :type corpus: `str/Corpus`
+
+    :returns: `str` -- path in data directory
+    """
+    import os
+    path = getattr(corpus, 'path', corpus)
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.join('data', '.%s.index.npz' % name)
+
+def build_index(corpus, print_info=False):
+    """
+    Make an inverted index for a parsed corpus and save it in data/
+
+    :param corpus: Path to corpus, or Corpus object
+    :type corpus: `str/Corpus`
+
+    :param print_info: Show progress
+    :type print_info: `bool`
+
+    :returns: `str` -- path of the index file
+    """
+    import os
+    import numpy as np
+    import pandas as pd
+    from corpkit.conll import parse_conll
+    from corpkit.store import file_fingerprint
+    from corpkit.process import atomic_path
+
+    if not hasattr(corpus, 'all_filepaths'):
+        from corpkit.corpus import Corpus
+        corpus = Corpus(corpus, print_info=False)
+    root = os.path.abspath(corpus.path)
+    fps = list(corpus.all_filepaths)
+
+    names = []
+    fingerprints = []
+    values = {col: [] for col in INDEXED_COLUMNS}
+    places = {col: [] for col in INDEXED_COLUMNS}
+
+    for fileno, f in enumerate(fps, start=1):
+        if print_info:
+            print('Indexing %s/%s' % (fileno, len(fps)), end='\r')
+        df = parse_conll(f)
+        names.append(os.path.relpath(os.path.abspath(f), root))
+        fingerprints.append(file_fingerprint(f))
+        if df is None:
+            continue
+        sents = np.asarray(df.index.get_level_values('s'), dtype=np.int32)
+        toks = np.asarray(df.index.get_level_values('i'), dtype=np.int32)
+        for col in INDEXED_COLUMNS:
+            if col not in df.columns:
+                continue
+            ser = df[col]
+            keep = ser.notnull().values
+            values[col].append(ser.values[keep].astype(str))
+            fids = np.full(keep.sum(), fileno - 1, dtype=np.int32)
+            places[col].append(np.column_stack([fids, sents[keep], toks[keep]]))
+
+    arrays = {'_root': np.array(root),
+              '_files': np.array(names),
+              '_fingerprints': np.array(fingerprints, dtype=float).reshape(-1, 2)}
+
+    for col in INDEXED_COLUMNS:
+        if not values[col]:
+            continue
+        vals = np.concatenate(values[col])
+        posts = np.concatenate(places[col])
+        codes, vocab = pd.factorize(vals, sort=True)
+        # postings are grouped by value, then in corpus order within a value
+        order = np.lexsort((posts[:, 2], posts[:, 1], posts[:, 0], codes))
+        arrays[col + '.vocab'] = np.array(vocab, dtype=str)
+        arrays[col + '.offsets'] = np.searchsorted(codes[order], np.arange(len(vocab) + 1))
+        arrays[col + '.postings'] = posts[order]
+
+    path = index_path(corpus)
+    with atomic_path(path) as tmp:
+        with open(tmp, 'wb') as fo:
+            np.savez(fo, **arrays)
+    if print_info:
+        print('\nIndex saved to %s' % path)
+    return path
+
+def load_index(corpus):
+    """
+    Load the inverted index for a corpus, if one has been built
+
+    A subcorpus or file is looked up under the corpus containing it. An
+    index is only used if it was built for that very corpus, as indexes are
+    named after the corpus directory alone.
+
+    :param corpus: Path or corpus object
+    :type corpus: `str/Corpus/Subcorpus/File`
+
+    :returns: `CorpusIndex` -- or None if no index exists
+    """
+    import os
+    path = os.path.abspath(getattr(corpus, 'path', corpus))
+    # walk up from a file or subcorpus to the corpus that was indexed
+    for level in range(3):
+        ipath = index_path(path)
+        if os.path.isfile(ipath):
+            index = CorpusIndex(ipath, path)
+            # older indexes do not know their root: trust only an exact match
+            if index.stored_root == path or (index.stored_root is None and not level):
+                return index
+        path = os.path.dirname(path)
+
+def delete_index(corpus):
+    """
+    Remove the inverted index for a corpus, if there is one
+    """
+    import os
+    path = index_path(corpus)
+    if os.path.isfile(path):
+        os.remove(path)
+
+def is_indexable(pattern):
+    """
+    Can a search pattern be answered from the index?
+
+    Patterns that match the empty string would also match missing values,
+    which are not indexed, so these are left to the regular search.
+    """
+    if not hasattr(pattern, 'search'):
+        return False
+    return not pattern.search('')
+
+class CorpusIndex(object):
+    """
+    A loaded inverted index. Columns are read from disk when first searched.
+    """
+
+    def __init__(self, path, root):
+        import numpy as np
+        self.path = path
+        self.root = root
+        self._npz = np.load(path)
+        self.stored_root = str(self._npz['_root']) if '_root' in self._npz.files else None
+        self.files = {str(n): i for i, n in enumerate(self._npz['_files'])}
+        self.fingerprints = self._npz['_fingerprints']
+        self._columns = {}
+        self._lookups = {}
+        self._valid = {}
+
+    def _column(self, col):
+        if col not in self._columns:
+            if col + '.vocab' not in self._npz.files:
+                self._columns[col] = None
+            else:
+                self._columns[col] = (self._npz[col + '.vocab'],
+                                      self._npz[col + '.offsets'],
+                                      self._npz[col + '.postings'])
+        return self._columns[col]
+
+    def file_id(self, f):
+        """
+        Get the number of a file in the index, or None if the file is not
+        indexed or has changed since indexing
+        """
+        import os
+        from corpkit.store import file_fingerprint
+        name = os.path.relpath(os.path.abspath(f), self.root)
+        fid = self.files.get(name)
+        if fid is None:
+            return
+        if fid not in self._valid:
+            mtime, size = self.fingerprints[fid]
+            self._valid[fid] = file_fingerprint(f) == (float(mtime), int(size))
+        return fid if self._valid[fid] else None
+
+    def lookup(self, col, pattern):
+        """
+        Find every position whose value in `col` matches a compiled regex
+
+        :returns: `dict` -- file number -> list of (sent, token) tuples, or None if
+                  the pattern or column can't be looked up
+        """
+        import numpy as np
+        from collections import defaultdict
+
+        if col not in INDEXED_COLUMNS or not is_indexable(pattern):
+            return
+        key = (col, pattern.pattern, pattern.flags)
+        if key in self._lookups:
+            return self._lookups[key]
+        column = self._column(col)
+        if column is None:
+            return
+        vocab, offsets, postings = column
+        matching = [n for n, v in enumerate(vocab) if pattern.search(v)]
+        out = defaultdict(list)
+        if matching:
+            chunks = [postings[offsets[n]:offsets[n+1]] for n in matching]
+            for fid, s, i in np.concatenate(chunks).tolist():
+                out[fid].append((s, i))
+        self._lookups[key] = out
+        return out
+
+    def search(self, f, search):
+        """
+        Get matching token positions in a file for each search criterion
+
+        :param f: Filepath of CONLL file
+        :type f: `str`
+
+        :param search: Search as formatted by `corpkit.process.fix_search`
+        :type search: `dict`
+
+        :returns: `dict` -- search key -> list of (sent, token) for the criteria that
+                  could be looked up, or None if the file isn't in the index
+        """
+        fid = self.file_id(f)
+        if fid is None or not isinstance(search, dict):
+            return
+        hits = {}
+        for k, v in search.items():
+            found = self.lookup(k[-1], v)
+            if found is not None:
+                hits[k] = found.get(fid, [])
+        return hits
+
+def cannot_match(hits, search, searchmode='all'):
+    """
+    Decide from index hits whether a file can be skipped entirely
+    """
+    if not hits:
+        return False
+    if searchmode == 'all':
+        return any(not v for v in hits.values())
+    return len(hits) == len(search) and all(not v for v in hits.values())
+
+def seeds_from_hits(hits):
+    """
+    Keep just the hits that are themselves the matches, i.e. for criteria on
+    the match rather than its governor, dependent or a neighbouring token
+    """
+    if not hits:
+        return {}
+    return {k: v for k, v in hits.items() if len(k) == 2 and k[0] == 'm'}
@@ -386,13 +386,17 @@ class Interrogation(object):
 
     def save(self, savename, savedir='saved_interrogations', **kwargs):
         """
-        Save an interrogation as pickle to ``savedir``.
+        Save an interrogation as pickle to ``savedir``, or, with
+        ``columnar=True``, as arrays that are loaded lazily. See
+        :func:`~corpkit.other.save`.
 
         :Example:
         
         >>> o = corpus.interrogate(W, 'any')
         ### create ./saved_interrogations/savename.p
         >>> o.save('savename')
+        ### create ./saved_interrogations/savename
+        >>> o.save('savename', columnar=True)
         
         :param savename: A name for the saved file
         :type savename: `str`
@@ -402,6 +406,11 @@ class Interrogation(object):
         
         :param print_info: Show/hide stdout
         :type print_info: `bool`
+
+        :param columnar: Save a directory of arrays rather than a pickle.
+                         Only results saved this way are loaded lazily, and
+                         so quickly, by :func:`~corpkit.other.load_all_results`
+        :type columnar: `bool`
         
         :returns: None
         """
@@ -481,6 +490,39 @@ class Interrogation(object):
     def keyness(self, measure='ll', denominator='self', **kwargs):
         return self.edit('k', denominator, **kwargs)
 
+    def collocates(self, frequencies, min_freq=2, sort_by='ll'):
+        """
+        Score the `node/collocate` pairs of an interrogation made with
+        `window`, by mutual information (`mi`), t-score (`t`), log-Dice
+        (`logdice`) and log-likelihood (`ll`).
+
+        :Example:
+
+        >>> pairs = corpus.interrogate({W: 'risk'}, show=[L], window=4)
+        >>> lexicon = corpus.interrogate({W: 'any'}, show=[L], no_punct=False)
+        >>> pairs.collocates(lexicon, min_freq=3).head()
+
+        :param frequencies: Frequency of every token in the corpus, shown the
+                            same way as the pairs
+        :type frequencies: :class:`corpkit.interrogation.Interrogation`/`pandas.Series`
+        :param min_freq: Drop pairs seen fewer times, before scoring
+        :type min_freq: `int`
+        :param sort_by: Measure to sort by
+        :type sort_by: `str`
+
+        :returns: `pandas.DataFrame` with a row per pair
+        """
+        from corpkit.collocation import collocation_table
+        window = self.query.get('window') if self.query else None
+        if not window:
+            raise ValueError('Collocates need an interrogation made with `window`.')
+        if isinstance(frequencies, Interrogation):
+            frequencies = frequencies.results.sum()
+        elif isinstance(frequencies, pd.DataFrame):
+            frequencies = frequencies.sum()
+        return collocation_table(self.results.sum(), frequencies, window,
+                                 min_freq=min_freq, sort_by=sort_by)
+
     def multiindex(self, indexnames=None):
         """Create a `pandas.MultiIndex` object from slash-separated results.
 
@@ -582,15 +624,187 @@ class Interrogation(object):
         from corpkit.stats import shannon
         return shannon(self)
 
+class _SavedBranch(object):
+    """
+    An attribute of a saved interrogation, read from disk when first used
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.name not in obj._loaded:
+            from corpkit.resultstore import _read_branch
+            obj._loaded[self.name] = _read_branch(obj._path, obj._prefix + self.name,
+                                                  obj._spec[self.name])
+        return obj._loaded[self.name]
+
+    def __set__(self, obj, value):
+        obj._loaded[self.name] = value
+
+class SavedInterrogation(Interrogation):
+    """
+    An :class:`corpkit.interrogation.Interrogation` whose results, totals,
+    concordance and query are read from a result saved with
+    ``columnar=True`` only when used
+    """
+
+    results = _SavedBranch('results')
+    totals = _SavedBranch('totals')
+    query = _SavedBranch('query')
+    concordance = _SavedBranch('concordance')
+
+    def __init__(self, path, spec, prefix=''):
+        self._path = path
+        self._spec = spec
+        self._prefix = prefix
+        self._loaded = {}
+
+    def __reduce__(self):
+        # pickled, it is an ordinary interrogation
+        return (Interrogation, (self.results, self.totals, self.query, self.concordance))
+
+class SparseResults(object):
+    """
+    Results kept as a `scipy.sparse` matrix of subcorpora by entries, for
+    interrogations with too many distinct results to fit in a `DataFrame`.
+    Entries are looked up by name in a vocabulary index; getting them back
+    gives ordinary `pandas` objects.
+
+    :Example:
+
+    >>> data = corpus.interrogate({W: r'.*'}, show=[W, '+1mw', '+2mw'], sparse=True)
+    >>> data.results
+    <SparseResults: 12 subcorpora x 2,304,712 entries, 3,998,141 non-zero>
+    >>> data.results[['of/the/country', 'in/the/world']]
+    """
+
+    def __init__(self, matrix, index, columns):
+        from scipy.sparse import csr_matrix
+        self.matrix = csr_matrix(matrix)
+        """`scipy.sparse.csr_matrix` of counts, one row per subcorpus"""
+        self.index = pd.Index(index)
+        """subcorpus names"""
+        self.columns = pd.Index(columns)
+        """entry names, the vocabulary of the matrix columns"""
+
+    def __repr__(self):
+        return "<%s: %s subcorpora x %s entries, %s non-zero>" % (classname(self),
+            format(self.shape[0], ','), format(self.shape[1], ','), format(self.matrix.nnz, ','))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def __getitem__(self, key):
+        """
+        Get one entry as a `Series`, or a list of them as a `DataFrame`
+        """
+        if isinstance(key, (list, tuple, pd.Index)):
+            locs = self.columns.get_indexer(list(key))
+            if (locs < 0).any():
+                raise KeyError([k for k, l in zip(key, locs) if l < 0])
+            return pd.DataFrame(self.matrix[:, locs].toarray(),
+                                index=self.index, columns=self.columns[locs])
+        loc = self.columns.get_loc(key)
+        return pd.Series(self.matrix[:, loc].toarray().ravel(), index=self.index, name=key)
+
+    def row(self, key):
+        """
+        Get the entries that occur in one subcorpus, and their counts
+
+        :param key: Subcorpus name
+        :type key: `str`
+        :returns: `pandas.Series`
+        """
+        n = self.index.get_loc(key)
+        start, end = self.matrix.indptr[n], self.matrix.indptr[n+1]
+        return pd.Series(self.matrix.data[start:end],
+                         index=self.columns[self.matrix.indices[start:end]], name=key)
+
+    def sum(self, axis=0):
+        """
+        Sum over subcorpora, giving a total for each entry, or over
+        entries (`axis=1`), giving a total for each subcorpus
+
+        :returns: `pandas.Series`
+        """
+        if axis in [0, 'index']:
+            return pd.Series(self.matrix.sum(axis=0).A1, index=self.columns)
+        return pd.Series(self.matrix.sum(axis=1).A1, index=self.index)
+
+    def take(self, rows=None, columns=None):
+        """
+        Keep some subcorpora and/or entries, by position
+
+        :returns: :class:`corpkit.interrogation.SparseResults`
+        """
+        mat, index, cols = self.matrix, self.index, self.columns
+        if rows is not None:
+            mat, index = mat[rows], index[rows]
+        if columns is not None:
+            mat, cols = mat[:, columns], cols[columns]
+        return SparseResults(mat, index, cols)
+
+    def merge_rows(self, labels):
+        """
+        Add together the subcorpora that share a label
+
+        :param labels: A new name for each subcorpus
+        :type labels: `list`
+        :returns: :class:`corpkit.interrogation.SparseResults`, sorted by label
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
+        codes, names = pd.factorize(pd.Index(labels), sort=True)
+        groups = csr_matrix((np.ones(len(codes), dtype=self.matrix.dtype), (codes, np.arange(len(codes)))),
+                            shape=(len(names), len(codes)))
+        return SparseResults(groups.dot(self.matrix), names, self.columns)
+
+    def to_frame(self):
+        """
+        Make a dense `DataFrame`. For big results, select entries first!
+
+        :returns: `pandas.DataFrame`
+        """
+        return pd.DataFrame(self.matrix.toarray(), index=self.index, columns=self.columns)
+
 class Concordance(pd.core.frame.DataFrame):
     """
     A class for concordance lines, with methods for saving, formatting and editing.
+
+    Subcorpus, file, speaker, match and metadata columns are held as
+    categories, and so is left and right context that repeats enough.
     """
     
     def __init__(self, data):
 
         super(Concordance, self).__init__(data)
-        self.concordance = data
+        self._compact()
+
+    @property
+    def concordance(self):
+        """The lines themselves, for code written for older versions"""
+        return self
+
+    def _compact(self):
+        """
+        Store repeated strings once each, as categories
+        """
+        for col in self.columns:
+            if col in ['i', 'sent', 'token'] or self[col].dtype.name == 'category':
+                continue
+            if col in ['l', 'r'] and self[col].nunique() > len(self) // 2:
+                continue
+            self[col] = self[col].astype('category')
 
     def format(self, kind='string', n=100, window=35,
                print_it=True, columns='all', metadata=True, **kwargs):
@@ -666,6 +880,18 @@ class Concordance(pd.core.frame.DataFrame):
         from corpkit.editor import editor
         return editor(self, *args, **kwargs)
 
+    def save(self, savename, savedir='saved_interrogations', **kwargs):
+        """
+        Save concordance lines to `savedir`. See :func:`~corpkit.other.save`.
+
+        :param savename: A name for the saved file
+        :type savename: `str`
+
+        :returns: None
+        """
+        from corpkit.other import save
+        save(self, savename, savedir=savedir, **kwargs)
+
     def __str__(self):
         return self.format(print_it=False)
 
@@ -676,6 +902,73 @@ class Concordance(pd.core.frame.DataFrame):
         import pydoc
         pydoc.pipepager(self.format(print_it=False, **kwargs), cmd='less -X -R -S')
 
+class LazyConcordance(Concordance):
+    """
+    Concordance lines held as the position of each match: its file,
+    sentence and token, with the match and its metadata as categories. The
+    left and right context is made from the file only for the lines being
+    formatted or rendered.
+    """
+
+    _metadata = ['context']
+
+    def __init__(self, data, context=None):
+
+        super(Concordance, self).__init__(data)
+        if context is not None:
+            self.context = context
+            # lines put together from several objects lose their categories
+            self._compact()
+
+    @property
+    def _constructor(self):
+        return LazyConcordance
+
+    def render(self, n=False):
+        """
+        Make an ordinary :class:`corpkit.interrogation.Concordance` from
+        these lines, reading their context from the corpus files
+
+        :param n: Render first `n` lines only
+        :type n: `int`/`'all'`
+        :returns: :class:`corpkit.interrogation.Concordance`
+        """
+        from corpkit.conll import conc_contexts
+        lines = self.head(n) if isinstance(n, int) and not isinstance(n, bool) else self
+        left, right = conc_contexts(lines, **(self.context or {}))
+        index = lines['sent'].astype(str) + ',' + lines['token'].astype(str)
+        data = OrderedDict([('i', index)])
+        meta = [c for c in lines.columns if c not in ['sent', 'token', 'c', 'f', 's', 'm']]
+        for col in ['c', 'f', 's', 'l', 'm', 'r'] + meta:
+            if col == 'l':
+                data[col] = left
+            elif col == 'r':
+                data[col] = right
+            elif col in lines.columns:
+                data[col] = lines[col].astype(object).values
+        return Concordance(pd.DataFrame(data, index=lines.index))
+
+    def format(self, kind='string', n=100, window=35,
+               print_it=True, columns='all', metadata=True, **kwargs):
+        """
+        Print concordance lines nicely, to string, LaTeX or CSV, making the
+        context of just the lines shown. See
+        :func:`~corpkit.interrogation.Concordance.format`
+        """
+        return self.render(n).format(kind=kind, n=n, window=window, print_it=print_it,
+                                     columns=columns, metadata=metadata, **kwargs)
+
+    def edit(self, *args, **kwargs):
+        """
+        Delete or keep rows by subcorpus or by middle column text, keeping
+        the lines lazy
+
+        >>> skipped = conc.edit(skip_entries=r'to_?match')
+        """
+        from corpkit.editor import editor
+        edited = editor(self, *args, **kwargs)
+        return self.loc[edited.index]
+
 class Interrodict(OrderedDict):
     """
     A class for interrogations that do not fit in a single-indexed DataFrame.
@@ -701,7 +994,7 @@ class Interrodict(OrderedDict):
             data = OrderedDict(data)
         # attribute access
         for k, v in data.items():
-            setattr(self, makesafe(k), v)
+            setattr(self, makesafe(str(k)), v)
         self.query = None
         super(Interrodict, self).__init__(data)
 
@@ -729,7 +1022,7 @@ class Interrodict(OrderedDict):
 
     def __setitem__(self, key, value):
         from corpkit.process import makesafe
-        setattr(self, makesafe(key), value)
+        setattr(self, makesafe(str(key)), value)
         super(Interrodict, self).__setitem__(key, value)
         
     def __repr__(self):
@@ -842,7 +1135,9 @@ class Interrodict(OrderedDict):
 
     def save(self, savename, savedir='saved_interrogations', **kwargs):
         """
-        Save an interrogation as pickle to `savedir`.
+        Save an interrogation as pickle to `savedir`, or, with
+        `columnar=True`, as arrays that are loaded lazily. See
+        :func:`~corpkit.other.save`.
 
         :param savename: A name for the saved file
         :type savename: `str`
@@ -852,12 +1147,19 @@ class Interrodict(OrderedDict):
         
         :param print_info: Show/hide stdout
         :type print_info: `bool`
+
+        :param columnar: Save a directory of arrays rather than a pickle.
+                         Only results saved this way are loaded lazily, and
+                         so quickly, by :func:`~corpkit.other.load_all_results`
+        :type columnar: `bool`
         
         :Example: 
 
         >>> o = corpus.interrogate(W, 'any')
         ### create ``saved_interrogations/savename.p``
         >>> o.save('savename')
+        ### create ``saved_interrogations/savename``
+        >>> o.save('savename', columnar=True)
 
         :returns: None
         """
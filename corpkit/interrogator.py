@@ -44,6 +44,10 @@ def interrogator(corpus,
     show_conc_metadata = kwargs.pop('show_conc_metadata', False)
     fsi_index = kwargs.pop('fsi_index', True)
     dep_type = kwargs.pop('dep_type', 'collapsed-ccprocessed-dependencies')
+    sparse = kwargs.pop('sparse', False)
+    incremental = kwargs.pop('incremental', False)
+    file_order = kwargs.pop('file_order', False)
+    lazy_conc = kwargs.pop('lazy_conc', False)
 
     nosubmode = subcorpora is None
     #todo: temporary
@@ -73,7 +77,7 @@ def interrogator(corpus,
     from corpkit.other import as_regex
     from corpkit.dictionaries.process_types import Wordlist
     from corpkit.build import check_jdk
-    from corpkit.conll import pipeline
+    from corpkit.conll import pipeline, multi_pipeline
     from corpkit.process import delete_files_and_subcorpora
     
     have_java = check_jdk()
@@ -450,18 +454,21 @@ def interrogator(corpus,
             else:
                 print(welcome)
 
-    def goodbye_printer(return_it=False, only_conc=False):
+    def goodbye_printer(return_it=False, only_conc=False, result=None):
         """Say goodbye before exiting"""
         if not kwargs.get('printstatus', True):
             return
         thetime = strftime("%H:%M:%S", localtime())
         if only_conc:
-            finalstring = '\n\n%s: Concordancing finished! %s results.' % (thetime, format(len(conc_df), ','))
+            finalstring = '\n\n%s: Concordancing finished! %s results.' % (thetime, format(len(result), ','))
         else:
             finalstring = '\n\n%s: Interrogation finished!' % thetime
             if countmode:
-                finalstring += ' %s matches.' % format(tot, ',')
+                finalstring += ' %s matches.' % format(result.totals, ',')
             else:
+                res = result.results
+                numentries = len(res.index) if isinstance(res, Series) else len(res.columns)
+                total_total = res.sum() if isinstance(res, Series) else res.sum().sum()
                 finalstring += ' %s unique results, %s total occurrences.' % (format(numentries, ','), format(total_total, ','))
         if return_it:
             return finalstring
@@ -510,6 +517,9 @@ def interrogator(corpus,
         from corpkit.interrogation import Concordance
         #fsi_place = 2 if fsi_index else 0
 
+        if lazy_conc:
+            return make_lazy_conc(conc_results)
+
         all_conc_lines = []
         for sc_name, resu in sorted(conc_results.items()):
             if only_unique:
@@ -550,6 +560,33 @@ def interrogator(corpus,
             pass
         return conc_df
 
+    def make_lazy_conc(conc_results):
+        """
+        Turn conclines without context into a LazyConcordance: the position
+        of each match as integers, and its labels as categories
+        """
+        from corpkit.interrogation import LazyConcordance
+        lines = []
+        for sc_name, resu in sorted(conc_results.items()):
+            lines.extend(lin + ['none'] * (len(conc_col_names) - len(lin)) for lin in resu)
+        if not lines:
+            return
+        conc_df = DataFrame(lines, columns=conc_col_names)
+        if maxconc:
+            conc_df = conc_df[:maxconc]
+        position = conc_df['i'].str.split(',', expand=True).astype('int32')
+        conc_df.insert(0, 'token', position[1].values)
+        conc_df.insert(0, 'sent', position[0].values)
+        conc_df = conc_df.drop(['i', 'l', 'r'], axis=1)
+        if all(x in ['', 'none'] for x in conc_df['s'].unique()):
+            conc_df = conc_df.drop('s', axis=1)
+        locs['corpus'] = corpus.name
+        context = dict(preserve_case=preserve_case,
+                       no_punct=no_punct,
+                       is_a_word=is_a_word,
+                       no_closed=no_closed)
+        return LazyConcordance(conc_df, context=context)
+
     def lowercase_result(res):
         """      
         Take any result and do spelling/lowercasing if need be
@@ -570,10 +607,11 @@ def interrogator(corpus,
         subc, star, en = 0, 2, 5
         if fsi_index:
             subc, star, en = 2, 4, 7
+        # lazy lines have no context to change yet
         if not preserve_case:
-            line[star:en] = [str(x).lower() for x in line[star:en]]
+            line[star:en] = [x if x is None else str(x).lower() for x in line[star:en]]
         if spelling:
-            line[star:en] = [correct_spelling(str(b)) for b in line[star:en]]
+            line[star:en] = [b if b is None else correct_spelling(str(b)) for b in line[star:en]]
         return line
 
     def make_progress_bar():
@@ -672,17 +710,30 @@ def interrogator(corpus,
     if isinstance(corpus, Corpora):
         im = 'multiplecorpora'
 
-    # split corpus if the user wants multiprocessing but no other iterable
-    if not im and multiprocess:
-        im = 'datalist'
-        if getattr(corpus, 'subcorpora', False):
-            corpus = corpus[:]
-        else:
-            corpus = corpus.files
-
     search = fix_search(search, case_sensitive=case_sensitive, root=root)
     exclude = fix_search(exclude, case_sensitive=case_sensitive, root=root)
 
+    # split corpus if the user wants multiprocessing but no other iterable.
+    # parsed corpora are shared out between processes file by file, so that
+    # one big subcorpus doesn't keep a single process busy
+    file_workers = False
+    if not im and multiprocess:
+        by_file = kwargs.pop('file_scheduler', True)
+        locs.pop('file_scheduler', None)
+        if by_file and getattr(corpus, 'datatype', None) == 'conll' \
+            and not (isinstance(search, dict) and search.get('t')):
+            if multiprocess is True or not isinstance(multiprocess, int):
+                import multiprocessing
+                file_workers = multiprocessing.cpu_count()
+            else:
+                file_workers = multiprocess
+        else:
+            im = 'datalist'
+            if getattr(corpus, 'subcorpora', False):
+                corpus = corpus[:]
+            else:
+                corpus = corpus.files
+
     # if it's already been through pmultiquery, don't do it again
     locs['search'] = search
     locs['exclude'] = exclude
@@ -694,6 +745,19 @@ def interrogator(corpus,
     locs['subcorpora'] = subcorpora
     locs['nosubmode'] = nosubmode
 
+    # pmultiquery can ask for named queries over conll data to be done
+    # together: every file is then read once and all the searches run on it
+    named_searches = False
+    if im == 'namedqueriesmultiple' and kwargs.pop('fan_out_queries', False):
+        from collections import OrderedDict
+        locs.pop('fan_out_queries', None)
+        named_searches = OrderedDict(search)
+        # a combined search, so that every needed column gets parsed
+        search = {}
+        for v in named_searches.values():
+            search.update(v)
+        im = False
+
     # send to multiprocess function
     if im:
         signal.signal(signal.SIGINT, original_sigint)
@@ -718,6 +782,11 @@ def interrogator(corpus,
     count_results = defaultdict(list)
     conc_results = defaultdict(list)
 
+    # each named query collects its own results and concordance count
+    if named_searches:
+        named_results = {name: [defaultdict(Counter), defaultdict(list), defaultdict(list), 0]
+                         for name in named_searches}
+
     # check if just counting, turn off conc if so
     countmode = 'c' in show or 'mc' in show
     if countmode:
@@ -739,6 +808,11 @@ def interrogator(corpus,
         only_conc = False
         conc = False
 
+    # lines can be kept as positions only when their context is made
+    # from the words of the conll file
+    lazy_conc = bool(lazy_conc and conc and not search_trees and not simple_tregex_mode \
+                     and not tree_to_text and only_format_match)
+
     # Set some Tregex-related values
     translated_option = False
     if search.get('t'):
@@ -759,6 +833,33 @@ def interrogator(corpus,
     # make iterable object for corpus interrogation
     to_iterate_over = make_search_iterable(corpus)
 
+    def make_file_order(to_iterate_over):
+        """
+        Decide the order to search files in. By default each subcorpus is
+        searched in turn. 'random' shuffles files across the whole corpus.
+        'stratified' shuffles within each subcorpus, then interleaves the
+        subcorpora in proportion to their size. Either way, a concordance
+        cut short by `maxconc` samples the whole corpus.
+
+        :returns: `list` of ((subcorpus name, path), files) tuples
+        """
+        import random
+        groups = sorted(to_iterate_over.items())
+        if not file_order or tree_to_text or simple_tregex_mode:
+            return groups
+        parts = [[(key, [f]) for f in files] for key, files in groups]
+        for part in parts:
+            random.shuffle(part)
+        if file_order == 'random':
+            flat = [job for part in parts for job in part]
+            random.shuffle(flat)
+            return flat
+        ranked = [((i + 0.5) / len(part), random.random(), job)
+                  for part in parts for i, job in enumerate(part)]
+        return [job for _, _, job in sorted(ranked, key=lambda x: x[:2])]
+
+    file_jobs = make_file_order(to_iterate_over)
+
     try:
         nam = get_ipython().__class__.__name__
         if nam == 'ZMQInteractiveShell':
@@ -782,6 +883,14 @@ def interrogator(corpus,
 
     usecols = auto_usecols(search, exclude, show, kwargs.pop('usecols', None), coref=coref)
 
+    # an inverted index, if built, lets us skip files and find matches quickly
+    corpus_index = None
+    if kwargs.pop('use_index', True) and datatype == 'conll' and not coref \
+        and not statsmode and not search_trees and not search.get('t') \
+        and not named_searches:
+        from corpkit.index import load_index
+        corpus_index = load_index(corpus)
+
     # print welcome message
     welcome_message = welcome_printer(return_it=in_notebook)
 
@@ -793,10 +902,126 @@ def interrogator(corpus,
                                            fsi_index=fsi_index,
                                            simple_tregex_mode=False)
 
- 
+    def check_index(filepath):
+        """
+        Use the corpus index, if any, to find matches in a file
+
+        :returns: `tuple` -- whether the file can be skipped, and the index hits
+        """
+        if corpus_index is None:
+            return False, None
+        from corpkit.index import cannot_match, seeds_from_hits
+        index_hits = corpus_index.search(filepath, search)
+        # with symbolic subcorpora, every file still needs reading
+        # so that empty metadata values get their rows
+        if not subcorpora and cannot_match(index_hits, search, searchmode):
+            return True, None
+        return False, seeds_from_hits(index_hits)
+
+    def make_pipeline_kwargs(filepath, subcorpus_name, index_hits):
+        """
+        Everything the pipeline needs to know to search a file
+        """
+        slow_treg_speaker_guess = kwargs.get('outname', '') if kwargs.get('multispeaker') else ''
+        return dict(show=show,
+                    dep_type=dep_type,
+                    exclude=exclude,
+                    excludemode=excludemode,
+                    searchmode=searchmode,
+                    case_sensitive=case_sensitive,
+                    conc=conc,
+                    only_format_match=only_format_match,
+                    speaker=slow_treg_speaker_guess,
+                    gramsize=gramsize,
+                    no_punct=no_punct,
+                    no_closed=no_closed,
+                    window=window,
+                    filename=filepath,
+                    coref=coref,
+                    countmode=countmode,
+                    # kept per-file results need all their lines
+                    maxconc=(maxconc, 0 if incremental else numconc),
+                    is_a_word=is_a_word,
+                    by_metadata=subcorpora,
+                    show_conc_metadata=show_conc_metadata,
+                    just_metadata=just_metadata,
+                    skip_metadata=skip_metadata,
+                    fsi_index=fsi_index,
+                    category=subcorpus_name,
+                    translated_option=translated_option,
+                    statsmode=statsmode,
+                    preserve_case=preserve_case,
+                    usecols=usecols,
+                    search_trees=search_trees,
+                    lem_instance=lem_instance,
+                    lemtag=lemtag,
+                    index_hits=index_hits,
+                    lazy_conc=lazy_conc,
+                    **kwargs)
+
+    # todo: move this
+    kwargs.pop('by_metadata', None)
+
+    # per-file results from an earlier run of this query, if wanted
+    partials = None
+    if incremental and not (tree_to_text or simple_tregex_mode):
+        from corpkit.memo import partials_key, load_partials, save_partials
+        from corpkit.store import file_fingerprint
+        partial_key = partials_key(make_pipeline_kwargs(None, None, None),
+                                   search, named_searches)
+        partials = load_partials(corpus, partial_key)
+        new_partials = {}
+
+    # with conc='only', stop reading files once there are maxconc lines
+    stop_early = only_conc and maxconc and not named_searches and partials is None
+
+    def quota_met():
+        if not stop_early:
+            return False
+        return numconc >= maxconc
+
+    def stored_results(filepath, subcorpus_name):
+        """
+        Get the kept results of a file, if it is unchanged since they were made
+        """
+        if not partials or filepath not in partials:
+            return
+        fingerprint, category, file_results = partials[filepath]
+        if category == subcorpus_name and fingerprint == file_fingerprint(filepath):
+            return file_results
+
+    # when multiprocessing, every file is searched up front by a pool of
+    # processes. results are then added up below in the usual order
+    pooled = {}
+    if file_workers and not (tree_to_text or simple_tregex_mode):
+        from corpkit.multiprocess import pfilequery, ConcBudget
+        jobs = []
+        for (subcorpus_name, subcorpus_path), files in file_jobs:
+            if nosubmode:
+                subcorpus_name = 'Total'
+            for f in files:
+                skip, index_hits = check_index(f.path)
+                if not skip and stored_results(f.path, subcorpus_name) is None:
+                    jobs.append((f.path, dict(filename=f.path,
+                                              category=subcorpus_name,
+                                              index_hits=index_hits)))
+        common = make_pipeline_kwargs(None, None, None)
+        if not named_searches:
+            common['search'] = search
+        # workers share a line budget, and take files in the order given
+        pool_budget = ConcBudget(maxconc) if stop_early else None
+        try:
+            pooled = pfilequery(jobs, common, file_workers,
+                                named_searches=named_searches, budget=pool_budget)
+        finally:
+            if pool_budget is not None:
+                pool_budget.close()
+
 
     # Iterate over data, doing interrogations
-    for (subcorpus_name, subcorpus_path), files in sorted(to_iterate_over.items()):
+    for (subcorpus_name, subcorpus_path), files in file_jobs:
+        if quota_met():
+            break
         if nosubmode:
             subcorpus_name = 'Total'
 
@@ -858,206 +1083,243 @@ def interrogator(corpus,
             animator(p, current_iter, tstr, **par_args)
             continue
 
-        # todo: move this
-        kwargs.pop('by_metadata', None)
-        
         # conll querying goes by file, not subcorpus
         for f in files:
-            slow_treg_speaker_guess = kwargs.get('outname', '') if kwargs.get('multispeaker') else ''
-            filepath, corefs = f.path, coref
-            res, conc_res = pipeline(filepath, search=search, show=show,
-                                     dep_type=dep_type,
-                                     exclude=exclude,
-                                     excludemode=excludemode,
-                                     searchmode=searchmode,
-                                     case_sensitive=case_sensitive,
-                                     conc=conc,
-                                     only_format_match=only_format_match,
-                                     speaker=slow_treg_speaker_guess,
-                                     gramsize=gramsize,
-                                     no_punct=no_punct,
-                                     no_closed=no_closed,
-                                     window=window,
-                                     filename=f.path,
-                                     coref=corefs,
-                                     countmode=countmode,
-                                     maxconc=(maxconc, numconc),
-                                     is_a_word=is_a_word,
-                                     by_metadata=subcorpora,
-                                     show_conc_metadata=show_conc_metadata,
-                                     just_metadata=just_metadata,
-                                     skip_metadata=skip_metadata,
-                                     fsi_index=fsi_index,
-                                     category=subcorpus_name,
-                                     translated_option=translated_option,
-                                     statsmode=statsmode,
-                                     preserve_case=preserve_case,
-                                     usecols=usecols,
-                                     search_trees=search_trees,
-                                     lem_instance=lem_instance,
-                                     lemtag=lemtag,
-                                     **kwargs)
-
-            if res is None and conc_res is None:
+            if quota_met():
+                break
+            filepath = f.path
+
+            skip, index_hits = check_index(filepath)
+            if skip:
+                if countmode:
+                    count_results[subcorpus_name] += [0]
+                else:
+                    results[subcorpus_name] += Counter()
                 current_iter += 1
                 tstr = '%s%d/%d' % (outn, current_iter + 1, total_files)
                 animator(p, current_iter, tstr, **par_args)
                 continue
 
-            # deal with symbolic structures---that is, rather than adding
-            # results by subcorpora, add them by metadata value
-            # todo: sorting?
-            if subcorpora:
-                for (k, v), concl in zip(res.items(), conc_res.values()):                            
-                    v = lowercase_result(v)
-                    results[k] += Counter(v)
-                    for line in concl:
-                        if maxconc is False or numconc < maxconc:
+            file_results = stored_results(filepath, subcorpus_name)
+            if file_results is not None:
+                pass
+            elif filepath in pooled:
+                file_results = pooled.pop(filepath)
+            else:
+                pipeline_kwargs = make_pipeline_kwargs(filepath, subcorpus_name, index_hits)
+                if named_searches:
+                    file_results = multi_pipeline(filepath, named_searches, **pipeline_kwargs)
+                else:
+                    file_results = [(None, pipeline(filepath, search=search, **pipeline_kwargs))]
+
+            if partials is not None:
+                new_partials[filepath] = (file_fingerprint(filepath), subcorpus_name, file_results)
+
+            for name, (res, conc_res) in file_results:
+
+                # switch to the results of this named query
+                if name is not None:
+                    results, count_results, conc_results, numconc = named_results[name]
+
+                if res is None and conc_res is None:
+                    pass
+
+                # deal with symbolic structures---that is, rather than adding
+                # results by subcorpora, add them by metadata value
+                # todo: sorting?
+                elif subcorpora:
+                    for (k, v), concl in zip(res.items(), conc_res.values()):                            
+                        v = lowercase_result(v)
+                        results[k] += Counter(v)
+                        for line in concl:
+                            if maxconc is False or numconc < maxconc:
+                                line = postprocess_concline(line,
+                                    fsi_index=fsi_index, conc=conc)
+                                conc_results[k].append(line)
+                                numconc += 1
+
+                elif res == 'Bad query':
+                    return 'Bad query'
+
+                elif countmode:
+                    count_results[subcorpus_name] += [res]
+
+                else:
+                    # add filename and do lowercasing for conc
+                    if not no_conc:
+                        for line in conc_res:
                             line = postprocess_concline(line,
                                 fsi_index=fsi_index, conc=conc)
-                            conc_results[k].append(line)
-                            numconc += 1
-                
-                current_iter += 1
-                tstr = '%s%d/%d' % (outn, current_iter + 1, total_files)
-                animator(p, current_iter, tstr, **par_args)
-                continue
+                            if maxconc is False or numconc < maxconc:
+                                conc_results[subcorpus_name].append(line)
+                                numconc += 1
+
+                    # do lowercasing and spelling
+                    if not only_conc:
+                        res = lowercase_result(res)
+                        # discard removes low results, helping with 
+                        # curse of dimensionality
+                        countres = Counter(res)
+                        if isinstance(discard, float):
+                            countres.most_common()
+                            nkeep = len(counter) - len(counter) * discard
+                            countres = Counter({k: v for i, (k, v) in enumerate(countres.most_common()) if i <= nkeep})
+                        elif isinstance(discard, int):
+                            countres = Counter({k: v for k, v in countres.most_common() if v >= discard})
+                        results[subcorpus_name] += countres
+                        #else:
+                        #results[subcorpus_name] += res
+
+                if name is not None:
+                    named_results[name][3] = numconc
 
             # garbage collection needed?
             sents = None
-            corefs = None
-                
-            if res == 'Bad query':
-                return 'Bad query'
-
-            if countmode:
-                count_results[subcorpus_name] += [res]
-
-            else:
-                # add filename and do lowercasing for conc
-                if not no_conc:
-                    for line in conc_res:
-                        line = postprocess_concline(line,
-                            fsi_index=fsi_index, conc=conc)
-                        if maxconc is False or numconc < maxconc:
-                            conc_results[subcorpus_name].append(line)
-                            numconc += 1
-
-                # do lowercasing and spelling
-                if not only_conc:
-                    res = lowercase_result(res)
-                    # discard removes low results, helping with 
-                    # curse of dimensionality
-                    countres = Counter(res)
-                    if isinstance(discard, float):
-                        countres.most_common()
-                        nkeep = len(counter) - len(counter) * discard
-                        countres = Counter({k: v for i, (k, v) in enumerate(countres.most_common()) if i <= nkeep})
-                    elif isinstance(discard, int):
-                        countres = Counter({k: v for k, v in countres.most_common() if v >= discard})
-                    results[subcorpus_name] += countres
-                    #else:
-                    #results[subcorpus_name] += res
 
             # update progress bar
             current_iter += 1
             tstr = '%s%d/%d' % (outn, current_iter + 1, total_files)
             animator(p, current_iter, tstr, **par_args)
 
-    # Get concordances into DataFrame, return if just conc
-    if not no_conc:
-        # fail on this line with typeerror if no results?
-        conc_df = make_conc_obj_from_conclines(conc_results, fsi_index=fsi_index)
-        if only_conc and conc_df is None:
-            return
-        elif only_conc:
-            locs = sanitise_dict(locs)
-            try:
-                conc_df.query = locs
-            except AttributeError:
+    # files no longer in the corpus are dropped from the kept results
+    if partials is not None:
+        save_partials(corpus, partial_key, new_partials)
+
+    def build_interrogation(results, count_results, conc_results, locs):
+        """
+        Turn collected counts and concordance lines into an Interrogation,
+        or a Concordance if only concordancing
+        """
+        # Get concordances into DataFrame, return if just conc
+        if not no_conc:
+            # fail on this line with typeerror if no results?
+            conc_df = make_conc_obj_from_conclines(conc_results, fsi_index=fsi_index)
+            if only_conc and conc_df is None:
+                return
+            elif only_conc:
+                locs = sanitise_dict(locs)
+                try:
+                    conc_df.query = locs
+                except AttributeError:
+                    pass
                 return conc_df
-            if save and not kwargs.get('outname'):
-                if conc_df is not None:
-                    conc_df.save(savename)
-            goodbye_printer(only_conc=True)
-            if not root:
-                signal.signal(signal.SIGINT, original_sigint)            
-            return conc_df
-    else:
-        conc_df = None
+        else:
+            conc_df = None
 
-    # Get interrogation into DataFrame
-    if countmode:
-        df = Series({k: sum(v) for k, v in sorted(count_results.items())})
-        tot = df.sum()
-    else:
-        the_big_dict = {}
-        unique_results = set(item for sublist in list(results.values()) for item in sublist)
-        sortres = sorted(results.items(), key=lambda x: x[0])
-        for word in unique_results:
-            the_big_dict[word] = [subcorp_result[word] for _, subcorp_result in sortres]
-        # turn master dict into dataframe, sorted
-        df = DataFrame(the_big_dict, index=sorted(results.keys()))
-
-        # for ngrams, remove hapaxes
-        #if show_ngram or show_collocates:
-        #    if not language_model:
-        #        df = df[[i for i in list(df.columns) if df[i].sum() > 1]]
-
-        numentries = len(df.columns)
-        tot = df.sum(axis=1)
-        total_total = df.sum().sum()
-
-    # turn df into series if all conditions met
-    conds = [countmode,
-             files_as_subcorpora,
-             subcorpora,
-             kwargs.get('df1_always_df', False)]
-
-    anyxs = [level == 's',
-             singlefile,
-             nosubmode]
-
-    if all(not x for x in conds) and any(x for x in anyxs):
-        df = Series(df.ix[0])
-        df.sort_values(ascending=False, inplace=True)
-        tot = df.sum()
-        numentries = len(df.index)
-        total_total = tot
-
-    # turn data into DF for GUI if need be
-    if isinstance(df, Series) and kwargs.get('df1_always_df', False):
-        total_total = df.sum()
-        df = DataFrame(df)
-        tot = Series(total_total, index=['Total'])
-
-    # if we're doing files as subcorpora,  we can remove the extension etc
-    if isinstance(df, DataFrame) and files_as_subcorpora:
-        df.index = df.index.str.replace(r'(?:-[0-9][0-9][0-9]|)\.txt\.conll.*', '')
-        df = df.groupby(level=0,sort=True).sum()
-
-    if conc_df is not None and conc_df is not False:
-        # removed 'f' from here for now
-        for col in ['c']:
-            for pat in ['.txt', '.conll', '.conllu']:
-                conc_df[col] = conc_df[col].str.replace(pat, '')
-            conc_df[col] = conc_df[col].str.replace(r'-[0-9][0-9][0-9]$', '')
-
-        #df.index = df.index.str.replace('w', 'this')
-
-    # make interrogation object
-    locs['corpus'] = corpus.path
-    locs = sanitise_dict(locs)
-    if nosubmode and isinstance(df, pd.DataFrame):
-        df = df.sum()
-    interro = Interrogation(results=df, totals=tot, query=locs, concordance=conc_df)
+        # Get interrogation into DataFrame
+        if countmode:
+            df = Series({k: sum(v) for k, v in sorted(count_results.items())})
+            tot = df.sum()
+        else:
+            # number every result, and collect (subcorpus, result, count)
+            # triples, so no zeros are stored along the way
+            import numpy as np
+            subcorpus_names = sorted(results.keys())
+            vocab = {}
+            rows, cols, vals = [], [], []
+            for rowno, subcorpus_name in enumerate(subcorpus_names):
+                counts = results[subcorpus_name]
+                rows.extend([rowno] * len(counts))
+                cols.extend(vocab.setdefault(word, len(vocab)) for word in counts)
+                vals.extend(counts.values())
+            shape = (len(subcorpus_names), len(vocab))
+            vals = np.array(vals, dtype=np.int64)
+            words = [None] * len(vocab)
+            for word, colno in vocab.items():
+                words[colno] = word
+
+            # for ngrams, remove hapaxes
+            #if show_ngram or show_collocates:
+            #    if not language_model:
+            #        df = df[[i for i in list(df.columns) if df[i].sum() > 1]]
+
+            if sparse:
+                from scipy.sparse import coo_matrix
+                from corpkit.interrogation import SparseResults
+                matrix = coo_matrix((vals, (rows, cols)), shape=shape).tocsr()
+                df = SparseResults(matrix, subcorpus_names, words)
+            else:
+                # each result appears once per subcorpus, so cells are just set
+                dense = np.zeros(shape, dtype=np.int64)
+                dense[np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)] = vals
+                df = DataFrame(dense, index=subcorpus_names, columns=words)
+
+            tot = df.sum(axis=1)
+
+        # turn df into series if all conditions met
+        conds = [countmode,
+                 files_as_subcorpora,
+                 subcorpora,
+                 kwargs.get('df1_always_df', False)]
+
+        anyxs = [level == 's',
+                 singlefile,
+                 nosubmode]
+
+        if all(not x for x in conds) and any(x for x in anyxs) and not sparse:
+            df = Series(df.ix[0])
+            df.sort_values(ascending=False, inplace=True)
+            tot = df.sum()
+
+        # turn data into DF for GUI if need be
+        if isinstance(df, Series) and kwargs.get('df1_always_df', False):
+            total_total = df.sum()
+            df = DataFrame(df)
+            tot = Series(total_total, index=['Total'])
+
+        # if we're doing files as subcorpora,  we can remove the extension etc
+        if isinstance(df, DataFrame) and files_as_subcorpora:
+            df.index = df.index.str.replace(r'(?:-[0-9][0-9][0-9]|)\.txt\.conll.*', '')
+            df = df.groupby(level=0,sort=True).sum()
+        elif sparse and files_as_subcorpora and not countmode:
+            df = df.merge_rows(df.index.str.replace(r'(?:-[0-9][0-9][0-9]|)\.txt\.conll.*', ''))
+
+        if conc_df is not None and conc_df is not False:
+            # removed 'f' from here for now
+            for col in ['c']:
+                for pat in ['.txt', '.conll', '.conllu']:
+                    conc_df[col] = conc_df[col].str.replace(pat, '')
+                conc_df[col] = conc_df[col].str.replace(r'-[0-9][0-9][0-9]$', '')
+                conc_df[col] = conc_df[col].astype('category')
+
+            #df.index = df.index.str.replace('w', 'this')
+
+        # make interrogation object
+        locs['corpus'] = corpus.path
+        locs = sanitise_dict(locs)
+        if nosubmode and isinstance(df, pd.DataFrame):
+            df = df.sum()
+        return Interrogation(results=df, totals=tot, query=locs, concordance=conc_df)
+
+    # pmultiquery puts these together just as if they were run one by one
+    if named_searches:
+        if not root:
+            signal.signal(signal.SIGINT, original_sigint)
+        interros = []
+        for name, named_search in named_searches.items():
+            qlocs = dict(locs)
+            qlocs['search'] = named_search
+            qlocs['outname'] = name
+            interros.append(build_interrogation(*named_results[name][:3], locs=qlocs))
+        return interros
+
+    interro = build_interrogation(results, count_results, conc_results, locs)
+    if only_conc and interro is None:
+        return
 
     # save it
     if save and not kwargs.get('outname'):
-        print('\n')
+        if not only_conc:
+            print('\n')
         interro.save(savename)
+
+    if only_conc:
+        goodbye_printer(only_conc=True, result=interro)
+        if not root:
+            signal.signal(signal.SIGINT, original_sigint)
+        return interro
     
-    goodbye = goodbye_printer(return_it=in_notebook)
+    goodbye = goodbye_printer(return_it=in_notebook, result=interro)
     if in_notebook:
         try:
             p.children[2].value = goodbye.replace('\n', '')
@@ -3,6 +3,35 @@
 from __future__ import print_function
 from corpkit.constants import STRINGTYPE, PYTHON_VERSION
 
+def log_likelihood_measure(word_in_ref, word_in_target, ref_sum, target_sum):
+    """calc log likelihood keyness, for arrays of counts"""
+    import numpy as np
+    word_in_ref = np.asarray(word_in_ref, dtype=float)
+    word_in_target = np.asarray(word_in_target, dtype=float)
+    neg = (word_in_target / target_sum) < (word_in_ref / ref_sum)
+
+    both = word_in_ref + word_in_target
+    E1 = ref_sum * both / (ref_sum + target_sum)
+    E2 = target_sum * both / (ref_sum + target_sum)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logaE1 = np.where(word_in_ref == 0, 0.0, np.log(word_in_ref / E1))
+        logaE2 = np.where(word_in_target == 0, 0.0, np.log(word_in_target / E2))
+    score = 2 * ((word_in_ref * logaE1) + (word_in_target * logaE2))
+    return np.where(neg, -score, score)
+
+def perc_diff_measure(word_in_ref, word_in_target, ref_sum, target_sum):
+    """calculate using perc diff measure, for arrays of counts"""
+    import numpy as np
+    norm_target = np.asarray(word_in_target, dtype=float) / target_sum
+    norm_ref = np.asarray(word_in_ref, dtype=float) / ref_sum
+    # Gabrielatos and Marchi (2012) do it this way!
+    norm_ref = np.where(norm_ref == 0, 0.00000000000000000000000001, norm_ref)
+    return ((norm_target - norm_ref) * 100.0) / norm_ref
+
+MEASURES = {'ll': log_likelihood_measure,
+            'pd': perc_diff_measure}
+
 def keywords(target_corpus,
              reference_corpus='bnc.p',
              threshold=False,
@@ -12,60 +41,19 @@ def keywords(target_corpus,
              sort_by=False,
              print_info=False,
              **kwargs):
-    """Feed this function some target_corpus and get its keywords"""
-    
+    """
+    Feed this function some target_corpus and get its keywords
+
+    Every subcorpus is scored at once: the target counts are a matrix, the
+    reference a vector aligned to the same words, and selfdrop subtracts each
+    subcorpus' own row of the reference.
+    """
+
+    import numpy as np
     from pandas import DataFrame, Series
-    from collections import Counter
     from corpkit.interrogation import Interrogation
 
-    def data_to_dict(target_corpus):
-        """turn Series/DataFrame into Counter"""
-        if isinstance(target_corpus, Interrogation):
-            if hasattr(target_corpus, 'results'):
-                target_corpus = target_corpus.results
-            else:
-                target_corpus = target_corpus.totals
-        if isinstance(target_corpus, Series):
-            return Counter(target_corpus.to_dict())
-        elif isinstance(target_corpus, DataFrame):
-            return Counter(target_corpus.sum().to_dict())
-        else:
-            return Counter(target_corpus)
-
-    def log_likelihood_measure(word_in_ref, word_in_target, ref_sum, target_sum):
-        """calc log likelihood keyness"""
-        import math
-        neg = (word_in_target / float(target_sum)) < (word_in_ref / float(ref_sum))
-
-        E1 = float(ref_sum)*((float(word_in_ref)+float(word_in_target)) / \
-            (float(ref_sum)+float(target_sum)))
-        E2 = float(target_sum)*((float(word_in_ref)+float(word_in_target)) / \
-            (float(ref_sum)+float(target_sum)))
-        
-        if word_in_ref == 0:
-            logaE1 = 0
-        else:
-            logaE1 = math.log(word_in_ref/E1)
-        if word_in_target == 0:
-            logaE2 = 0
-        else:
-            logaE2 = math.log(word_in_target/E2)
-        score = float(2* ((word_in_ref*logaE1)+(word_in_target*logaE2)))
-        if neg:
-            score = -score
-        return score
-
-    def perc_diff_measure(word_in_ref, word_in_target, ref_sum, target_sum):
-        """calculate using perc diff measure"""
-
-        norm_target = float(word_in_target) / target_sum
-        norm_ref = float(word_in_ref) / ref_sum
-        # Gabrielatos and Marchi (2012) do it this way!
-        if norm_ref == 0:
-            norm_ref = 0.00000000000000000000000001
-        return ((norm_target - norm_ref) * 100.0) / norm_ref
-
-    def set_threshold(threshold):
+    def set_threshold(threshold, totwords):
         """define a threshold"""
         if threshold is False:
             return 0
@@ -78,84 +66,98 @@ def keywords(target_corpus,
                 denominator = 400
             if threshold.startswith('h'):
                 denominator = 100
-            totwords = sum(loaded_ref_corpus.values())
             return float(totwords) / float(denominator)
         else:
             return threshold
 
-    def calc_keywords(target_corpus, reference_corpus):
-        """
-        get keywords in target corpus compared to reference corpus
-        this should probably become some kind of row-wise df.apply method
-        """
-        # get total num words in ref corpus
-        key_scores = {}
-        ref_sum = sum(reference_corpus.values())
-        if isinstance(target_corpus, dict):
-            target_sum = sum(target_corpus.values())
-        if isinstance(target_corpus, Series):
-            target_sum = target_corpus.sum()
-
-        # get words to calculate
-        if calc_all:
-            wordlist = list(set(list(target_corpus.keys()) + list(reference_corpus.keys())))
-        else:
-            wordlist = list(target_corpus.keys())
-        wordlist = [(word, reference_corpus[word]) for word in wordlist]
-        for w, s in wordlist:
-            if s < threshold:
-                global skipped
-                skipped += 1
-                continue
-            word_in_ref = reference_corpus.get(w, 0)
-            word_in_target = target_corpus.get(w, 0)
-            if kwargs.get('only_words_in_both_corpora'):
-                if word_in_ref == 0:
-                    continue
-            score = measure_func(word_in_ref, word_in_target, ref_sum, target_sum)
-            key_scores[w] = score
-        return key_scores
-
-    # load string ref corp 
+    # load string ref corp, once per process
     if isinstance(reference_corpus, STRINGTYPE):
-        from corpkit.other import load
+        from corpkit.reference import load_reference
         ldr = kwargs.get('loaddir', 'dictionaries')
-        reference_corpus = load(reference_corpus, loaddir=ldr)
+        reference_corpus = load_reference(reference_corpus, loaddir=ldr)
 
-    # if a corpus interrogation, assume we want results    
+    # if a corpus interrogation, assume we want results
     if isinstance(target_corpus, Interrogation):
-        reference_corpus = reference_corpus.results
+        target_corpus = target_corpus.results
+    if isinstance(target_corpus, Series):
+        target_corpus = DataFrame([target_corpus])
+    if isinstance(reference_corpus, Interrogation):
+        if hasattr(reference_corpus, 'results'):
+            reference_corpus = reference_corpus.results
+        else:
+            reference_corpus = reference_corpus.totals
+
+    # the reference as one vector, keeping its rows for selfdrop
+    ref_rows = None
+    if isinstance(reference_corpus, DataFrame):
+        ref_rows = reference_corpus
+        ref_total = reference_corpus.sum()
+    elif isinstance(reference_corpus, Series):
+        ref_total = reference_corpus
+    else:
+        ref_total = Series(dict(reference_corpus), dtype=float)
 
-    # turn data into dict
-    loaded_ref_corpus = data_to_dict(reference_corpus)
+    if measure not in MEASURES:
+        raise NotImplementedError("Only 'll' and 'pd' measures defined so far.")
+    measure_func = MEASURES[measure]
+    threshold = set_threshold(threshold, ref_total.sum())
 
+    # reference sizes are taken from the whole reference, before any words
+    # are left out below
     df = target_corpus
-    index_names = list(df.index)
-    results = {}
-    threshold = set_threshold(threshold)
-    global skipped
-    skipped = 0
-
-    # figure out which measure we're using
-    if measure == 'll':
-        measure_func = log_likelihood_measure
-    elif measure == 'pd':
-        measure_func = perc_diff_measure
+    ref_sum = np.repeat(float(ref_total.sum()), len(df))
+    if selfdrop and ref_rows is not None:
+        own_sum = ref_rows.reindex(index=df.index).fillna(0).sum(axis=1).values
+        ref_sum = np.clip(ref_sum - own_sum, 0, None)
+    ref_sum = ref_sum[:, None]
+    target_sum = df.values.sum(axis=1).astype(float)[:, None]
+
+    # only score target words, and reference words that pass the threshold
+    extra = ref_total.index.difference(df.columns)
+    pruned = extra[:0]
+    if calc_all:
+        under = ref_total.reindex(extra).values < threshold
+        pruned, extra = extra[under], extra[~under]
     else:
-        raise NotImplementedError("Only 'll' and 'pd' measures defined so far.")
-
-    for subcorpus in index_names:
-        if selfdrop:
-            ref_calc = loaded_ref_corpus - Counter(reference_corpus.ix[subcorpus].to_dict())
+        extra = extra[:0]
+
+    # align target and reference on the same words, target words first
+    words = df.columns.append(extra)
+    tgt = df.values.astype(float)
+    tgt = np.hstack([tgt, np.zeros((len(df), len(extra)))])
+    ref_vec = ref_total.reindex(words).fillna(0).values.astype(float)
+    ref = np.broadcast_to(ref_vec, tgt.shape)
+    in_ref = np.broadcast_to(words.isin(ref_total.index), tgt.shape)
+    if selfdrop and ref_rows is not None:
+        own = ref_rows.reindex(index=df.index, columns=words).fillna(0).values
+        ref = np.clip(ref - own, 0, None)
+        in_ref = ref > 0
+
+    # decide which cells to score before scoring any of them
+    in_target = np.zeros(tgt.shape, dtype=bool)
+    in_target[:, :len(df.columns)] = True
+    wanted = in_target | in_ref if calc_all else in_target
+    keep = wanted & (ref >= threshold)
+    skipped = int((wanted & ~keep).sum())
+    if print_info and len(pruned):
+        # reference words left out above, counted as if they had been scored
+        if selfdrop and ref_rows is not None:
+            own = ref_rows.reindex(index=df.index, columns=pruned).fillna(0).values
+            skipped += int((ref_total[pruned].values - own > 0).sum())
         else:
-            ref_calc = loaded_ref_corpus
-        results[subcorpus] = calc_keywords(df.ix[subcorpus], ref_calc)
+            skipped += len(df) * len(pruned)
+    if kwargs.get('only_words_in_both_corpora'):
+        keep &= ref > 0
+    cols = keep.any(axis=0)
+    keep = keep[:, cols]
+
+    scores = measure_func(ref[:, cols], tgt[:, cols], ref_sum, target_sum)
+    scores = np.where(keep, scores, np.nan)
 
     if print_info:
         print('Skipped %d entries under threshold (%d)\n' % (skipped, threshold))
 
-    df = DataFrame(results).T
-    df.sort_index()
+    df = DataFrame(scores, index=df.index, columns=words[cols])
     if not sort_by:
         df = df[list(df.sum().sort_values(ascending=False).index)]
     return df
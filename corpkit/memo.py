@@ -0,0 +1,235 @@
+"""
+corpkit: on-disk memoisation of interrogations
+
+A finished interrogation is pickled under a key made from the query and a
+fingerprint of the corpus files, so that running the same search again on an
+unchanged corpus, even in a new session, just loads the earlier result. The
+store is capped in size, dropping the least recently used results first.
+
+Results can also be kept file by file, so that when a corpus grows or
+changes, only the new and changed files need searching again.
+"""
+
+from __future__ import print_function
+
+# arguments that change how an interrogation runs, but not what it finds
+_IGNORED = ['print_info', 'printstatus', 'quiet', 'root', 'note', 'in_notebook',
+            'multiprocess', 'file_scheduler', 'use_index', 'stream', 'cache',
+            'cache_results', 'incremental', 'paralleling', 'denominator',
+            'startnum']
+
+def _normalise(obj):
+    """
+    Turn query arguments into plain values with a stable text form
+    """
+    from corpkit.constants import STRINGTYPE
+    if obj is None or isinstance(obj, (bool, int, float, STRINGTYPE)):
+        return obj
+    # compiled regexes and word list matchers
+    if hasattr(obj, 'pattern') and hasattr(obj, 'flags'):
+        return ['pattern', _normalise(obj.pattern), int(obj.flags)]
+    if isinstance(obj, dict):
+        return sorted([str(k), _normalise(v)] for k, v in obj.items())
+    if isinstance(obj, (set, frozenset)):
+        return sorted(_normalise(i) for i in obj)
+    if isinstance(obj, (list, tuple)):
+        return [_normalise(i) for i in obj]
+    if hasattr(obj, 'path'):
+        return ['path', obj.path]
+    # other objects, like a lemmatiser, are known by their type
+    return getattr(obj, '__name__', type(obj).__name__)
+
+def corpus_key(corpus):
+    """
+    Short id of a corpus location, used to find all its stored results
+    """
+    import os
+    import hashlib
+    path = os.path.abspath(getattr(corpus, 'path', corpus))
+    return hashlib.md5(path.encode('utf-8')).hexdigest()[:12]
+
+def corpus_fingerprint(corpus):
+    """
+    Hash of the path, size and modification time of every file in a corpus
+
+    :returns: `str`
+    """
+    import os
+    import hashlib
+    from corpkit.store import file_fingerprint
+    root = os.path.abspath(corpus.path)
+    if os.path.isfile(root):
+        fps = [root]
+    else:
+        fps = sorted(os.path.abspath(f) for f in corpus.all_filepaths)
+    md5 = hashlib.md5()
+    for f in fps:
+        mtime, size = file_fingerprint(f)
+        md5.update(('%s\t%d\t%r\n' % (os.path.relpath(f, root), size, mtime)).encode('utf-8'))
+    return md5.hexdigest()
+
+def result_key(corpus, search, *args, **kwargs):
+    """
+    Make the key for an interrogation of a corpus
+
+    :param corpus: The corpus being searched
+    :type corpus: :class:`corpkit.corpus.Corpus`
+    :param search: The search, as passed to `interrogate`
+    :param args: Any other arguments to `interrogate`
+    :returns: `str`
+    """
+    import json
+    import hashlib
+    import corpkit
+    query = {k: v for k, v in kwargs.items() if k not in _IGNORED}
+    query['search'] = search
+    query['args'] = list(args)
+    # a corpus object can carry its own filters and subcorpora
+    for attr in ['skip', 'just', 'symbolic', 'level']:
+        query['corpus_' + attr] = getattr(corpus, attr, None)
+    query['version'] = getattr(corpkit, '__version__', '')
+    text = json.dumps(_normalise(query), sort_keys=True, default=str)
+    text += corpus_fingerprint(corpus)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def _result_path(corpus, key):
+    import os
+    from corpkit.constants import RESULT_CACHE_DIR
+    return os.path.join(RESULT_CACHE_DIR, '%s-%s.p' % (corpus_key(corpus), key))
+
+def load_result(corpus, key):
+    """
+    Get a stored interrogation, or None if there isn't one
+    """
+    import os
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    path = _result_path(corpus, key)
+    if not os.path.isfile(path):
+        return
+    try:
+        with open(path, 'rb') as fo:
+            res = pickle.load(fo)
+    except Exception:
+        return
+    # mark as recently used
+    os.utime(path, None)
+    return res
+
+def store_result(corpus, key, res):
+    """
+    Save an interrogation, then drop old ones if over the size limit
+    """
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    from corpkit.process import atomic_path
+    if res is None:
+        return
+    path = _result_path(corpus, key)
+    try:
+        with atomic_path(path) as tmp:
+            with open(tmp, 'wb') as fo:
+                pickle.dump(res, fo, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return
+    evict()
+
+def evict(max_size=None):
+    """
+    Remove least recently used results until the store fits in `max_size`
+    bytes (default `corpkit.constants.RESULT_CACHE_SIZE`)
+    """
+    import os
+    from corpkit.constants import RESULT_CACHE_DIR, RESULT_CACHE_SIZE
+    if max_size is None:
+        max_size = RESULT_CACHE_SIZE
+    if not os.path.isdir(RESULT_CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(RESULT_CACHE_DIR):
+        if not name.endswith('.p'):
+            continue
+        stat = os.stat(os.path.join(RESULT_CACHE_DIR, name))
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_size:
+            break
+        os.remove(os.path.join(RESULT_CACHE_DIR, name))
+        total -= size
+
+def delete_results(corpus=None):
+    """
+    Remove stored interrogations and per-file results of a corpus, or of
+    every corpus
+    """
+    import os
+    from corpkit.constants import RESULT_CACHE_DIR, PARTIAL_RESULTS_DIR
+    prefix = corpus_key(corpus) + '-' if corpus is not None else ''
+    for direc in [RESULT_CACHE_DIR, PARTIAL_RESULTS_DIR]:
+        if not os.path.isdir(direc):
+            continue
+        for name in os.listdir(direc):
+            if name.startswith(prefix):
+                os.remove(os.path.join(direc, name))
+
+def partials_key(pipeline_kwargs, search, named_searches=False):
+    """
+    Make the key for per-file results from the arguments shared by every
+    call to the pipeline
+
+    :returns: `str`
+    """
+    import json
+    import hashlib
+    import corpkit
+    per_file = ['filename', 'category', 'index_hits']
+    query = {k: v for k, v in pipeline_kwargs.items() if k not in _IGNORED + per_file}
+    query['search'] = named_searches or search
+    query['version'] = getattr(corpkit, '__version__', '')
+    text = json.dumps(_normalise(query), sort_keys=True, default=str)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def _partials_path(corpus, key):
+    import os
+    from corpkit.constants import PARTIAL_RESULTS_DIR
+    return os.path.join(PARTIAL_RESULTS_DIR, '%s-%s.p' % (corpus_key(corpus), key))
+
+def load_partials(corpus, key):
+    """
+    Get the per-file results of an earlier run of a query
+
+    :returns: `dict` -- filepath: (fingerprint, subcorpus, pipeline output)
+    """
+    import os
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    path = _partials_path(corpus, key)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, 'rb') as fo:
+            return pickle.load(fo)
+    except Exception:
+        return {}
+
+def save_partials(corpus, key, partials):
+    """
+    Store per-file results, replacing those of the previous run, so that
+    files no longer in the corpus are forgotten
+    """
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    from corpkit.process import atomic_path
+    path = _partials_path(corpus, key)
+    with atomic_path(path) as tmp:
+        with open(tmp, 'wb') as fo:
+            pickle.dump(partials, fo, protocol=pickle.HIGHEST_PROTOCOL)
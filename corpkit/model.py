@@ -9,53 +9,167 @@ from nltk import ngrams, sent_tokenize, word_tokenize
 from corpkit.constants import PYTHON_VERSION, STRINGTYPE
 
 class LanguageModel(object):
+    """
+    An n-gram model held as arrays. Tokens are coded as integers into a sorted
+    vocabulary, and each n-gram of each order is packed into one integer, so
+    that the counts of an order are a sorted key array and an array of counts,
+    looked up by binary search. When the vocabulary is too big for an n-gram
+    to fit in one integer, the keys are records of one code per token
+    instead, which sort and search in the same way.
+
+    Unseen n-grams back off to `alpha` times the score of the n-gram less its
+    first token; unigrams get add-one smoothing.
+    """
+
     def __init__(self, order, alpha, data):
         """
         :param data: a pandas series with multiindex
         """
+        import numpy as np
         self.order = order
         self.alpha = alpha
-        if order > 1:
-            self.backoff = LanguageModel(order - 1, alpha, data)
-            self.lexicon = None
-        else:
-            self.backoff = None
-            self.n = 0
-        from collections import Counter
-        self.counts = Counter()
-        lexicon = set()
-        # below, we make a counter object from the series
-        # it should be fine for simpler show values, but
-        # has some theoretical issues when the model is of
-        # mixed type, such as L, GL, GF, because the backoff
+
+        # each entry's first `order` tokens are its n-gram. this should be
+        # fine for simpler show values, but has some theoretical issues when
+        # the model is of mixed type, such as L, GL, GF, because the backoff
         # involves getting just the first ORDER words ...
-        for index, count in data.iteritems():
-            #gramm = index.split('/')
-            # order == 1 still gives us a tuple for now!
-            cut_index = index[:order]
-            self.counts[cut_index] += count
-            if order == 1:
-                lexicon.add(cut_index)
-                self.n += 1
-        self.v = len(lexicon)
+        index = [tuple(i) if isinstance(i, tuple) else tuple(str(i).split('/'))
+                 for i in data.index]
+        tokens = np.array([i[:order] for i in index], dtype=object).astype(str)
+        tokens = tokens.reshape(len(index), order)
+        self.vocab, codes = np.unique(tokens, return_inverse=True)
+        codes = codes.reshape(tokens.shape)
+
+        weights = np.asarray(data.values, dtype=float)
+        self.keys = {}
+        self.counts = {}
+        for size in range(1, order + 1):
+            keys, inverse = np.unique(self._pack(codes[:, :size]), return_inverse=True)
+            self.keys[size] = keys
+            self.counts[size] = np.bincount(inverse.ravel(), weights=weights,
+                                            minlength=len(keys))
+        # number of entries the model was made from, and of distinct unigrams
+        self.n = len(index)
+        self.v = len(self.keys[1])
+
+    def __setstate__(self, state):
+        """
+        Models pickled before counts were arrays hold a `Counter` for each
+        order, in a chain of backoff models: rebuild them from the top one
+        """
+        if 'keys' in state:
+            self.__dict__.update(state)
+            return
+        import pandas as pd
+        counts = state['counts']
+        data = pd.Series(list(counts.values()), index=pd.Index(list(counts.keys()), tupleize_cols=False))
+        self.__init__(state['order'], state['alpha'], data)
+        self.n = state['n'] if state['backoff'] is None else state['backoff'].n
+
+    def _fits(self, size):
+        """
+        Whether n-grams of this size can be packed into one 64-bit integer
+        """
+        return float(max(len(self.vocab), 1)) ** size < 2 ** 63
+
+    def _pack(self, codes):
+        """
+        Turn rows of token codes into one integer per row, or one record if
+        they would not fit
+        """
+        import numpy as np
+        size = codes.shape[1]
+        if not self._fits(size):
+            packed = np.empty(len(codes), dtype=[('f%d' % col, np.int64) for col in range(size)])
+            for col in range(size):
+                packed['f%d' % col] = codes[:, col]
+            return packed
+        base = max(len(self.vocab), 1)
+        packed = np.zeros(len(codes), dtype=np.int64)
+        for col in range(size):
+            packed = packed * base + codes[:, col]
+        return packed
+
+    def _lookup(self, codes):
+        """
+        Counts of rows of token codes, with -1 for unknown tokens
+        """
+        import numpy as np
+        keys = self.keys[codes.shape[1]]
+        if not len(keys):
+            return np.zeros(len(codes))
+        packed = self._pack(np.where(codes >= 0, codes, 0))
+        pos = np.minimum(np.searchsorted(keys, packed), len(keys) - 1)
+        hit = (codes >= 0).all(axis=1) & (keys[pos] == packed)
+        return np.where(hit, self.counts[codes.shape[1]][pos], 0.0)
+
+    def _probs(self, codes):
+        """
+        Probability of each row of token codes
+        """
+        import numpy as np
+        if codes.shape[1] == 1:
+            # laplace smoothing to handle unknown unigrams
+            return (self._lookup(codes) + 1) / (self.n + self.v)
+        freq = self._lookup(codes)
+        backoff_freq = self._lookup(codes[:, 1:])
+        lower = self._probs(codes[:, 1:])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seen = freq / backoff_freq
+        return np.where((freq == 0) | (backoff_freq == 0), self.alpha * lower, seen)
+
+    def encode(self, words):
+        """
+        Codes of tokens in this model's vocabulary, or -1 if unknown
+        """
+        import numpy as np
+        words = np.asarray(words, dtype=str)
+        if not len(self.vocab):
+            return np.full(words.shape, -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.vocab, words), len(self.vocab) - 1)
+        return np.where(self.vocab[pos] == words, pos, -1)
+
+    def logprobs(self, vocab, codes):
+        """
+        Log probability of many n-grams at once
+
+        :param vocab: tokens that `codes` index into
+        :type vocab: `numpy.ndarray`
+        :param codes: a row of token codes per n-gram
+        :type codes: `numpy.ndarray`
+        :returns: `numpy.ndarray`
+        """
+        import numpy as np
+        mapped = self.encode(vocab)[codes] if len(codes) else codes
+        return np.log(self._probs(mapped))
+
+    def grams(self):
+        """
+        The model's top order n-grams
+
+        :returns: the vocabulary, a row of token codes per n-gram, and the
+                  count of each
+        """
+        import numpy as np
+        base = max(len(self.vocab), 1)
+        keys = self.keys[self.order]
+        codes = np.empty((len(keys), self.order), dtype=np.int64)
+        for col in range(self.order - 1, -1, -1):
+            if not self._fits(self.order):
+                codes[:, col] = keys['f%d' % col]
+                continue
+            codes[:, col] = keys % base
+            keys = keys // base
+        return self.vocab, codes, self.counts[self.order]
 
     def _logprob(self, ngram):
         return math.log(self._prob(ngram))
-    
+
     def _prob(self, ngram):
-        if self.backoff is not None:
-            freq = self.counts[ngram]
-            backoff_freq = self.backoff.counts[ngram[1:]]
-            if freq == 0:
-                return self.alpha * self.backoff._prob(ngram[1:])
-            else:
-                return freq / backoff_freq
-        else:
-            # laplace smoothing to handle unknown unigrams
-            return (self.counts[ngram] + 1) / (self.n + self.v)
+        return float(self._probs(self.encode(list(ngram))[None, :])[0])
 
 class MultiModel(dict):
-    
+
     def __init__(self, data, order, name='', **kwargs):
         import os
         from corpkit.other import load
@@ -78,65 +192,80 @@ class MultiModel(dict):
         """
         Score text against a model
         """
-        # get data into a list of ngram tuples
-        from collections import Counter, OrderedDict
         import pandas as pd
         from corpkit.corpus import Subcorpus, File
         # get subcorpus
         if isinstance(data, Subcorpus):
-            counts = self[data.name].counts
+            query = self[data.name]
         elif isinstance(data, STRINGTYPE) and data in self.keys():
-            counts = self[data].counts 
+            query = self[data]
         #get file
         elif isinstance(data, File) or (isinstance(data, STRINGTYPE) and \
             os.path.isfile(data)):
-            counts = self._turn_file_obj_into_counts(data)
-        # get text
-        #elif isinstance(data, STRINGTYPE) and not \
-        #    os.path.exists(data):
-        #    dat = []
-        #    #sents = sent_tokenize(data)
-        #    #for sent in sents:
-        #    #    dat.append('-spl-it-'.join(word_tokenize(sent)))
-        #    counted_sents = Counter(dat)
-        #    counts = LanguageModel(self.order, kwargs.get('alpha', 0.4), counted_sents).counts
-        tempscores = {}
-        for name, model in self.items():
-            tempscores[name] = self._score_counts_against_model(counts, model)
-        ser = pd.Series(tempscores)
+            query = self._turn_file_obj_into_model(data)
+        names = list(self.keys())
+        ser = pd.Series(self._score_matrix([query])[0], index=names)
+        return self._order_scores(ser)
+
+    def _order_scores(self, ser):
+        """
+        Best scoring model first, and the whole corpus last
+        """
         ser = ser.sort_values(ascending=False)
-        ser['Corpus'] = ser.pop('Corpus')
+        if 'Corpus' in ser.index:
+            ser['Corpus'] = ser.pop('Corpus')
         return ser
 
-    def _score_counts_against_model(self, counts, model):
-        grams = []
-        for k, v in counts.items():
-            for _ in range(v):
-                grams.append(k)
-        slogprob = 0
-        for gram in grams:
-            lb = model._logprob(gram)
-            slogprob += lb
-        return slogprob / len(counts)
-
-    def _turn_file_obj_into_counts(self, data, *args, **kwargs):
+    def _score_matrix(self, queries):
+        """
+        Score the n-grams of some models against every model at once
+
+        Each distinct n-gram is scored once per model, then a sparse matrix of
+        the n-gram counts of each query, over its number of distinct n-grams,
+        weights the scores.
+
+        :param queries: models whose n-grams to score
+        :type queries: `list` of :class:`corpkit.model.LanguageModel`
+        :returns: `numpy.ndarray`, a row per query and a column per model
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        grams = [q.grams() for q in queries]
+        vocab = np.unique(np.concatenate([v for v, _, _ in grams]))
+        rows, owners, weights = [], [], []
+        for i, (qvocab, codes, counts) in enumerate(grams):
+            rows.append(np.searchsorted(vocab, qvocab)[codes] if len(codes) else codes)
+            owners.append(np.full(len(codes), i))
+            weights.append(counts / max(len(codes), 1))
+        width = max(q.order for q in queries)
+        rows = np.concatenate(rows).reshape(-1, width)
+        uniq, inverse = np.unique(rows, axis=0, return_inverse=True)
+        weight = csr_matrix((np.concatenate(weights), (np.concatenate(owners), inverse.ravel())),
+                            shape=(len(queries), len(uniq)))
+        logprobs = np.column_stack([model.logprobs(vocab, uniq) for model in self.values()])
+        return np.asarray(weight.dot(logprobs))
+
+    def _turn_file_obj_into_model(self, data, *args, **kwargs):
         if data.datatype != 'parse':
             data = data.parse(**kwargs)
         kwgs = self.kwargs
         # add kwargs
         res = data.interrogate(**kwgs)
-        model = _make_model_from_interro(res, self.name, order=self.order, 
-                                         nosave=True, singlemod=True, *args, **kwargs)
-        return model.counts
+        return _make_model_from_interro(res, self.name, order=self.order,
+                                        nosave=True, singlemod=True, *args, **kwargs)
 
     def score_subcorpora(self):
+        """
+        Score every subcorpus against every model, in one matrix operation
+
+        :returns: `pandas.DataFrame` with a column for each subcorpus
+        """
         import pandas as pd
-        data = []
-        for subname in self.keys():
-            ser = pd.Series(self.score(subname))
-            ser.name = subname
-            data.append(ser)
-        df = pd.concat(data, axis=1)
+        names = list(self.keys())
+        scores = self._score_matrix(list(self.values()))
+        df = pd.DataFrame(scores.T, index=names, columns=names)
+        df = df.loc[self._order_scores(df[names[0]]).index]
         return df[sorted(df.columns)]
 
 def _make_model_from_interro(self, name, order, **kwargs):
@@ -173,7 +302,7 @@ def _make_model_from_interro(self, name, order, **kwargs):
         model = _train(subc, subname, name, order=order, **kwargs)
         scores[subname] = model
     if singlemod:
-        return scores.values()[0]
+        return list(scores.values())[0]
     mm = MultiModel(scores, order=order, name=name, **kwargs)
     if not os.path.isfile(os.path.join('models', name)):
         from corpkit.other import save
@@ -189,4 +318,3 @@ def _train(data, name, corpusname, order=3, **kwargs):
     print('Making model: %s ... ' % name.replace('.p', ''))
     lm = LanguageModel(order, alpha, data)
     return lm
-
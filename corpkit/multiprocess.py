@@ -117,6 +117,14 @@ def pmultiquery(corpus,
     if multiprocess is False:
         num_cores = 1
 
+    # when not running in parallel, named queries over conll data can share
+    # a single read of each file. in parallel, each query gets a process
+    single_pass = multiple == 'namedqueriesmultiple' \
+                  and not (not root and multiprocess) \
+                  and kwargs.get('single_pass', True) \
+                  and getattr(corpus, 'datatype', None) == 'conll' \
+                  and not any(v.get('t') for v in search.values())
+
     # make sure saves are right type
     if save is True:
         raise ValueError('save must be string when multiprocessing.')
@@ -127,6 +135,8 @@ def pmultiquery(corpus,
     locs['multiprocess'] = False
     locs['df1_always_df'] = False
     locs['files_as_subcorpora'] = False
+    # results are put together as DataFrames
+    locs['sparse'] = False
     locs['corpus'] = corpus
 
     if multiple == 'multiplespeaker':
@@ -242,6 +252,18 @@ def pmultiquery(corpus,
             raise
         if not res:
             failed = True
+    elif single_pass:
+        # one interrogation runs all the searches, reading each file once
+        d = dict(ds[0])
+        d['search'] = search
+        d['outname'] = ''
+        d['fan_out_queries'] = True
+        res = interrogator(**d)
+        if not res:
+            failed = True
+        else:
+            # as below, queries with no concordance lines are dropped
+            res = [i for i in res if i is not None]
     else:
         res = []
         for index, d in enumerate(ds):
@@ -263,20 +285,28 @@ def pmultiquery(corpus,
         qlocs['corpus'] = list([i.path for i in qlocs.get('corpus', [])])
 
     # return just a concordance
-    from corpkit.interrogation import Concordance
+    from corpkit.interrogation import Concordance, LazyConcordance
+
+    def join_concordances(concs, parts):
+        """keep lines lazy if they were made lazily"""
+        lazy = [x for x in parts if isinstance(x, LazyConcordance)]
+        if lazy:
+            return LazyConcordance(concs, context=lazy[0].context)
+        return Concordance(concs)
+
     if kwargs.get('conc') == 'only':
         concs = pd.concat([x for x in res])
         thetime = strftime("%H:%M:%S", localtime())
         concs = concs.reset_index(drop=True)
         if kwargs.get('maxconc'):
             concs = concs[:kwargs.get('maxconc')]
-        lines = Concordance(concs)
+        lines = join_concordances(concs, res)
         
         if save:
             lines.save(save, print_info=print_info)
 
         if print_info:
-            print('\n\n%s: Finished! %d results.\n\n' % (thetime, format(len(concs.index), ',')))
+            print('\n\n%s: Finished! %s results.\n\n' % (thetime, format(len(concs.index), ',')))
 
         return lines
 
@@ -368,7 +398,7 @@ def pmultiquery(corpus,
                 concs = concs.reset_index(drop=True)
                 if kwargs.get('maxconc'):
                     concs = concs[:kwargs.get('maxconc')]
-                out.concordance = Concordance(concs)
+                out.concordance = join_concordances(concs, [x.concordance for x in res])
             except ValueError:
                 out.concordance = None
 
@@ -388,3 +418,153 @@ def pmultiquery(corpus,
         if list(out.results.index) == ['0'] and not kwargs.get('df1_always_df'):
             out.results = out.results.ix[0].sort_index()
         return out
+
+class ConcBudget(object):
+    """
+    A count of concordance lines shared between processes, so that they can
+    all stop once enough lines have been found.
+
+    Each process keeps its own tally in a small file in a temporary
+    directory, so the budget can be pickled and sent to any kind of worker.
+    """
+
+    def __init__(self, limit):
+        import tempfile
+        self.limit = limit
+        self.path = tempfile.mkdtemp(prefix='corpkit-conc-')
+
+    def add(self, n):
+        """
+        Count `n` more lines found by this process
+        """
+        import os
+        from corpkit.process import atomic_path
+        if not n:
+            return
+        fname = os.path.join(self.path, str(os.getpid()))
+        total = self._read(fname) + n
+        # replaced in one go, so readers never see a half-written number
+        with atomic_path(fname) as tmp:
+            with open(tmp, 'w') as fo:
+                fo.write(str(total))
+
+    def _read(self, fname):
+        try:
+            with open(fname) as fo:
+                return int(fo.read() or 0)
+        except (IOError, OSError, ValueError):
+            return 0
+
+    def used(self):
+        """
+        Lines found so far by all processes
+        """
+        import os
+        try:
+            fnames = [f for f in os.listdir(self.path) if not f.endswith('.tmp')]
+        except OSError:
+            return 0
+        return sum(self._read(os.path.join(self.path, f)) for f in fnames)
+
+    def spent(self):
+        return self.used() >= self.limit
+
+    def close(self):
+        import shutil
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def schedule_files(jobs, num_workers, chunks_per_worker=4, by_size=True):
+    """
+    Group files into chunks of work of roughly equal size
+
+    Files are weighted by their size on disk and handed out biggest first,
+    so that a large file is never left until the end. Small files are
+    bundled together to save on communication between processes.
+
+    :param jobs: (filepath, anything) tuples
+    :type jobs: `list`
+    :param num_workers: Number of processes that will share the work
+    :type num_workers: `int`
+    :param chunks_per_worker: Aim for this many chunks per process, so that
+                              processes finishing early can take more work
+    :type chunks_per_worker: `int`
+    :param by_size: Hand out big files first. If `False`, keep the order of
+                    `jobs`
+    :type by_size: `bool`
+    :returns: `list` of lists of jobs
+    """
+    import os
+    sizes = [os.path.getsize(fp) if os.path.isfile(fp) else 0 for fp, _ in jobs]
+    target = sum(sizes) / float(max(num_workers * chunks_per_worker, 1))
+    order = list(range(len(jobs)))
+    if by_size:
+        order = sorted(order, key=lambda i: sizes[i], reverse=True)
+    chunks, current, weight = [], [], 0
+    for i in order:
+        current.append(jobs[i])
+        weight += sizes[i]
+        if weight >= target:
+            chunks.append(current)
+            current, weight = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _search_files(chunk, common, named_searches=False, budget=None):
+    """
+    Run the conll pipeline on a chunk of files, in a worker process
+    """
+    from corpkit.conll import pipeline, multi_pipeline
+    out = []
+    for filepath, kwargs in chunk:
+        # once the shared budget of lines is spent, files are left out, and
+        # searched by the caller only if it still needs lines from them
+        if budget is not None and budget.spent():
+            continue
+        kw = dict(common)
+        kw.update(kwargs)
+        if named_searches:
+            out.append((filepath, multi_pipeline(filepath, named_searches, **kw)))
+        else:
+            res, conc_res = pipeline(filepath, **kw)
+            if budget is not None and conc_res:
+                budget.add(len(conc_res))
+            out.append((filepath, [(None, (res, conc_res))]))
+    return out
+
+def pfilequery(jobs, common, num_workers, named_searches=False, budget=None):
+    """
+    Search many files in parallel, with a queue of work shared between
+    processes rather than a fixed split by subcorpus
+
+    :param jobs: (filepath, kwargs) tuples, with the pipeline arguments
+                 particular to each file
+    :type jobs: `list`
+    :param common: Pipeline arguments shared by every file
+    :type common: `dict`
+    :param num_workers: Number of processes to run
+    :type num_workers: `int`
+    :param named_searches: Searches to run together on each file
+    :type named_searches: `dict`
+    :param budget: Concordance lines wanted in all. Files are then searched
+                   in the order given, and left out of the result once it
+                   is spent
+    :type budget: :class:`corpkit.multiprocess.ConcBudget`
+    :returns: `dict` -- filepath: [(query name, (results, conc lines))].
+              Empty if the arguments cannot be sent to other processes, in
+              which case the caller searches every file itself
+    """
+    from joblib import Parallel, delayed
+    from corpkit.process import canpickle
+
+    if not jobs:
+        return {}
+    # every argument is needed by the pipeline, so none can be left behind
+    if not all(canpickle(v) for v in common.values()) \
+        or (named_searches and not canpickle(named_searches)):
+        return {}
+    chunks = schedule_files(jobs, num_workers, by_size=budget is None)
+    # chunks are sent out as processes become free
+    done = Parallel(n_jobs=min(num_workers, len(chunks)), batch_size=1)(
+        delayed(_search_files)(chunk, common, named_searches, budget) for chunk in chunks)
+    return dict(item for chunk in done for item in chunk)
@@ -0,0 +1,421 @@
+"""
+corpkit: suffix-array index of n-grams in a parsed corpus
+
+Every token of a corpus is given an integer code for each of the word, lemma
+and POS layers, and the codes are laid end to end, with a marker after each
+sentence and a different one after each subcorpus. A suffix array sorts
+every position by the tokens that follow it, so that all occurrences of an
+n-gram sit next to each other: its count and positions take two binary
+searches, and frequency tables of every n-gram take one pass over the array,
+with no files read.
+
+The arrays are saved as ``.npy`` files in ``data/``, next to the corpus
+dotfile, and memory-mapped when loaded.
+"""
+
+from __future__ import print_function
+
+# layers indexed by default; 'w' is always kept, for concordance context
+NGRAM_LAYERS = ['w', 'l', 'p']
+
+# codes below FIRST_CODE are boundary markers
+SENTENCE_END = 0
+SUBCORPUS_END = 1
+FIRST_CODE = 2
+
+def ngram_index_path(corpus):
+    """
+    Get the directory holding the n-gram index of a corpus
+
+    :param corpus: Path to corpus, or Corpus object
+    :type corpus: `str/Corpus`
+
+    :returns: `str` -- path in data directory
+    """
+    import os
+    path = getattr(corpus, 'path', corpus)
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.join('data', '.%s.ngrams' % name)
+
+def suffix_array(tokens):
+    """
+    Sort the suffixes of an integer sequence by prefix doubling
+
+    :param tokens: non-negative integer codes
+    :type tokens: `numpy.ndarray`
+
+    :returns: `numpy.ndarray` -- start position of each suffix, in sorted order
+    """
+    import numpy as np
+    size = len(tokens)
+    rank = np.asarray(tokens, dtype=np.int64)
+    order = np.argsort(rank, kind='stable')
+    step = 1
+    while step < size:
+        # sort by the rank of the first `step` tokens, then the next `step`
+        following = np.full(size, -1, dtype=np.int64)
+        following[:size - step] = rank[step:]
+        order = np.lexsort((following, rank))
+        first, second = rank[order], following[order]
+        changed = np.r_[True, (first[1:] != first[:-1]) | (second[1:] != second[:-1])]
+        rank = np.empty(size, dtype=np.int64)
+        rank[order] = np.cumsum(changed) - 1
+        if changed.all():
+            break
+        step *= 2
+    return order
+
+def build_ngram_index(corpus, layers=None, print_info=False):
+    """
+    Make a suffix-array n-gram index for a parsed corpus and save it in data/
+
+    :param corpus: Path to corpus, or Corpus object
+    :type corpus: `str/Corpus`
+
+    :param layers: Columns to index, by default
+                   `NGRAM_LAYERS`
+    :type layers: `list`
+
+    :param print_info: Show progress
+    :type print_info: `bool`
+
+    :returns: `str` -- path of the index directory
+    """
+    import os
+    import numpy as np
+    import pandas as pd
+    from corpkit.conll import parse_conll
+    from corpkit.store import file_fingerprint
+    from corpkit.process import atomic_path
+
+    if not hasattr(corpus, 'all_filepaths'):
+        from corpkit.corpus import Corpus
+        corpus = Corpus(corpus, print_info=False)
+    layers = list(layers or NGRAM_LAYERS)
+    if 'w' not in layers:
+        layers.insert(0, 'w')
+    root = os.path.abspath(corpus.path)
+    fps = sorted(corpus.all_filepaths, key=lambda f: os.path.relpath(os.path.abspath(f), root))
+
+    names, fingerprints, subcorpora = [], [], []
+    values = {layer: [] for layer in layers}
+    places, subcorpus_ids = [], []
+    for fileno, f in enumerate(fps):
+        if print_info:
+            print('Indexing %s/%s' % (fileno + 1, len(fps)), end='\r')
+        name = os.path.relpath(os.path.abspath(f), root)
+        names.append(name)
+        fingerprints.append(file_fingerprint(f))
+        subcorpus = os.path.dirname(name) or os.path.basename(root)
+        if not subcorpora or subcorpora[-1] != subcorpus:
+            subcorpora.append(subcorpus)
+        df = parse_conll(f)
+        if df is None or df.empty:
+            continue
+        sents = np.asarray(df.index.get_level_values('s'), dtype=np.int32)
+        toks = np.asarray(df.index.get_level_values('i'), dtype=np.int32)
+        # a row for the end of each sentence, holding its marker
+        ends = np.flatnonzero(np.r_[sents[1:] != sents[:-1], True])
+        slots = np.arange(len(sents)) + np.searchsorted(ends, np.arange(len(sents)))
+        size = len(sents) + len(ends)
+        place = np.full((size, 3), -1, dtype=np.int32)
+        place[slots] = np.column_stack([np.full(len(sents), fileno), sents, toks])
+        places.append(place)
+        subcorpus_ids.append(np.full(size, len(subcorpora) - 1, dtype=np.int32))
+        for layer in layers:
+            col = df[layer] if layer in df.columns else pd.Series('none', index=df.index)
+            layer_vals = np.full(size, None, dtype=object)
+            layer_vals[slots] = col.fillna('none').astype(str).values
+            values[layer].append(layer_vals)
+
+    if not places:
+        raise ValueError('No tokens found to index in %s' % corpus.path)
+    places = np.concatenate(places)
+    subcorpus_ids = np.concatenate(subcorpus_ids)
+    is_mark = places[:, 0] == -1
+    # a subcorpus ends where the next token belongs to another one
+    sub_end = np.r_[subcorpus_ids[1:] != subcorpus_ids[:-1], True] & is_mark
+
+    arrays = {'_files': np.array(names),
+              '_fingerprints': np.array(fingerprints, dtype=float).reshape(-1, 2),
+              '_subcorpora': np.array(subcorpora),
+              '_layers': np.array(layers),
+              'places': places,
+              'subcorpus': subcorpus_ids}
+    for layer in layers:
+        vals = np.concatenate(values[layer])
+        codes, vocab = pd.factorize(vals[~is_mark], sort=True)
+        tokens = np.full(len(vals), SENTENCE_END, dtype=np.int32)
+        tokens[~is_mark] = codes + FIRST_CODE
+        tokens[sub_end] = SUBCORPUS_END
+        arrays[layer + '.tokens'] = tokens
+        arrays[layer + '.vocab'] = np.array(vocab, dtype=str)
+        arrays[layer + '.sa'] = suffix_array(tokens).astype(np.int64)
+
+    path = ngram_index_path(corpus)
+    with atomic_path(path, directory=True) as tmp:
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, name + '.npy'), arr)
+    if print_info:
+        print('\nN-gram index saved to %s' % path)
+    return path
+
+def load_ngram_index(corpus):
+    """
+    Memory-map the n-gram index of a corpus
+
+    :param corpus: Path to corpus, or Corpus object
+    :type corpus: `str/Corpus`
+
+    :returns: `NgramIndex` -- or None if there is no index, or a file has been
+              added, changed or removed since it was built
+    """
+    import os
+    path = ngram_index_path(corpus)
+    if not os.path.isdir(path):
+        return
+    if not hasattr(corpus, 'all_filepaths'):
+        from corpkit.corpus import Corpus
+        corpus = Corpus(corpus, print_info=False)
+    index = NgramIndex(path, os.path.abspath(corpus.path))
+    if not index.is_current(corpus.all_filepaths):
+        return
+    return index
+
+def delete_ngram_index(corpus):
+    """
+    Remove the n-gram index of a corpus, if there is one
+    """
+    import os
+    import shutil
+    path = ngram_index_path(corpus)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+class NgramIndex(object):
+    """
+    A loaded n-gram index. Arrays are mapped from disk when first used.
+    """
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = root
+        self._arrays = {}
+        self.files = [str(f) for f in self._load('_files')]
+        self.subcorpora = [str(s) for s in self._load('_subcorpora')]
+        self.layers = [str(l) for l in self._load('_layers')]
+
+    def _load(self, name):
+        import os
+        import numpy as np
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+        return self._arrays[name]
+
+    def _layer(self, layer):
+        if layer not in self.layers:
+            raise ValueError('Layer %s was not indexed. Indexed: %s' % (layer, ', '.join(self.layers)))
+        return self._load(layer + '.tokens'), self._load(layer + '.sa')
+
+    def is_current(self, filepaths=None):
+        """
+        Check that no indexed file has changed or been removed since indexing
+
+        :param filepaths: The corpus' files now. If given, the index must
+                          also hold every one of them, so that new files
+                          are not left out
+        :type filepaths: `list`
+        """
+        import os
+        from corpkit.store import file_fingerprint
+        if filepaths is not None:
+            names = sorted(os.path.relpath(os.path.abspath(f), self.root) for f in filepaths)
+            if names != sorted(self.files):
+                return False
+        fingerprints = self._load('_fingerprints')
+        for name, (mtime, size) in zip(self.files, fingerprints):
+            f = os.path.join(self.root, name)
+            if not os.path.isfile(f) or file_fingerprint(f) != (float(mtime), int(size)):
+                return False
+        return True
+
+    def encode(self, ngram, layer='w'):
+        """
+        Turn an n-gram into codes, or None if a token never occurs
+        """
+        import numpy as np
+        from corpkit.constants import STRINGTYPE
+        if isinstance(ngram, STRINGTYPE):
+            ngram = ngram.split()
+        vocab = self._load(layer + '.vocab')
+        out = []
+        for token in ngram:
+            n = int(np.searchsorted(vocab, token))
+            if n == len(vocab) or vocab[n] != token:
+                return
+            out.append(n + FIRST_CODE)
+        return out
+
+    def _range(self, codes, layer):
+        """
+        Binary search for the block of the suffix array starting with `codes`
+        """
+        tokens, sa = self._layer(layer)
+        size = len(tokens)
+        width = len(codes)
+
+        def prefix(i):
+            start = int(sa[i])
+            return list(tokens[start:min(start + width, size)])
+
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if prefix(mid) < codes:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if prefix(mid)[:width] <= codes:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def count(self, ngram, layer='w'):
+        """
+        Number of occurrences of an n-gram
+
+        :param ngram: Tokens, as a list or separated by spaces.
+                      Matching is exact, and case sensitive.
+        :type ngram: `str/list`
+
+        :param layer: `w`, `l` or `p`, or another indexed column
+        :type layer: `str`
+
+        :returns: `int`
+        """
+        codes = self.encode(ngram, layer)
+        if not codes:
+            return 0
+        start, end = self._range(codes, layer)
+        return end - start
+
+    def positions(self, ngram, layer='w'):
+        """
+        Where an n-gram occurs
+
+        :returns: `pandas.DataFrame` -- with the file, sentence and first token of each
+                  occurrence, in corpus order
+        """
+        import numpy as np
+        import pandas as pd
+        codes = self.encode(ngram, layer)
+        found = np.array([], dtype=np.int64)
+        if codes:
+            start, end = self._range(codes, layer)
+            found = np.sort(np.asarray(self._layer(layer)[1][start:end]))
+        places = self._load('places')[found]
+        return pd.DataFrame({'f': [self.files[i] for i in places[:, 0]],
+                             's': places[:, 1],
+                             'i': places[:, 2]},
+                            columns=['f', 's', 'i'])
+
+    def table(self, gramsize=2, layer='w', preserve_case=False):
+        """
+        Count every n-gram in every subcorpus
+
+        :param gramsize: Size of n-grams
+        :type gramsize: `int`
+
+        :param layer: `w`, `l` or `p`, or another indexed column
+        :type layer: `str`
+
+        :param preserve_case: Do not lowercase n-grams
+        :type preserve_case: `bool`
+
+        :returns: `corpkit.interrogation.Interrogation` -- with subcorpora as rows and
+                  n-grams, joined by `/`, as columns, most frequent first
+        """
+        import numpy as np
+        import pandas as pd
+        from corpkit.interrogation import Interrogation
+        tokens, sa = self._layer(layer)
+        tokens = np.asarray(tokens)
+        sa = np.asarray(sa)
+        size = len(tokens)
+
+        # keep suffixes with n real tokens before any marker
+        ok = sa <= size - gramsize
+        starts = sa[ok]
+        grams = np.column_stack([tokens[starts + j] for j in range(gramsize)])
+        real = (grams >= FIRST_CODE).all(axis=1)
+        starts, grams = starts[real], grams[real]
+
+        # equal n-grams are next to each other in the suffix array
+        new = np.r_[True, (grams[1:] != grams[:-1]).any(axis=1)] if len(grams) else \
+              np.array([], dtype=bool)
+        group = np.cumsum(new) - 1
+        numsubs = len(self.subcorpora)
+        subs = np.asarray(self._load('subcorpus'))[starts]
+        counts = np.bincount(group * numsubs + subs,
+                             minlength=int(new.sum()) * numsubs).reshape(-1, numsubs)
+
+        vocab = np.asarray(self._load(layer + '.vocab'), dtype=object)
+        names = ['/'.join(vocab[row - FIRST_CODE]) for row in grams[new]]
+        if not preserve_case:
+            names = [n.lower() for n in names]
+        df = pd.DataFrame(counts.T, index=self.subcorpora, columns=names)
+        if not preserve_case:
+            # forms that differ only in case are counted together
+            df = df.T.groupby(level=0, sort=False).sum().T
+        df = df[df.sum().sort_values(ascending=False, kind='stable').index]
+        query = {'gramsize': gramsize, 'layer': layer, 'preserve_case': preserve_case}
+        return Interrogation(results=df, totals=df.sum(axis=1), query=query)
+
+    def contexts(self, ngram, layer='w', window=None):
+        """
+        Concordance every occurrence of an n-gram, with the words around it
+        in its sentence
+
+        :param ngram: Tokens, as a list or separated by spaces
+        :type ngram: `str/list`
+
+        :param layer: Layer the n-gram is given in
+        :type layer: `str`
+
+        :param window: Tokens of context on each side, by
+                       default the whole sentence
+        :type window: `int`
+
+        :returns: `corpkit.interrogation.Concordance`
+        """
+        import numpy as np
+        import pandas as pd
+        from corpkit.interrogation import Concordance
+        codes = self.encode(ngram, layer)
+        width = len(codes) if codes else 0
+        found = np.array([], dtype=np.int64)
+        if codes:
+            start, end = self._range(codes, layer)
+            found = np.sort(np.asarray(self._layer(layer)[1][start:end]))
+
+        words, _ = self._layer('w')
+        vocab = np.asarray(self._load('w.vocab'), dtype=object)
+        marks = np.flatnonzero(np.asarray(words) < FIRST_CODE)
+        places = self._load('places')
+        subs = self._load('subcorpus')
+        lines = []
+        for pos in found.tolist():
+            after = np.searchsorted(marks, pos)
+            sent_start = marks[after - 1] + 1 if after else 0
+            sent_end = marks[after]
+            left = max(sent_start, pos - window) if window is not None else sent_start
+            right = min(sent_end, pos + width + window) if window is not None else sent_end
+            text = lambda a, b: ' '.join(vocab[np.asarray(words[a:b]) - FIRST_CODE])
+            fid, sent, tok = places[pos].tolist()
+            lines.append(['%d,%d' % (sent, tok), self.subcorpora[subs[pos]], self.files[fid],
+                          text(left, pos), text(pos, pos + width), text(pos + width, right)])
+        return Concordance(pd.DataFrame(lines, columns=['i', 'c', 'f', 'l', 'm', 'r']))
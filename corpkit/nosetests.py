@@ -140,6 +140,67 @@ def test_interro_multiindex_tregex_justspeakers():
 
 test_interro_multiindex_tregex_justspeakers.slow = 1
 
+def test_tregex_worker():
+    """
+    Check that the long-lived Tregex process answers as tregex.sh does
+    """
+    import corpkit.constants
+    from corpkit.process import tregex_engine
+    from corpkit.tregex import tregex_worker
+    corpus = Corpus(speak_path)
+    trees = []
+    for f in corpus.all_filepaths:
+        with open(f) as fo:
+            trees += [l.split('=', 1)[1].strip() for l in fo if l.startswith('# parse=')]
+    trees = '\n'.join(trees)
+    queries = [(r'NP < DT', ['-o', '-t', '-n']),
+               (r'/VB.?/ >># (VP !< VP >+(VP) /^(S|ROOT)/)', ['-o', '-t']),
+               (r'NP < __', ['-s']),
+               (r'NP < DT', ['-w', '-o', '-t']),
+               (r'/^S/ < __', ['-o', '-u']),
+               (r'NP < DT', ['-C'])]
+    assert tregex_worker() is not None
+    for query, options in queries:
+        warm = tregex_engine(query=query, options=list(options), corpus=trees)
+        corpkit.constants.TREGEX_WORKER = False
+        try:
+            cold = tregex_engine(query=query, options=list(options), corpus=trees)
+        finally:
+            corpkit.constants.TREGEX_WORKER = True
+        assert_equals(warm, cold)
+    # queries are checked by the worker too
+    assert_equals(tregex_engine(query='NP <', options=['-t'], check_query=True, root=True), False)
+    assert_equals(tregex_engine(query='NP', options=['-t'], check_query=True, root=True), 'NP')
+
+def test_tregex_batch():
+    """
+    Check that several Tregex queries run in one pass match each run alone
+    """
+    import corpkit.constants
+    from corpkit.process import tregex_engine, tregex_batch
+    corpus = Corpus(speak_path)
+    trees = []
+    for f in corpus.all_filepaths:
+        with open(f) as fo:
+            trees += [l.split('=', 1)[1].strip() for l in fo if l.startswith('# parse=')]
+    trees = '\n'.join(trees)
+    queries = {'Clauses': r'/^S/ < __',
+               'Interrogative': r'ROOT << (/\?/ !< __)',
+               'Processes': r'/VB.?/ >># (VP !< VP >+(VP) /^(S|ROOT)/)',
+               'Nothing': r'ZZZ'}
+    each = {}
+    for name, query in queries.items():
+        res = tregex_engine(query=query, options=['-o', '-t'], corpus=trees)
+        each[name] = [r[-1] for r in res] if res else []
+    assert_equals(tregex_batch(queries, trees), each)
+    assert_equals(len(each['Processes']) > 0, True)
+    # without the worker, each query is run on its own
+    corpkit.constants.TREGEX_WORKER = False
+    try:
+        assert_equals(tregex_batch(queries, trees), each)
+    finally:
+        corpkit.constants.TREGEX_WORKER = True
+
 def test_conc():
     """Testing concordancer"""
     corp = Corpus(parsed_path)
@@ -198,6 +259,434 @@ def document_check():
     assert_equals(corpus.files, None)
     assert_equals(corpus.datatype, 'conll')
 
+def test_conll_cache():
+    """
+    Check that a cached file loads the same as a parsed one
+    """
+    from corpkit.conll import parse_conll
+    from corpkit.store import delete_conll_cache
+    from corpkit.treestore import delete_tree_store
+    corpus = Corpus(speak_path)
+    try:
+        corpus.build_cache()
+        f = corpus[0][0].path
+        parsed = parse_conll(f, cache=False)
+        cached = parse_conll(f)
+        assert_equals(parsed.equals(cached), True)
+        assert_equals(parsed._metadata, cached._metadata)
+    finally:
+        for f in corpus.all_filepaths:
+            delete_conll_cache(f)
+            delete_tree_store(f)
+
+def test_tree_store():
+    """
+    Check that stored trees match the parse strings they came from
+    """
+    from nltk import Tree
+    from corpkit.conll import parse_conll
+    from corpkit.treestore import load_tree_store, delete_tree_store
+    f = Corpus(speak_path)[0][0].path
+    metadata = parse_conll(f, just_meta=True)
+    store = load_tree_store(f, cache=True)
+    for k, v in metadata.items():
+        assert_equals(store.tree(k)[0], Tree.fromstring(v['parse']))
+    assert_equals(store.root(1).span, (1, len(store.root(1).leaves())))
+    delete_tree_store(f)
+
+def test_tree_query():
+    """
+    Check that array tree matching finds what nltk's tgrep does
+    """
+    from nltk.tgrep import tgrep_nodes
+    from corpkit.treestore import load_tree_store, delete_tree_store
+    from corpkit.treequery import tree_search
+    f = Corpus(speak_path)[0][0].path
+    store = load_tree_store(f)
+    for query in ['NP < DT', 'VP !<< NN', '/^N/ . (VP < /^V/)', 'NP $.. __ | > PP']:
+        expected = []
+        for sent_id in sorted(store.sents):
+            tree, nodes = store.tree(sent_id, parented=True)
+            found = tgrep_nodes(query, [tree], search_leaves=False)
+            expected += [(sent_id, nodes[id(n)]) for n in list(found)[0]]
+        got = [(s, n) for s, first, last, n in tree_search(store, query)]
+        assert_equals(got, expected)
+    delete_tree_store(f)
+
+def test_stream_interro():
+    """
+    Check that reading files a few sentences at a time gives the same counts
+    """
+    corpus = Corpus(speak_path)
+    whole = corpus.interrogate({'l': r'^[abcde]'})
+    streamed = corpus.interrogate({'l': r'^[abcde]'}, stream=2)
+    assert_equals(whole.results.sum().sum(), streamed.results.sum().sum())
+    whole = corpus.interrogate({'w': r'^[abcde]'}, show=['w', '+1mw'])
+    streamed = corpus.interrogate({'w': r'^[abcde]'}, show=['w', '+1mw'], stream=2)
+    assert_equals(whole.results.equals(streamed.results), True)
+
+def test_index_interro():
+    """
+    Check that searching with the corpus index finds the same things
+    """
+    from corpkit.index import delete_index
+    corpus = Corpus(speak_path)
+    corpus.build_index()
+    indexed = corpus.interrogate({'l': r'^[abcde]'})
+    plain = corpus.interrogate({'l': r'^[abcde]'}, use_index=False)
+    assert_equals(indexed.results.sum().sum(), plain.results.sum().sum())
+    # an index named like the subcorpus, but built elsewhere, is skipped
+    import os
+    import shutil
+    from corpkit.index import index_path, load_index
+    sub = os.path.join(speak_path, 'first')
+    shutil.copy(index_path(corpus), index_path(sub))
+    try:
+        index = load_index(sub)
+        assert_equals(index.path, index_path(corpus))
+        assert_equals(index.stored_root, os.path.abspath(speak_path))
+    finally:
+        delete_index(sub)
+        delete_index(corpus)
+
+def test_wordlist_search():
+    """
+    Check that a list of words finds the same as its regex
+    """
+    from corpkit.other import as_regex
+    corpus = Corpus(speak_path)
+    words = ['corpus', 'the', 'linguistics', 'U.S.']
+    by_list = corpus.interrogate({'w': words})
+    by_regex = corpus.interrogate({'w': as_regex(words)})
+    assert_equals(by_list.results.sum().sum(), by_regex.results.sum().sum())
+    # subtyped function labels match their bare type, as with the regex
+    by_list = corpus.interrogate({'f': ['nmod', 'conj']}, show='f')
+    assert_equals(by_list.results.sum().sum(), 10)
+
+def test_file_scheduler():
+    """
+    Check that sharing files between processes gives the same results
+    """
+    corpus = Corpus(speak_path)
+    serial = corpus.interrogate({'l': r'^[abcde]'}, conc=True)
+    par = corpus.interrogate({'l': r'^[abcde]'}, conc=True, multiprocess=2)
+    assert_equals(serial.results.equals(par.results), True)
+    assert_equals(len(serial.concordance), len(par.concordance))
+
+def test_single_pass():
+    """
+    Check that named queries read in one pass match those run one by one
+    """
+    corpus = Corpus(speak_path)
+    queries = {'a': {'l': r'^[abc]'}, 'b': {'w': r'^t'}}
+    one = corpus.interrogate(queries, single_pass=True, use_interrodict=True)
+    each = corpus.interrogate(queries, single_pass=False, use_interrodict=True)
+    assert_equals(sorted(one.keys()), sorted(each.keys()))
+    for name in each:
+        assert_equals(one[name].results.equals(each[name].results), True)
+    # a query without lines is left out, as when run one by one
+    queries['none'] = {'w': r'^zzzz$'}
+    one = corpus.interrogate(queries, conc='only', single_pass=True)
+    each = corpus.interrogate(queries, conc='only', single_pass=False)
+    assert_equals(len(one), len(each))
+
+def test_sparse_results():
+    """
+    Check that sparse results hold the same counts, and can be edited
+    """
+    corpus = Corpus(speak_path)
+    dense = corpus.interrogate({'l': r'^[abcde]'})
+    sparse = corpus.interrogate({'l': r'^[abcde]'}, sparse=True)
+    assert_equals(sparse.results.to_frame().equals(dense.results), True)
+    top = sparse.edit('%', 'self', sort_by='total', keep_top=3)
+    assert_equals(top.results.shape, (2, 3))
+
+def test_result_cache():
+    """
+    Check that a stored interrogation is loaded back the same
+    """
+    from corpkit.memo import delete_results
+    corpus = Corpus(speak_path)
+    first = corpus.interrogate({'l': r'^[abcde]'}, cache_results=True)
+    second = corpus.interrogate({'l': r'^[abcde]'}, cache_results=True)
+    delete_results(corpus)
+    assert_equals(first.results.equals(second.results), True)
+
+def test_keywords():
+    """
+    Check keyness scores against ones worked out by hand
+    """
+    from math import log
+    from pandas import DataFrame, Series
+    from corpkit.keys import keywords
+    target = DataFrame({'x': [10, 2], 'y': [5, 8]}, index=['a', 'b'])
+    reference = Series({'x': 20, 'y': 60, 'z': 20})
+
+    def ll(ref, tgt, ref_sum, tgt_sum):
+        e1 = ref_sum * (ref + tgt) / float(ref_sum + tgt_sum)
+        e2 = tgt_sum * (ref + tgt) / float(ref_sum + tgt_sum)
+        score = 2 * ((ref * log(ref / e1) if ref else 0) + (tgt * log(tgt / e2) if tgt else 0))
+        return -score if float(tgt) / tgt_sum < float(ref) / ref_sum else score
+
+    def pd(ref, tgt, ref_sum, tgt_sum):
+        return (float(tgt) / tgt_sum - float(ref) / ref_sum) * 100 / (float(ref) / ref_sum)
+
+    for measure, func in [('ll', ll), ('pd', pd)]:
+        res = keywords(target, reference_corpus=reference, measure=measure)
+        for sub, row in target.iterrows():
+            for word in ['x', 'y', 'z']:
+                expected = func(reference[word], row.get(word, 0), 100, row.sum())
+                assert_equals(round(res.loc[sub, word], 6), round(expected, 6))
+    # reference words under the threshold are left out
+    res = keywords(target, reference_corpus=reference, threshold=30)
+    assert_equals(sorted(res.columns), ['y'])
+
+def test_incremental():
+    """
+    Check that re-interrogating reads only changed or added files, and
+    gives the same result as a fresh run
+    """
+    import shutil
+    import corpkit.conll
+    from corpkit.memo import delete_results
+    copy_path = speak_path + '-incremental'
+    shutil.copytree(speak_path, copy_path)
+    pipeline = corpkit.conll.pipeline
+    read = []
+    def counted(filepath, *args, **kwargs):
+        read.append(filepath)
+        return pipeline(filepath, *args, **kwargs)
+    try:
+        corpus = Corpus(copy_path)
+        corpus.interrogate({'l': r'^[abcde]'}, incremental=True)
+        touched, old = corpus.all_filepaths[:2]
+        added = old.replace('.conll', '-copy.conll')
+        shutil.copy(old, added)
+        stat = os.stat(touched)
+        os.utime(touched, (stat.st_atime, stat.st_mtime + 10))
+        corpus = Corpus(copy_path)
+        corpkit.conll.pipeline = counted
+        try:
+            again = corpus.interrogate({'l': r'^[abcde]'}, incremental=True)
+        finally:
+            corpkit.conll.pipeline = pipeline
+        fresh = corpus.interrogate({'l': r'^[abcde]'})
+        assert_equals(sorted(read), sorted([touched, added]))
+        assert_equals(again.results.sort_index(axis=1).equals(fresh.results.sort_index(axis=1)), True)
+    finally:
+        delete_results(Corpus(copy_path))
+        shutil.rmtree(copy_path)
+
+def test_ngram_index():
+    """
+    Check that the n-gram index counts and finds n-grams consistently
+    """
+    from corpkit.ngramindex import delete_ngram_index
+    corpus = Corpus(speak_path)
+    corpus.build_ngram_index()
+    ngrams = corpus.ngram_index
+    table = ngrams.table(gramsize=2, preserve_case=True)
+    top = table.results.columns[0]
+    found = ngrams.positions(top.replace('/', ' '))
+    lines = ngrams.contexts(top.split('/'))
+    bare = ngrams.contexts(top.split('/'), window=0)
+    # an index missing one of the corpus' files is not used
+    assert_equals(ngrams.is_current(corpus.all_filepaths + ['new.conll']), False)
+    delete_ngram_index(corpus)
+    assert_equals(len(found), table.results[top].sum())
+    assert_equals(list(lines['m'].unique()), [top.replace('/', ' ')])
+    # no context at all, rather than the whole sentence
+    assert_equals(set(bare['l']) | set(bare['r']), set(['']))
+
+def test_dep_show():
+    """
+    Check governors and dependents, leaving out dependents filtered away
+    """
+    import pandas as pd
+    from corpkit.conll import show_this, filter_tokens
+    ix = pd.MultiIndex.from_tuples([(1, 1), (1, 2), (1, 3), (1, 4), (2, 1), (2, 2)],
+                                   names=['s', 'i'])
+    df = pd.DataFrame({'w': ['Cats', 'sat', 'down', '.', 'Dogs', 'ran'],
+                       'l': ['cat', 'sit', 'down', '.', 'dog', 'run'],
+                       'p': ['NNS', 'VBD', 'RP', '.', 'NNS', 'VBD'],
+                       'f': ['nsubj', 'ROOT', 'compound:prt', 'punct', 'nsubj', 'ROOT'],
+                       'g': [2, 0, 2, 2, 2, 0],
+                       'd': ['0', '1,3,4', '0', '0', '0', '1'],
+                       'c': ['_'] * 6}, index=ix)
+    df = filter_tokens(df)
+    df._metadata = {1: {}, 2: {}}
+    res, _ = show_this(df, [(1, 1), (1, 2), (2, 2)], ['gw', 'dw'], df._metadata)
+    assert_equals(res, ['sat/none', 'root/cats', 'root/down', 'root/dogs'])
+    res, _ = show_this(df, [(1, 2), (1, 3)], ['ml', 'dl'], df._metadata)
+    assert_equals(res, ['sit/cat', 'sit/down', 'down/none'])
+
+def test_gather_grams():
+    """
+    Check n-grams and collocates, with none outside the match's sentence
+    """
+    import pandas as pd
+    from corpkit.conll import gather_grams
+    ix = pd.MultiIndex.from_tuples([(1, 1), (1, 2), (1, 3), (2, 1), (2, 2)], names=['s', 'i'])
+    df = pd.DataFrame({'w': ['The', 'cat', 'sat', 'A', 'dog']}, index=ix)
+    grams = gather_grams(df, [(1, 2), (2, 1)], ['mw'], gramsize=2)
+    assert_equals(list(grams), ['cat/sat', 'the/cat', 'a/dog', 'none/a'])
+    colls = gather_grams(df, [(1, 2)], ['mw'], window=2)
+    assert_equals(list(colls), ['cat/none', 'cat/the', 'cat/sat', 'cat/none'])
+
+def test_ngram_interro():
+    """
+    Check n-grams and collocates of every word, padded at sentence edges
+    """
+    corpus = Corpus(speak_path)
+    words = corpus.interrogate({'w': r'.'}).results.sum().sum()
+    grams = corpus.interrogate({'w': r'.'}, gramsize=2).results.sum()
+    assert_equals(grams.sum(), words * 2)
+    starts = grams[[g.startswith('none/') for g in grams.index]].sum()
+    ends = grams[[g.endswith('/none') for g in grams.index]].sum()
+    assert_equals(starts > 0, True)
+    assert_equals(starts, ends)
+    colls = corpus.interrogate({'w': r'.'}, window=2).results.sum()
+    assert_equals(colls.sum(), words * 4)
+    assert_equals(colls[[c.endswith('/none') for c in colls.index]].sum() >= starts * 2, True)
+
+def test_collocates():
+    """
+    Check that collocates are scored for every pair that was counted
+    """
+    corpus = Corpus(speak_path)
+    pairs = corpus.interrogate({'w': r'^c'}, window=2)
+    colls = corpus.collocates({'w': r'^c'}, window=2, min_freq=1)
+    found = [c for c in pairs.results.columns if not c.endswith('/none')]
+    assert_equals(sorted(colls.index), sorted(found))
+    assert_equals(colls['ll'].is_monotonic_decreasing, True)
+
+def test_reference_store():
+    """
+    Check that a stored reference corpus loads back with the same counts
+    """
+    from corpkit.reference import save_reference, load_reference, delete_reference
+    corpus = Corpus(speak_path)
+    data = corpus.interrogate({'l': r'^[abcde]'})
+    save_reference(data, 'test-reference')
+    loaded = load_reference('test-reference')
+    again = load_reference('test-reference')
+    # the store is relative to the working directory, and so is the cache
+    import os
+    import shutil
+    import tempfile
+    here = os.getcwd()
+    there = tempfile.mkdtemp()
+    os.chdir(there)
+    try:
+        elsewhere = load_reference('test-reference')
+    except IOError:
+        elsewhere = None
+    finally:
+        os.chdir(here)
+        shutil.rmtree(there)
+    delete_reference('test-reference')
+    assert_equals(elsewhere, None)
+    # counts by subcorpus keep their rows, for selfdrop
+    assert_equals(loaded.shape, data.results.shape)
+    assert_equals(loaded.sum().to_dict(), data.results.sum().to_dict())
+    assert_equals(loaded is again, True)
+
+def test_language_model():
+    """
+    Check that scoring all subcorpora at once matches scoring each one
+    """
+    from corpkit.model import LanguageModel, MultiModel
+    corpus = Corpus(speak_path)
+    data = corpus.interrogate({'w': 'any'}, show=['w', '+1mw']).multiindex()
+    models = {name: LanguageModel(2, 0.4, row[row > 0])
+              for name, row in data.results.iterrows()}
+    multi = MultiModel(models, order=2)
+    table = multi.score_subcorpora()
+    assert_equals(table.shape, (2, 2))
+    assert_equals(table['first'].round(6).to_dict(),
+                  multi.score('first').round(6).to_dict())
+
+def test_maxconc_stops_early():
+    """
+    Check that a limited concordance stops at the limit, in any file order
+    """
+    import corpkit.conll
+    corpus = Corpus(speak_path)
+    pipeline = corpkit.conll.pipeline
+    read = []
+    def counted(filepath, *args, **kwargs):
+        read.append(filepath)
+        return pipeline(filepath, *args, **kwargs)
+    corpkit.conll.pipeline = counted
+    try:
+        for order in [False, 'random', 'stratified']:
+            del read[:]
+            lines = corpus.concordance({'w': r'^[a-z]'}, maxconc=5, file_order=order)
+            assert_equals(len(lines), 5)
+            assert len(read) < len(corpus.all_filepaths)
+    finally:
+        corpkit.conll.pipeline = pipeline
+    # the same lines as the start of a full concordance
+    lines = corpus.concordance({'w': r'^[a-z]'}, maxconc=5)
+    full = corpus.concordance({'w': r'^[a-z]'})
+    assert_equals(list(lines['m']), list(full['m'][:5]))
+
+def test_lazy_conc():
+    """
+    Check that lazy concordance lines render just like ordinary ones
+    """
+    corpus = Corpus(speak_path)
+    lines = corpus.concordance({'w': r'^t'})
+    lazy = corpus.concordance({'w': r'^t'}, lazy_conc=True)
+    assert_equals('l' in lazy.columns, False)
+    rendered = lazy.render()
+    assert_equals(list(rendered['l']), list(lines['l']))
+    assert_equals(list(rendered['r']), list(lines['r']))
+    assert_equals(len(lazy.edit(skip_entries='^th')), len(lines.edit(skip_entries='^th')))
+
+def test_conc_categories():
+    """
+    Check that concordance labels are categories, and filter by them
+    """
+    corpus = Corpus(speak_path)
+    lines = corpus.concordance({'w': r'^t'})
+    assert_equals(lines['c'].dtype.name, 'category')
+    firsts = lines.edit(just_subcorpora=['first'])
+    assert_equals(len(firsts), sum(c == 'first' for c in lines['c']))
+    assert_equals(len(lines.edit(skip_subcorpora='^f')), len(lines) - len(firsts))
+
+def test_saved_columns():
+    """
+    Check that an interrogation saved as columns loads back the same
+    """
+    import shutil
+    import tempfile
+    from corpkit.other import load
+    savedir = tempfile.mkdtemp()
+    corpus = Corpus(speak_path)
+    data = corpus.interrogate({'w': r'^t'}, conc=True)
+    data.save('columns', savedir=savedir, print_info=False, columnar=True)
+    loaded = load(corpus.name + '-columns', loaddir=savedir)
+    assert_equals(loaded.results.to_dict(), data.results.to_dict())
+    assert_equals(list(loaded.concordance['m']), list(data.concordance['m']))
+    # keys of an Interrodict come back as they were, not as strings
+    from corpkit.interrogation import Interrodict
+    from corpkit.resultstore import save_result, load_result
+    multi = Interrodict([(1, data), (('a', 2), data)])
+    loaded = load_result(save_result(multi, os.path.join(savedir, 'multi')))
+    assert_equals(list(loaded.keys()), [1, ('a', 2)])
+    assert_equals(loaded[('a', 2)].results.to_dict(), data.results.to_dict())
+    shutil.rmtree(savedir)
+
+def test_metadata_filter():
+    """
+    Check that keeping and skipping by metadata can be combined
+    """
+    corpus = Corpus(speak_path)
+    lines = corpus.concordance({'w': r'^t'}, just_metadata={'speaker': r'E'},
+                               skip_metadata={'speaker': r'^N'})
+    assert_equals(sorted(set(lines['s'])), ['TESTER'])
+
 def test_conc_edit():
     """
     Make sure we can edit concordance lines
@@ -116,7 +116,8 @@ def concprinter(dataframe, kind='string', n=100,
     """
     import corpkit
 
-    df = dataframe.copy().fillna('')
+    # categories can't be filled or padded in place
+    df = dataframe.astype(object).fillna('')
 
     if n > len(df):
         n = len(df)
@@ -201,12 +202,15 @@ def concprinter(dataframe, kind='string', n=100,
 
 def save(interrogation, savename, savedir='saved_interrogations', **kwargs):
     """
-    Save an interrogation as pickle to *savedir*.
+    Save an interrogation to *savedir*.
 
        >>> interro_interrogator(corpus, 'words', 'any')
        >>> save(interro, 'savename')
 
-    will create ``./saved_interrogations/savename.p``
+    will create ``./saved_interrogations/savename.p``. With
+    ``columnar=True``, an interrogation or concordance is instead saved to
+    ``./saved_interrogations/savename``, a directory of arrays for each
+    column of the results, totals and concordance lines.
 
     :param interrogation: Corpus interrogation to save
     :type interrogation: corpkit interogation/edited result
@@ -219,6 +223,10 @@ def save(interrogation, savename, savedir='saved_interrogations', **kwargs):
     
     :param print_info: Show/hide stdout
     :type print_info: bool
+
+    :param columnar: Save interrogations and concordances as arrays, to be
+                     loaded lazily, rather than as a pickle
+    :type columnar: bool
     
     :returns: None
     """
@@ -232,10 +240,12 @@ def save(interrogation, savename, savedir='saved_interrogations', **kwargs):
     import corpkit
     from corpkit.process import makesafe, sanitise_dict
 
-    from corpkit.interrogation import Interrogation
+    from corpkit.interrogation import Interrogation, Interrodict, Concordance
     from corpkit.corpus import Corpus, Datalist
 
     print_info = kwargs.get('print_info', True)
+    columnar = kwargs.get('columnar', False) and \
+               isinstance(interrogation, (Interrogation, Interrodict, Concordance))
 
     def make_filename(interrogation, savename):
         """create a filename"""
@@ -289,12 +299,16 @@ def save(interrogation, savename, savedir='saved_interrogations', **kwargs):
     else:
         fullpath = savename
 
-    while os.path.isfile(fullpath):
+    while os.path.isfile(fullpath) or (columnar and os.path.isdir(columnar_path(fullpath))):
         selection = INPUTFUNC(("\nSave error: %s already exists in %s.\n\n" \
                 "Type 'o' to overwrite, or enter a new name: " % (savename, savedir)))
 
         if selection == 'o' or selection == 'O':
-            os.remove(fullpath)
+            if os.path.isfile(fullpath):
+                os.remove(fullpath)
+            if columnar and os.path.isdir(columnar_path(fullpath)):
+                import shutil
+                shutil.rmtree(columnar_path(fullpath))
         else:
             selection = selection.replace('.p', '')
             if not selection.endswith('.p'):
@@ -304,20 +318,33 @@ def save(interrogation, savename, savedir='saved_interrogations', **kwargs):
     if hasattr(interrogation, 'query'):
         interrogation.query = sanitise_dict(interrogation.query)
 
-    with open(fullpath, 'wb') as fo:
-        pickle.dump(interrogation, fo)
+    if columnar:
+        from corpkit.resultstore import save_result
+        fullpath = save_result(interrogation, columnar_path(fullpath))
+    else:
+        with open(fullpath, 'wb') as fo:
+            pickle.dump(interrogation, fo)
     
     time = strftime("%H:%M:%S", localtime())
     if print_info:
         print('\n%s: Data saved: %s\n' % (time, fullpath))
 
+def columnar_path(fullpath):
+    """
+    Get the directory an interrogation saved as columns goes in: the name
+    it would be pickled to, less `.p`
+    """
+    return fullpath[:-2] if fullpath.endswith('.p') else fullpath
+
 def load(savename, loaddir='saved_interrogations'):
     """
-    Load saved data into memory:
+    Load saved data:
 
         >>> loaded = load('interro')
 
-    will load ``./saved_interrogations/interro.p`` as loaded
+    will load ``./saved_interrogations/interro`` or
+    ``./saved_interrogations/interro.p`` as loaded. Interrogations saved as
+    columns are read from disk only as their parts are used.
 
     :param savename: Filename with or without extension
     :type savename: str
@@ -346,6 +373,10 @@ def load(savename, loaddir='saved_interrogations'):
     else:
         fullpath = savename
 
+    from corpkit.resultstore import is_result_store, load_result
+    if is_result_store(columnar_path(fullpath)):
+        return load_result(columnar_path(fullpath))
+
     with open(fullpath, 'rb') as fo:
         data = pickle.load(fo)
     return data
@@ -449,6 +480,9 @@ def load_all_results(data_dir='saved_interrogations', **kwargs):
 
         >>> r = load_all_results()
 
+    Interrogations saved with ``columnar=True`` are loaded lazily, so only
+    their manifests are read here; pickled results are read in full.
+
     :param data_dir: path to saved data
     :type data_dir: str
 
@@ -462,8 +496,9 @@ def load_all_results(data_dir='saved_interrogations', **kwargs):
     root = kwargs.get('root', False)
     note = kwargs.get('note', False)    
     
-    datafiles = [f for f in os.listdir(data_dir) if os.path.isfile(os.path.join(data_dir, f)) \
-                 and f.endswith('.p')]
+    from corpkit.resultstore import is_result_store
+    datafiles = [f for f in os.listdir(data_dir) if (os.path.isfile(os.path.join(data_dir, f)) \
+                 and f.endswith('.p')) or is_result_store(os.path.join(data_dir, f))]
 
     # just load first n (for testing)
     if kwargs.get('n', False):
@@ -745,11 +780,16 @@ def topwords(self, datatype='n', n=10, df=False, sort=True, precision=2):
     if isinstance(self, corpkit.interrogation.Interrodict):
         to_iterate = self.items()
     else:
+        # sparse results only give the entries found in each subcorpus
+        if isinstance(self.results, corpkit.interrogation.SparseResults):
+            getrow = self.results.row
+        else:
+            getrow = lambda x: self.results.ix[x]
         if sort is True:
-            to_iterate = [(x, self.results.ix[x].sort_values(ascending=ascend)) \
+            to_iterate = [(x, getrow(x).sort_values(ascending=ascend)) \
                           for x in list(self.results.index)]
         else:
-            to_iterate = [(x, self.results.ix[x]) for x in list(self.results.index)]
+            to_iterate = [(x, getrow(x)) for x in list(self.results.index)]
     for name, data in to_iterate:
         if isinstance(self, corpkit.interrogation.Interrodict):
             if sort is True:
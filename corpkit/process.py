@@ -4,6 +4,7 @@ not intended to be called by users.
 """
 
 from __future__ import print_function
+from contextlib import contextmanager
 from corpkit.constants import STRINGTYPE, PYTHON_VERSION, INPUTFUNC
 
 def tregex_engine(corpus=False,  
@@ -47,6 +48,7 @@ def tregex_engine(corpus=False,
     
     import subprocess 
     from subprocess import Popen, PIPE, STDOUT
+    from corpkit.tregex import tregex_worker, TregexWorkerError
 
     import re
     from time import localtime, strftime
@@ -126,22 +128,38 @@ def tregex_engine(corpus=False,
         # if it's not string or unicode, it's some kind of corpus obj
         # in which case, add its path var
 
+        path = None
         if corpus:
             if isinstance(corpus, STRINGTYPE):
                 if os.path.isdir(corpus) or os.path.isfile(corpus):
-                    tregex_command.append(corpus)
+                    path = corpus
                 else:
                     filtermode = True
             elif hasattr(corpus, 'path'):
-                tregex_command.append(corpus.path)
+                path = corpus.path
+        if path:
+            tregex_command.append(path)
         
         if filtermode:
             tregex_command.append('-filter')
 
-        if not filtermode:
+        # a warm tregex process answers the query if it can, rather than a new JVM
+        res = None
+        worker = tregex_worker()
+        if worker is not None and worker.supports(tregex_command[1:]):
+            # the worker may not share our working directory
+            args = [os.path.abspath(a) if path and a == path else a for a in tregex_command[1:]]
+            try:
+                out, err = worker.run(args, trees=corpus if filtermode else None)
+                res = err + out if (check_query or check_for_trees) else out
+            except TregexWorkerError:
+                res = None
+
+        # otherwise, or if the worker has died, start java
+        if res is None and not filtermode:
             res = subprocess.check_output(tregex_command, stderr=send_stderr_to)
             res = res.decode(encoding='UTF-8').splitlines()
-        else:
+        elif res is None:
             p = Popen(tregex_command, stdout=PIPE, stdin=PIPE, stderr=send_stderr_to)
             p.stdin.write(corpus.encode('UTF-8', errors='ignore'))
             res = p.communicate()[0].decode(encoding='UTF-8').splitlines()
@@ -252,6 +270,40 @@ def tregex_engine(corpus=False,
         res = make_tuples
     return res
 
+def tregex_batch(queries, trees, root=False, preserve_case=False):
+    """
+    Run several Tregex queries over the same trees, reading them only once
+
+    :param queries: Names and Tregex queries
+    :type queries: `dict`
+    :param trees: Bracketed trees, one per line
+    :type trees: `str`
+    :returns: `dict` -- name: words of each matching node (as with `-o -t`)
+    """
+    from corpkit.tregex import tregex_worker, TregexWorkerError
+    matches = None
+    worker = tregex_worker()
+    if worker is not None:
+        try:
+            matches = worker.batch(queries, trees)
+        except TregexWorkerError:
+            matches = None
+
+    # without the worker, fall back to a tregex run per query
+    if matches is None:
+        matches = {}
+        for name, query in queries.items():
+            res = tregex_engine(query=query,
+                                options=['-o', '-t'],
+                                corpus=trees,
+                                root=root,
+                                preserve_case=True)
+            matches[name] = [r[-1] for r in res] if res else []
+
+    if not preserve_case:
+        matches = {k: [m.lower().replace('/', '-slash-') for m in v] for k, v in matches.items()}
+    return matches
+
 def show(lines, index, show='thread'):
     """show lines.ix[index][link] as frame"""
     import corpkit
@@ -395,6 +447,68 @@ def determine_datatype(path):
 
     return lookup.get(mc, 'plaintext'), singlefile
 
+class LiteralMatcher(object):
+    """
+    Search value made from a list of words, matched mostly by set membership
+    rather than by one huge alternation regex
+
+    It matches exactly what the word-bounded regex from `as_regex` would. A
+    value made only of word characters can only match a list entry that is
+    also made only of word characters, and only if the two are equal, so
+    such values are looked up in a set. Anything else, like `nmod:poss` or
+    `well-known`, is checked with the compiled regex, as are entries with
+    other characters in them, like `U.S.`. `pattern`, `flags` and the
+    methods of a compiled pattern are those of the regex, so the matcher can
+    be used wherever a compiled pattern was.
+    """
+
+    def __init__(self, words, case_sensitive=False):
+        import re
+        from corpkit.other import as_regex
+        words = [str(w) for w in words]
+        self.case_sensitive = case_sensitive
+        self.compiled = as_regex(words, case_sensitive=case_sensitive, compile=True)
+        self.pattern = self.compiled.pattern
+        self.flags = self.compiled.flags
+        self.wordlike = re.compile(r'\w+$', re.UNICODE)
+        literal = [w for w in words if self.wordlike.match(w)]
+        special = [w for w in words if not self.wordlike.match(w)]
+        if not case_sensitive:
+            literal = [w.lower() for w in literal]
+        self.words = frozenset(literal)
+        self.regex = as_regex(special, case_sensitive=case_sensitive, compile=True) \
+                     if special else None
+
+    def __repr__(self):
+        return "<%s: %d words>" % (self.__class__.__name__, len(self.words))
+
+    def __getattr__(self, name):
+        # match, findall, sub and so on come from the regex
+        if name == 'compiled' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.compiled, name)
+
+    def search(self, string, *args):
+        """
+        Check one string, like the `search` method of a compiled pattern
+        """
+        if args or not self.wordlike.match(string):
+            return self.compiled.search(string, *args)
+        key = string if self.case_sensitive else string.lower()
+        if key in self.words:
+            return True
+        if self.regex is not None:
+            return self.regex.search(string)
+
+    def match_series(self, ser):
+        """
+        Get a boolean mask of the strings in a `pandas.Series` that match,
+        checking each distinct string once
+        """
+        import pandas as pd
+        hits = [v for v in pd.unique(ser.values) if self.search(v)]
+        return ser.isin(hits)
+
 def filtermaker(the_filter, case_sensitive=False, **kwargs):
     """
     Create a search/exclude value
@@ -404,8 +518,7 @@ def filtermaker(the_filter, case_sensitive=False, **kwargs):
     from time import localtime, strftime
     root = kwargs.get('root')
     if isinstance(the_filter, (list, Wordlist)):
-        from corpkit.other import as_regex
-        the_filter = as_regex(the_filter, case_sensitive=case_sensitive)
+        return LiteralMatcher(the_filter, case_sensitive=case_sensitive)
     try:
         output = re.compile(the_filter)
         is_valid = True
@@ -775,13 +888,17 @@ def format_middle(tree, show, df=False, sent_id=False, ixs=False):
     if 'mw' in show:
         tree_vals['mw'] = [i.replace('/', '-slash-') for i in tree.leaves()]
     if 'ml' in show:
-        print(df)
-        tree_vals['ml'] = [df.loc[sent_id, i]['l'] for i in ixs]
+        # punctuation may have been dropped from df, so fall back to the word
+        tree_vals['ml'] = [df['l'].get((sent_id, i), w) for i, w in zip(ixs, tree.leaves())]
     if 'mp' in show:
         tree_vals['mp'] = [y for x, y in tree.pos()]
     if 'mx' in show:
         from corpkit.dictionaries import taglemma
         tree_vals['mx'] = [taglemma.get(y.lower(), y) for x, y in tree.pos()]
+    if 'ms' in show:
+        tree_vals['ms'] = [str(sent_id) for i in ixs]
+    if 'mi' in show:
+        tree_vals['mi'] = [str(i) for i in ixs]
 
     output = []
     zipped = zip(*[tree_vals[i] for i in show])
@@ -802,7 +919,7 @@ def format_conc(tups, show, df=False, sent_id=False, root=False, ixs=False):
     if 'mw' in show:
         tree_vals['mw'] = [w.replace('/', '-slash-') for w, p, i in tups]
     if 'ml' in show:
-        tree_vals['ml'] = [df.loc[sent_id, i]['l'] for i in ixs]
+        tree_vals['ml'] = [df['l'].get((sent_id, i), w) for w, p, i in tups]
     if 'mp' in show:
         tree_vals['mp'] = [p.replace('/', '-slash-') for w, p, i in tups]
     if 'mx' in show:
@@ -825,7 +942,8 @@ def show_tree_as_per_option(show, tree, sent=False, df=False,
                             sent_id=False, conc=False,
                             only_format_match=True):
     """
-    Turn a ParentedTree into shown output
+    Turn a ParentedTree, or a node of a :class:`corpkit.treestore.TreeStore`,
+    into shown output
 
     :returns: tok_id, metcat, start, middle, end
     """
@@ -836,18 +954,21 @@ def show_tree_as_per_option(show, tree, sent=False, df=False,
     
     # here, we need to get the indexes of the first and last
     # token in the match, when the tree is flattened.
-    # i wonder if there is an easier way!
-    all_leaf_positions = tree.root().treepositions(order='leaves')
-    match_position = tree.treeposition()
-    ixs = [e for e, i in enumerate(all_leaf_positions, start=1) \
-           if i[:len(match_position)] == match_position]
+    if hasattr(tree, 'span'):
+        # stored nodes know their leaf span already
+        first, last = tree.span
+        ixs = list(range(first, last + 1))
+    else:
+        all_leaf_positions = tree.root().treepositions(order='leaves')
+        match_position = tree.treeposition()
+        ixs = [e for e, i in enumerate(all_leaf_positions, start=1) \
+               if i[:len(match_position)] == match_position]
 
     # get the data from the left and right
     if conc:
-        start = [(w, p, i) for i, (w, p) in enumerate(tree.root().pos(), start=1)
-                 if i < ixs[0]]
-        end = [(w, p, i) for i, (w, p) in enumerate(tree.root().pos(), start=1)
-                 if i > ixs[-1]]
+        tokens = list(enumerate(tree.root().pos(), start=1))
+        start = [(w, p, i) for i, (w, p) in tokens[:ixs[0] - 1]]
+        end = [(w, p, i) for i, (w, p) in tokens[ixs[-1]:]]
 
     middle = format_middle(tree, show, df=df, sent_id=sent_id, ixs=ixs)
 
@@ -867,7 +988,7 @@ def tgrep(parse_string, search):
     """
     Uses tgrep to search a parse tree string
 
-    :param parse_string: A bracketed tree
+    :param parse_string: A bracketed tree, or an already built `ParentedTree`
     :type parse_string: `str`
 
     :param search: A search query
@@ -875,10 +996,76 @@ def tgrep(parse_string, search):
     """
     from nltk.tree import ParentedTree
     from nltk.tgrep import tgrep_nodes, tgrep_positions
-    pt = ParentedTree.fromstring(parse_string)
+    if isinstance(parse_string, STRINGTYPE):
+        pt = ParentedTree.fromstring(parse_string)
+    else:
+        pt = parse_string
     ptrees = [i for i in list(tgrep_nodes(search, [pt])) if i]
     return [item for sublist in ptrees for item in sublist]
 
+def remove_path(path):
+    """
+    Delete a file or directory, if it exists
+    """
+    import os
+    import shutil
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.isfile(path):
+        os.remove(path)
+
+@contextmanager
+def atomic_path(path, directory=False):
+    """
+    Give a temporary path to write a file or directory to, moved to `path`
+    once the block finishes, so that a half-written store is never read.
+    If the block fails, the temporary path is removed and `path` is left as
+    it was.
+
+    The temporary path is unique and in the same directory as `path`, so
+    that processes writing the same store at once do not remove each
+    other's work, and the last to finish wins.
+
+    :param path: Where the file or directory should end up
+    :type path: `str`
+    :param directory: Make the temporary path as an empty directory
+    :type directory: `bool`
+    :returns: `str` -- the temporary path
+    """
+    import os
+    import tempfile
+    parent, name = os.path.split(os.path.abspath(path))
+    try:
+        os.makedirs(parent)
+    except OSError:
+        pass
+    prefix = '.%s.' % name
+    if directory:
+        tmp = tempfile.mkdtemp(prefix=prefix, suffix='.tmp', dir=parent)
+        os.chmod(tmp, 0o755)
+    else:
+        fd, tmp = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=parent)
+        os.close(fd)
+        os.chmod(tmp, 0o644)
+    try:
+        yield tmp
+    except BaseException:
+        remove_path(tmp)
+        raise
+    try:
+        # a file replaces the old one in one step
+        os.rename(tmp, path)
+    except OSError:
+        # a directory, or windows, needs the old copy out of the way first
+        remove_path(path)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            remove_path(tmp)
+            # another process has just moved its own copy into place
+            if not os.path.exists(path):
+                raise
+
 def canpickle(obj):
     """
     Determine if object can be pickled
@@ -1081,7 +1268,7 @@ def pat_format(pat, case_sensitive=False, root=False):
             pat = [str(x) for x in pat]
         pat = filtermaker(pat, case_sensitive=case_sensitive, root=root)
     else:
-        if isinstance(pat, int):
+        if isinstance(pat, (int, LiteralMatcher)):
             return pat
         if isinstance(pat, re._pattern_type):
             return pat
@@ -1229,31 +1416,31 @@ def format_tregex(results,
         bits = []
         if exclude and exclude.get('w'):
             if len(list(exclude.keys())) == 1 or excludemode == 'any':
-                if re.search(exclude.get('w'), word):
+                if exclude.get('w').search(word):
                     continue
             if len(list(exclude.keys())) == 1 or excludemode == 'any':
-                if re.search(exclude.get('l'), lemma):
+                if exclude.get('l').search(lemma):
                     continue
             if len(list(exclude.keys())) == 1 or excludemode == 'any':
-                if re.search(exclude.get('p'), word):
+                if exclude.get('p').search(word):
                     continue
             if len(list(exclude.keys())) == 1 or excludemode == 'any':
-                if re.search(exclude.get('x'), lemma):
+                if exclude.get('x').search(lemma):
                     continue
         if exclude and excludemode == 'all':
             num_to_cause_exclude = len(list(exclude.keys()))
             current_num = 0
             if exclude.get('w'):
-                if re.search(exclude.get('w'), word):
+                if exclude.get('w').search(word):
                     current_num += 1
             if exclude.get('l'):
-                if re.search(exclude.get('l'), lemma):
+                if exclude.get('l').search(lemma):
                     current_num += 1
             if exclude.get('p'):
-                if re.search(exclude.get('p'), word):
+                if exclude.get('p').search(word):
                     current_num += 1
             if exclude.get('x'):
-                if re.search(exclude.get('x'), lemma):
+                if exclude.get('x').search(lemma):
                     current_num += 1   
             if current_num == num_to_cause_exclude:
                 continue                 
@@ -0,0 +1,264 @@
+"""
+corpkit: reference corpora for keyness
+
+A reference corpus is a frequency list: a sorted vocabulary, stored as utf-8
+bytes with offsets, and an array of counts, saved as ``.npy`` files in
+``data/.references/<name>/``, with the counts memory-mapped when loaded. Counts by subcorpus keep a row per subcorpus, so
+that keyness can drop each subcorpus from the reference. Pickled lists in
+``dictionaries/``, like ``bnc.p``, are converted the first time they are
+used, and again only if the pickle changes. Loaded references are kept for
+the life of the process, and worker processes share the mapped pages.
+"""
+
+from __future__ import print_function
+
+# absolute store path: (pandas.Series/DataFrame, source file, source fingerprint)
+_REFERENCES = {}
+
+def reference_path(name):
+    """
+    Get the directory holding a stored reference corpus
+
+    :param name: Name of the reference, e.g. `bnc`
+    :type name: `str`
+
+    :returns: `str` -- path inside the reference directory
+    """
+    import os
+    from corpkit.constants import REFERENCE_DIR
+    return os.path.join(REFERENCE_DIR, name)
+
+def _cache_key(name):
+    """
+    Key of a loaded reference: the absolute path of its store, so that
+    changing directory does not return a reference from elsewhere
+    """
+    import os
+    return os.path.abspath(reference_path(name))
+
+def reference_name(reference):
+    """
+    Name a reference is stored under: the filename, less any `.p`
+    """
+    import os
+    name = os.path.basename(reference)
+    return name[:-2] if name.endswith('.p') else name
+
+def _pickle_store_name(source):
+    """
+    Name the store of a pickled list after its full path, so that pickles
+    with the same filename in different directories are kept apart
+    """
+    import os
+    import hashlib
+    digest = hashlib.md5(os.path.abspath(source).encode('utf-8')).hexdigest()
+    return '%s.%s' % (reference_name(source), digest[:10])
+
+def _unwrap(data):
+    """
+    The counts of an interrogation, or the data itself
+    """
+    if hasattr(data, 'results'):
+        return data.results if data.results is not None else data.totals
+    return data
+
+def as_frequencies(data):
+    """
+    Turn a frequency list into a `Series` with a unique, sorted index
+
+    :param data: token counts. A
+                 `DataFrame` is summed over subcorpora.
+    :type data: `Counter/dict/Series/DataFrame/Interrogation`
+
+    :returns: `pandas.Series`
+    """
+    from pandas import DataFrame, Series
+    data = _unwrap(data)
+    # a DataFrame, or SparseResults
+    if isinstance(data, DataFrame) or hasattr(data, 'matrix'):
+        data = data.sum()
+    if not isinstance(data, Series):
+        data = Series(dict(data), dtype=float)
+    data = data.copy()
+    data.index = data.index.astype(str)
+    return data.groupby(level=0).sum()
+
+def save_reference(data, name, source=None):
+    """
+    Store a frequency list as a reference corpus
+
+    :param data: token counts. Counts by subcorpus, as a `DataFrame`
+                 or in an `Interrogation`, keep their rows.
+    :type data: `Counter/dict/Series/DataFrame/Interrogation`
+
+    :param name: Name to store it under
+    :type name: `str`
+
+    :param source: File the list was read from, so that the
+                   store can be rebuilt when the file changes
+    :type source: `str`
+
+    :returns: `str` -- path of the stored reference
+    """
+    import os
+    import numpy as np
+    from corpkit.store import file_fingerprint
+    from corpkit.process import atomic_path
+    from corpkit.resultstore import _write_strings
+
+    from pandas import DataFrame
+
+    data = _unwrap(data)
+    if isinstance(data, DataFrame):
+        # a row per subcorpus, for selfdrop
+        freqs = data.copy()
+        freqs.columns = freqs.columns.astype(str)
+        freqs = freqs.T.groupby(level=0).sum().T
+        vocab = freqs.columns
+        rows = [r if isinstance(r, (int, np.integer)) else str(r) for r in freqs.index]
+    else:
+        freqs = as_frequencies(data)
+        vocab = freqs.index
+    counts = freqs.values
+    if np.all(np.mod(counts, 1) == 0):
+        counts = counts.astype(np.int64)
+    arrays = {'counts': counts}
+    if isinstance(data, DataFrame):
+        arrays['rows'] = np.array(rows)
+    if source:
+        arrays['_source'] = np.array(os.path.abspath(source))
+        arrays['_fingerprint'] = np.array(file_fingerprint(source), dtype=float)
+
+    path = reference_path(name)
+    with atomic_path(path, directory=True) as tmp:
+        _write_strings(tmp, 'vocab', list(vocab))
+        for key, arr in arrays.items():
+            np.save(os.path.join(tmp, key + '.npy'), arr)
+    _REFERENCES.pop(_cache_key(name), None)
+    return path
+
+def _source(path):
+    """
+    The file a stored reference was made from, and its fingerprint when the
+    reference was made, or `(None, None)` for a reference saved from data
+    """
+    import os
+    import numpy as np
+    source = os.path.join(path, '_source.npy')
+    if not os.path.isfile(source):
+        return None, None
+    fingerprint = np.load(os.path.join(path, '_fingerprint.npy'))
+    return str(np.load(source)), (float(fingerprint[0]), int(fingerprint[1]))
+
+def _is_current(source, fingerprint):
+    """
+    Check that the file a reference was made from has not changed
+    """
+    import os
+    from corpkit.store import file_fingerprint
+    if source is None:
+        return True
+    return os.path.isfile(source) and file_fingerprint(source) == fingerprint
+
+def _read_reference(name):
+    """
+    Memory-map a stored reference, if it is there and up to date
+
+    :returns: `tuple` -- the counts as a `pandas.Series`, or a `pandas.DataFrame`
+              if they were stored by subcorpus, and the source and
+              fingerprint to check it against later, or None
+    """
+    import os
+    import numpy as np
+    import pandas as pd
+    from corpkit.resultstore import _read_strings
+    path = reference_path(name)
+    # stores from before the vocabulary was kept as bytes are made again
+    if not os.path.isfile(os.path.join(path, 'vocab.bytes.npy')):
+        return
+    source, fingerprint = _source(path)
+    if not _is_current(source, fingerprint):
+        return
+    counts = np.load(os.path.join(path, 'counts.npy'), mmap_mode='r')
+    vocab = pd.Index(_read_strings(path, 'vocab'), copy=False)
+    if os.path.isfile(os.path.join(path, 'rows.npy')):
+        rows = np.load(os.path.join(path, 'rows.npy'))
+        rows = pd.Index(rows if rows.dtype.kind in 'iu' else rows.astype(object))
+        return pd.DataFrame(counts, index=rows, columns=vocab, copy=False), source, fingerprint
+    return pd.Series(counts, index=vocab, copy=False), source, fingerprint
+
+def _find_pickle(reference, loaddir):
+    """
+    Find a pickled frequency list in `loaddir`, or among corpkit's own
+    dictionaries
+    """
+    import os
+    import corpkit
+    fname = reference if reference.endswith('.p') else reference + '.p'
+    if os.path.dirname(fname) or not loaddir:
+        options = [fname]
+    else:
+        options = [os.path.join(loaddir, fname)]
+    here = os.path.dirname(corpkit.__file__)
+    options.append(os.path.join(here, 'dictionaries', os.path.basename(fname)))
+    for option in options:
+        if os.path.isfile(option):
+            return option
+
+def load_reference(reference, loaddir='dictionaries'):
+    """
+    Get a reference corpus by name, loading it only once per process
+
+    :param reference: A pickled frequency list in `loaddir`, e.g. `bnc.p`,
+                      or the name of a reference stored from data
+    :type reference: `str`
+
+    :param loaddir: Where to look for pickles
+    :type loaddir: `str`
+
+    :returns: `pandas.Series` -- count of each token, backed by memory-mapped
+              arrays. Counts stored by subcorpus are a `pandas.DataFrame`.
+    """
+    import os
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+
+    # pickles are known by their full path, so the one asked for is the one used
+    source = _find_pickle(reference, loaddir)
+    name = reference_name(reference) if source is None else _pickle_store_name(source)
+    key = _cache_key(name)
+    if key in _REFERENCES:
+        data, stored, fingerprint = _REFERENCES[key]
+        if _is_current(stored, fingerprint):
+            return data
+        del _REFERENCES[key]
+
+    loaded = _read_reference(name)
+    if source is not None and (loaded is None or loaded[1] != os.path.abspath(source)):
+        with open(source, 'rb') as fo:
+            data = pickle.load(fo)
+        save_reference(data, name, source=source)
+        loaded = _read_reference(name)
+    if loaded is None:
+        raise IOError('Reference corpus not found: %s' % reference)
+    _REFERENCES[key] = loaded
+    return loaded[0]
+
+def delete_reference(name):
+    """
+    Remove a stored reference corpus, if there is one, along with those
+    converted from pickles of the same name
+    """
+    import os
+    import re
+    import shutil
+    from corpkit.constants import REFERENCE_DIR
+    name = reference_name(name)
+    converted = re.compile(re.escape(name) + r'\.[0-9a-f]{10}$')
+    stores = os.listdir(REFERENCE_DIR) if os.path.isdir(REFERENCE_DIR) else []
+    for store in stores:
+        if store == name or converted.match(store):
+            _REFERENCES.pop(_cache_key(store), None)
+            shutil.rmtree(reference_path(store))
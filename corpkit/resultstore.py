@@ -0,0 +1,305 @@
+"""
+corpkit: columnar storage of saved interrogations
+
+An `Interrogation`, `Interrodict` or `Concordance` is saved as a directory
+of ``.npy`` arrays with a ``manifest.json`` describing them, rather than as
+one pickle. Counts are stored column by column, and labels and strings as
+utf-8 bytes with offsets. Loading reads only the manifest: each branch of
+an `Interrogation` (results, totals, concordance or query) is read the
+first time it is used, and numeric arrays are memory-mapped, so that only
+the columns used are read from disk.
+"""
+
+from __future__ import print_function
+
+MANIFEST = 'manifest.json'
+
+# version of the layout written by save_result
+FORMAT = 1
+
+def is_result_store(path):
+    """
+    Check if a path is a saved result in this format
+
+    :param path: Path of a directory
+    :type path: `str`
+
+    :returns: `bool`
+    """
+    import os
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+def _file(path, name):
+    import os
+    return os.path.join(path, name + '.npy')
+
+def _write_strings(path, name, values):
+    """
+    Save strings as one array of utf-8 bytes and an array of offsets, with
+    a mask of missing values if there are any
+    """
+    import numpy as np
+    import pandas as pd
+    missing = np.asarray(pd.isnull(values), dtype=bool)
+    encoded = [b'' if miss else (v if isinstance(v, bytes) else u'%s' % v).encode('utf-8')
+               for v, miss in zip(values, missing)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    np.save(_file(path, name + '.bytes'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(_file(path, name + '.offsets'), offsets)
+    if missing.any():
+        np.save(_file(path, name + '.missing'), missing)
+
+def _read_strings(path, name):
+    """
+    Load strings saved by `_write_strings`, as an object array
+    """
+    import os
+    import numpy as np
+    data = np.load(_file(path, name + '.bytes')).tobytes()
+    offsets = np.load(_file(path, name + '.offsets'))
+    out = np.empty(len(offsets) - 1, dtype=object)
+    out[:] = [data[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+    if os.path.isfile(_file(path, name + '.missing')):
+        out[np.load(_file(path, name + '.missing'))] = np.nan
+    return out
+
+def _write_values(path, name, values):
+    """
+    Save a column of values: numbers as they are, anything else as strings
+
+    :returns: `str` -- how the values were stored
+    """
+    import numpy as np
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        np.save(_file(path, name), values)
+        return 'numeric'
+    _write_strings(path, name, values)
+    return 'strings'
+
+def _read_values(path, name, kind):
+    import numpy as np
+    if kind == 'numeric':
+        return np.load(_file(path, name), mmap_mode='c')
+    return _read_strings(path, name)
+
+def _name(name):
+    """
+    A label name that can go in the manifest
+    """
+    from corpkit.constants import STRINGTYPE
+    if name is None or isinstance(name, (STRINGTYPE, bool, int, float)):
+        return name
+    return str(name)
+
+def _write_labels(path, name, labels):
+    """
+    Save an index, returning its spec for the manifest
+    """
+    import pandas as pd
+    if isinstance(labels, pd.MultiIndex):
+        raise TypeError('MultiIndex labels are not stored as columns.')
+    return {'kind': _write_values(path, name, labels),
+            'name': _name(labels.name)}
+
+def _read_labels(path, name, spec):
+    import pandas as pd
+    return pd.Index(_read_values(path, name, spec['kind']), name=spec['name'])
+
+def _write_pickle(path, name, obj):
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    import numpy as np
+    np.save(_file(path, name), np.frombuffer(pickle.dumps(obj, protocol=2), dtype=np.uint8))
+
+def _read_pickle(path, name):
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    import numpy as np
+    return pickle.loads(np.load(_file(path, name)).tobytes())
+
+def _write_branch(path, name, obj):
+    """
+    Save one branch of a result, in columns if its type allows
+
+    :returns: `dict` -- spec of the branch, for the manifest
+    """
+    import numpy as np
+    import pandas as pd
+    from corpkit.interrogation import Concordance, LazyConcordance, SparseResults
+
+    if obj is None:
+        return {'kind': 'none'}
+    try:
+        if isinstance(obj, Concordance):
+            spec = {'kind': 'concordance',
+                    'lazy': isinstance(obj, LazyConcordance),
+                    'index': _write_labels(path, name + '.index', obj.index),
+                    'columns': []}
+            for n, col in enumerate(obj.columns):
+                ser = obj[col]
+                colname = '%s.%d' % (name, n)
+                if ser.dtype.name == 'category':
+                    np.save(_file(path, colname + '.codes'), np.asarray(ser.cat.codes))
+                    kinds = ['category', _write_values(path, colname + '.categories',
+                                                       ser.cat.categories)]
+                else:
+                    kinds = [_write_values(path, colname, ser.values)]
+                spec['columns'].append([_name(col)] + kinds)
+            if spec['lazy']:
+                _write_pickle(path, name + '.context', obj.context)
+            return spec
+        if isinstance(obj, SparseResults):
+            matrix = obj.matrix.tocsr()
+            for part in ['data', 'indices', 'indptr']:
+                np.save(_file(path, '%s.%s' % (name, part)), getattr(matrix, part))
+            return {'kind': 'sparse',
+                    'shape': list(matrix.shape),
+                    'index': _write_labels(path, name + '.index', obj.index),
+                    'columns': _write_labels(path, name + '.columns', obj.columns)}
+        if isinstance(obj, pd.DataFrame) and all(k in 'biuf' for k in obj.dtypes.map(lambda d: d.kind)):
+            # one column after another, so that each column is read on its own
+            np.save(_file(path, name + '.values'), np.asfortranarray(obj.values))
+            return {'kind': 'dataframe',
+                    'index': _write_labels(path, name + '.index', obj.index),
+                    'columns': _write_labels(path, name + '.columns', obj.columns)}
+        if isinstance(obj, pd.Series) and obj.dtype.kind in 'biuf':
+            np.save(_file(path, name + '.values'), obj.values)
+            return {'kind': 'series',
+                    'name': _name(obj.name),
+                    'index': _write_labels(path, name + '.index', obj.index)}
+    except TypeError:
+        pass
+    # anything else, like multiindexed results or a query, is pickled
+    _write_pickle(path, name, obj)
+    return {'kind': 'pickle'}
+
+def _read_branch(path, name, spec):
+    """
+    Load one branch of a result from its spec
+    """
+    import numpy as np
+    import pandas as pd
+    from corpkit.interrogation import Concordance, LazyConcordance, SparseResults
+
+    kind = spec['kind']
+    if kind == 'none':
+        return
+    if kind == 'pickle':
+        return _read_pickle(path, name)
+    if kind == 'dataframe':
+        return pd.DataFrame(np.load(_file(path, name + '.values'), mmap_mode='c'),
+                            index=_read_labels(path, name + '.index', spec['index']),
+                            columns=_read_labels(path, name + '.columns', spec['columns']),
+                            copy=False)
+    if kind == 'series':
+        return pd.Series(np.load(_file(path, name + '.values'), mmap_mode='c'),
+                         index=_read_labels(path, name + '.index', spec['index']),
+                         name=spec['name'], copy=False)
+    if kind == 'sparse':
+        from scipy.sparse import csr_matrix
+        parts = [np.load(_file(path, '%s.%s' % (name, part)), mmap_mode='c')
+                 for part in ['data', 'indices', 'indptr']]
+        return SparseResults(csr_matrix(tuple(parts), shape=tuple(spec['shape'])),
+                             _read_labels(path, name + '.index', spec['index']),
+                             _read_labels(path, name + '.columns', spec['columns']))
+    if kind == 'concordance':
+        from collections import OrderedDict
+        data = OrderedDict()
+        for n, kinds in enumerate(spec['columns']):
+            col, colkind = kinds[0], kinds[1]
+            colname = '%s.%d' % (name, n)
+            if colkind == 'category':
+                categories = _read_values(path, colname + '.categories', kinds[2])
+                data[col] = pd.Categorical.from_codes(np.load(_file(path, colname + '.codes')),
+                                                      categories)
+            else:
+                data[col] = _read_values(path, colname, colkind)
+        df = pd.DataFrame(data, index=_read_labels(path, name + '.index', spec['index']),
+                          columns=[kinds[0] for kinds in spec['columns']])
+        if spec['lazy']:
+            return LazyConcordance(df, context=_read_pickle(path, name + '.context'))
+        return Concordance(df)
+    raise ValueError('Unknown kind of saved data: %s' % kind)
+
+def _write_interrogation(path, prefix, interro):
+    spec = {}
+    for branch in ['results', 'totals', 'query', 'concordance']:
+        spec[branch] = _write_branch(path, prefix + branch, getattr(interro, branch, None))
+    return spec
+
+def save_result(data, path):
+    """
+    Save an `Interrogation`, `Interrodict` or `Concordance` as columns
+
+    :param data: the object to save
+
+    :param path: Directory to save into. It is replaced if it exists.
+    :type path: `str`
+
+    :returns: `str` -- path of the saved result
+    """
+    import os
+    import json
+    from corpkit.interrogation import Concordance, Interrodict
+    from corpkit.process import atomic_path
+
+    with atomic_path(path, directory=True) as tmp:
+        manifest = {'format': FORMAT}
+        if isinstance(data, Interrodict):
+            manifest['class'] = 'Interrodict'
+            # the manifest names the keys; the keys themselves are pickled,
+            # so that numbers, tuples and so on come back as they were
+            manifest['keys'] = [_name(k) for k in data.keys()]
+            _write_pickle(tmp, 'keys', list(data.keys()))
+            manifest['members'] = [_write_interrogation(tmp, '%d.' % n, v)
+                                   for n, v in enumerate(data.values())]
+            manifest['query'] = _write_branch(tmp, 'query', data.query)
+        elif isinstance(data, Concordance):
+            manifest['class'] = 'Concordance'
+            manifest['concordance'] = _write_branch(tmp, 'concordance', data)
+        else:
+            manifest['class'] = 'Interrogation'
+            manifest['branches'] = _write_interrogation(tmp, '', data)
+
+        with open(os.path.join(tmp, MANIFEST), 'w') as fo:
+            json.dump(manifest, fo)
+    return path
+
+def load_result(path):
+    """
+    Load a saved result, reading only its manifest until it is used
+
+    :param path: Directory of the saved result
+    :type path: `str`
+
+    :returns: `SavedInterrogation/Interrodict/Concordance` -- An `Interrodict`
+              holds a `SavedInterrogation` for each key. A `Concordance` is
+              read in full.
+    """
+    import os
+    import json
+    from collections import OrderedDict
+    from corpkit.interrogation import Interrodict, SavedInterrogation
+
+    with open(os.path.join(path, MANIFEST), 'r') as fo:
+        manifest = json.load(fo)
+    if manifest.get('format', 0) > FORMAT:
+        raise ValueError('%s was saved by a newer version of corpkit.' % path)
+    if manifest['class'] == 'Concordance':
+        return _read_branch(path, 'concordance', manifest['concordance'])
+    if manifest['class'] == 'Interrodict':
+        keys = manifest['keys']
+        if os.path.isfile(_file(path, 'keys')):
+            keys = _read_pickle(path, 'keys')
+        members = [(k, SavedInterrogation(path, spec, prefix='%d.' % n))
+                   for n, (k, spec) in enumerate(zip(keys, manifest['members']))]
+        out = Interrodict(OrderedDict(members))
+        out.query = _read_branch(path, 'query', manifest['query'])
+        return out
+    return SavedInterrogation(path, manifest['branches'])
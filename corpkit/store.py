@@ -0,0 +1,218 @@
+"""
+corpkit: binary storage of parsed CONLL files
+
+Parsing CONLL-U text into a DataFrame is the slowest part of most
+interrogations. The functions here save the parsed columns of a file as
+typed arrays in an uncompressed ``.npz`` bundle, so that later reads can
+skip text parsing altogether and load only the columns that are needed.
+"""
+
+from __future__ import print_function
+
+def cache_path(f):
+    """
+    Get the path of the binary cache for a CONLL file
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :returns: `str` -- path inside the cache directory
+    """
+    import os
+    import hashlib
+    from corpkit.constants import CONLL_CACHE_DIR
+    key = hashlib.md5(os.path.abspath(f).encode('utf-8')).hexdigest()
+    return os.path.join(CONLL_CACHE_DIR, key[:2], key + '.npz')
+
+def file_fingerprint(f):
+    """
+    Cheap identity of a file on disk: modification time and size
+    """
+    import os
+    stat = os.stat(f)
+    return float(stat.st_mtime), int(stat.st_size)
+
+def file_hash(f):
+    """
+    md5 of a file's contents, used when mtime changed but size did not
+    """
+    import hashlib
+    md5 = hashlib.md5()
+    with open(f, 'rb') as fo:
+        for chunk in iter(lambda: fo.read(1 << 20), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def _cache_is_valid(npz, f, refresh=None):
+    """
+    Check a loaded cache against the file it was built from
+
+    If only the modification time has changed and the contents are the
+    same, `refresh` is called with the file's new fingerprint, so that the
+    cache can record it and later reads need not hash the file again.
+    """
+    import numpy as np
+    fingerprint = file_fingerprint(f)
+    cached_mtime, cached_size = npz['_fingerprint']
+    if int(cached_size) != fingerprint[1]:
+        return False
+    if float(cached_mtime) == fingerprint[0]:
+        return True
+    # file was touched or copied: fall back to comparing contents
+    if str(npz['_hash']) != file_hash(f):
+        return False
+    if refresh is not None:
+        refresh(np.array(fingerprint, dtype=float))
+    return True
+
+def _write_npz(path, arrays):
+    """
+    Write an npz bundle, moving it into place once it is complete
+    """
+    import numpy as np
+    from corpkit.process import atomic_path
+    with atomic_path(path) as tmp:
+        with open(tmp, 'wb') as fo:
+            np.savez(fo, **arrays)
+
+def write_conll_cache(f, df=None):
+    """
+    Save a parsed CONLL file as typed column arrays plus its metadata
+
+    Text columns are stored as integer codes into a per-column vocabulary,
+    with -1 marking missing values. Numeric columns are stored as they are.
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :param df: The already-parsed file. If not
+               given, the file is parsed here.
+    :type df: `pandas.DataFrame`
+
+    :returns: `str` -- path of the cache file, or None if the file has no tokens
+    """
+    import os
+    import json
+    import numpy as np
+    import pandas as pd
+
+    if df is None:
+        from corpkit.conll import parse_conll
+        df = parse_conll(f, cache=False)
+    if df is None:
+        return
+
+    arrays = {}
+    arrays['_fingerprint'] = np.array(file_fingerprint(f), dtype=float)
+    arrays['_hash'] = np.array(file_hash(f))
+    metadata = {str(k): v for k, v in df._metadata.items()}
+    arrays['_metadata'] = np.array(json.dumps(metadata))
+    arrays['_columns'] = np.array(list(df.columns))
+    arrays['s'] = np.asarray(df.index.get_level_values('s'), dtype=np.int64)
+    arrays['i'] = np.asarray(df.index.get_level_values('i'), dtype=np.int64)
+
+    for col in df.columns:
+        ser = df[col]
+        if pd.api.types.is_numeric_dtype(ser.dtype):
+            arrays[col] = ser.values
+        else:
+            codes, vocab = pd.factorize(ser, sort=False)
+            arrays[col + '.codes'] = codes.astype(np.int32)
+            arrays[col + '.vocab'] = np.array([str(v) for v in vocab])
+
+    path = cache_path(f)
+    _write_npz(path, arrays)
+    return path
+
+def read_conll_cache(f, usecols=None, just_meta=False):
+    """
+    Load a parsed CONLL file from its binary cache
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :param usecols: Column positions, as passed to
+                    `pandas.read_csv` by `corpkit.conll.parse_conll`. Only these
+                    columns are read from disk.
+    :type usecols: `list`
+
+    :param just_meta: Return only the metadata `dict`
+    :type just_meta: `bool`
+
+    :returns: `pandas.DataFrame` -- with ._metadata attribute, or None if there is no
+              valid cache for this file
+    """
+    import os
+    import json
+    import numpy as np
+
+    path = cache_path(f)
+    if not os.path.isfile(path):
+        return
+
+    try:
+        npz = np.load(path)
+    except (IOError, ValueError):
+        return
+
+    refreshed = {}
+    def refresh(fingerprint):
+        # keep every member, so the bundle can be written again once closed
+        refreshed.update((k, npz[k]) for k in npz.files)
+        refreshed['_fingerprint'] = fingerprint
+
+    # members of an npz bundle are only read when accessed
+    with npz:
+        if not _cache_is_valid(npz, f, refresh=refresh):
+            return
+        metadata = json.loads(str(npz['_metadata']))
+        metadata = {int(k): v for k, v in metadata.items()}
+        if not just_meta:
+            df = _read_columns(npz, usecols)
+
+    if refreshed:
+        try:
+            _write_npz(path, refreshed)
+        except (IOError, OSError):
+            pass
+    if just_meta:
+        return metadata
+    df._metadata = metadata
+    return df
+
+def _read_columns(npz, usecols=None):
+    """
+    Build the DataFrame of a file from its open npz bundle
+    """
+    import numpy as np
+    import pandas as pd
+    from corpkit.constants import CONLL_COLUMNS
+
+    columns = [str(c) for c in npz['_columns']]
+    if usecols is not None:
+        names = ['s'] + CONLL_COLUMNS
+        wanted = set(names[n] for n in usecols if n < len(names))
+        columns = [c for c in columns if c in wanted]
+
+    data = {}
+    for col in columns:
+        if col in npz.files:
+            data[col] = npz[col]
+        else:
+            codes = npz[col + '.codes']
+            vocab = npz[col + '.vocab'].astype(object)
+            values = vocab[codes] if len(vocab) else np.empty(len(codes), dtype=object)
+            values[codes == -1] = np.nan
+            data[col] = values
+
+    index = pd.MultiIndex.from_arrays([npz['s'], npz['i']], names=['s', 'i'])
+    return pd.DataFrame(data, index=index, columns=columns)
+
+def delete_conll_cache(f):
+    """
+    Remove the binary cache for a CONLL file, if there is one
+    """
+    import os
+    path = cache_path(f)
+    if os.path.isfile(path):
+        os.remove(path)
@@ -0,0 +1,435 @@
+"""
+corpkit: tgrep queries over flattened trees
+
+Matches tgrep2 patterns, as understood by :mod:`nltk.tgrep`, against a
+:class:`corpkit.treestore.TreeStore` without building any tree objects. A
+query is parsed once, and each part of it is then worked out for every node
+of a file at once, as a boolean array: node labels are matched against the
+label vocabulary, and relations become operations on the parent, end and
+leaf span arrays.
+
+Node labels (``__``, literals, ``"strings"``, ``/regexes/``, their ``i@``
+forms and ``|`` alternatives), parentheses, negation, ``&``, ``|`` and ``[...]``, and
+the operators of :mod:`nltk.tgrep` except ``<<:`` and ``>>:`` are handled.
+Queries using anything else (node names, macros, segmented patterns) raise
+`ValueError`, so that they can be passed to :mod:`nltk.tgrep` instead.
+"""
+
+from __future__ import print_function
+
+import re
+
+_TOKENS = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<regex>(?:i@)?/(?:[^/\\\n\r]|\\.)*/)
+  | (?P<quoted>(?:i@)?"(?:[^"\\\n\r]|\\.)*")
+  | (?P<op>[$%,.<>][%,.<>0-9\-':]*)
+  | (?P<punct>[][()!&|])
+  | (?P<word>[^][ \r\t\n;:.,&|<>()$!@%'^="/]+)
+  | (?P<other>.)
+''', re.X)
+
+# spellings that mean the same relation
+_SYNONYMS = {'<1': '<,', '>1': '>,', "<'": '<-', '<-1': '<-', ">'": '>-', '>-1': '>-',
+             '<<1': '<<,', "<<'": '<<-', ">>'": '>>-', '%': '$', '%.': '$.',
+             '%,': '$,', '%..': '$..', '%,,': '$,,'}
+
+_OPERATORS = ['<', '>', '<,', '>,', '<-', '>-', '<:', '>:', '<<', '>>', '<<,', '>>,',
+              '<<-', '>>-', '.', ',', '..', ',,', '$', '$.', '$,', '$..', '$,,']
+
+_compiled = {}
+
+def tokenise(query):
+    """
+    Split a tgrep query into tokens
+
+    :param query: tgrep query
+    :type query: `str`
+
+    :returns: `list` -- of `(kind, text)` tuples
+    """
+    tokens = []
+    for match in _TOKENS.finditer(query):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        if kind == 'other':
+            raise ValueError('Unsupported tgrep syntax: %s' % match.group())
+        tokens.append((kind, match.group()))
+    return tokens
+
+def compile_tree_query(query):
+    """
+    Parse a tgrep query, reusing earlier parses of the same query
+
+    :param query: tgrep query
+    :type query: `str`
+
+    :returns: `TreeQuery`
+
+    :raises ValueError: if the query uses syntax not handled here
+    """
+    if query not in _compiled:
+        _compiled[query] = TreeQuery(query)
+    return _compiled[query]
+
+def tree_search(store, query, sents=None):
+    """
+    Find the nodes matching a tgrep query in a file's trees
+
+    :param store: The file's trees
+    :type store: `TreeStore`
+
+    :param query: tgrep query
+    :type query: `str`
+
+    :param sents: Only search these sentence ids
+    :type sents: `iterable`
+
+    :returns: `list` -- `(sentence, first_leaf, last_leaf, node)` tuples
+    """
+    return compile_tree_query(query).matches(store, sents=sents)
+
+class TreeQuery(object):
+    """
+    A parsed tgrep query
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.tokens = tokenise(query)
+        self.pos = 0
+        self.tree = self.node_expr()
+        if self.pos != len(self.tokens):
+            raise ValueError('Could not parse tgrep query: %s' % query)
+        del self.tokens
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.query)
+
+    # parsing, into nested tuples
+
+    def peek(self, offset=0):
+        if self.pos + offset < len(self.tokens):
+            return self.tokens[self.pos + offset]
+        return (None, None)
+
+    def take(self, text=None):
+        kind, got = self.peek()
+        if got is None or (text is not None and got != text):
+            raise ValueError('Could not parse tgrep query: %s' % self.query)
+        self.pos += 1
+        return kind, got
+
+    def node_expr(self):
+        """
+        A node description followed by any relations
+        """
+        node = self.node()
+        relations = self.relations()
+        return node if relations is None else ('and', node, relations)
+
+    def node(self):
+        if self.peek()[1] == '(':
+            self.take('(')
+            node = self.node_expr()
+            self.take(')')
+            return node
+        node = self.label()
+        # NP|VP, but not NP < DT | < JJ
+        while self.peek()[1] == '|' and self.peek(1)[0] in ['word', 'regex', 'quoted']:
+            self.take('|')
+            node = ('or', node, self.label())
+        return node
+
+    def label(self):
+        kind, text = self.take()
+        if kind not in ['word', 'regex', 'quoted']:
+            raise ValueError('Could not parse tgrep query: %s' % self.query)
+        icase = text.startswith('i@')
+        if icase:
+            text = text[2:].lower()
+        if kind == 'word' and text in ['__', '*']:
+            return ('any',)
+        if kind == 'quoted':
+            text = text[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+        elif kind == 'regex':
+            return ('regex', text[1:-1], icase)
+        return ('literal', text, icase)
+
+    def relations(self):
+        """
+        Relations joined by `|`, which binds more loosely than `&`
+        """
+        left = self.conjunction()
+        if left is None:
+            return
+        if self.peek()[1] == '|':
+            self.take('|')
+            right = self.relations()
+            if right is None:
+                raise ValueError('Could not parse tgrep query: %s' % self.query)
+            return ('or', left, right)
+        return left
+
+    def conjunction(self):
+        out = None
+        while True:
+            start = self.pos
+            if self.peek()[1] == '&' and out is not None:
+                self.take('&')
+            rel = self.relation()
+            if rel is None:
+                self.pos = start
+                return out
+            out = rel if out is None else ('and', out, rel)
+
+    def relation(self):
+        kind, text = self.peek()
+        if text == '!':
+            self.take('!')
+            rel = self.relation()
+            if rel is None:
+                raise ValueError('Could not parse tgrep query: %s' % self.query)
+            return ('not', rel)
+        if text == '[':
+            self.take('[')
+            rel = self.relations()
+            self.take(']')
+            return rel
+        if kind == 'op':
+            self.take()
+            op = _SYNONYMS.get(text, text)
+            nth = re.match(r'^([<>])(-?)(\d+)$', op)
+            if nth:
+                return ('nth', nth.group(1), int(nth.group(2) + nth.group(3)), self.node())
+            if op not in _OPERATORS:
+                raise ValueError('Unsupported tgrep operator: %s' % text)
+            return ('rel', op, self.node())
+        return
+
+    # matching, as boolean arrays over every node of a file
+
+    def matches(self, store, sents=None):
+        """
+        Find the matching nodes. Leaves are never returned.
+
+        :param store: The file's trees
+        :type store: `TreeStore`
+
+        :param sents: Only search these sentence ids
+        :type sents: `iterable`
+
+        :returns: `list` -- `(sentence, first_leaf, last_leaf, node)` tuples, in
+                  sentence and then tree order
+        """
+        import numpy as np
+        mask = self.evaluate(self.tree, store) & ~np.asarray(store.leaf)
+        if sents is not None:
+            sent_ids = store.bounds[:, 0][store.sentence]
+            mask &= np.isin(sent_ids, np.array(list(sents), dtype=np.int64))
+        nodes = np.flatnonzero(mask)
+        sent_ids = store.bounds[:, 0][store.sentence[nodes]]
+        return list(zip(sent_ids.tolist(),
+                        store.first[nodes].tolist(),
+                        store.last[nodes].tolist(),
+                        nodes.tolist()))
+
+    def evaluate(self, part, store):
+        import numpy as np
+        kind = part[0]
+        if kind == 'any':
+            return np.ones(len(store.label), dtype=bool)
+        if kind in ['literal', 'regex']:
+            return _label_mask(store, *part)
+        if kind == 'and':
+            return self.evaluate(part[1], store) & self.evaluate(part[2], store)
+        if kind == 'or':
+            return self.evaluate(part[1], store) | self.evaluate(part[2], store)
+        if kind == 'not':
+            return ~self.evaluate(part[1], store)
+        target = self.evaluate(part[-1], store)
+        if kind == 'nth':
+            out = _nth_child(store, part[1], part[2], target)
+        else:
+            out = _relation(store, part[1], target)
+        # as in nltk.tgrep, words are not related to anything
+        return out & ~np.asarray(store.leaf)
+
+def _label_mask(store, kind, text, icase=False):
+    """
+    Nodes whose label, or word for leaves, matches a literal or a regex
+    """
+    import numpy as np
+    labels = [str(l) for l in store.labels]
+    if icase:
+        labels = [l.lower() for l in labels]
+    if kind == 'regex':
+        regex = re.compile(text)
+        hits = [bool(regex.search(l)) for l in labels]
+    else:
+        hits = [l == text for l in labels]
+    if not hits:
+        return np.zeros(len(store.label), dtype=bool)
+    return np.array(hits, dtype=bool)[store.label]
+
+def _climb(store, nodes, keep=None):
+    """
+    Ancestors of `nodes`, going up while `keep(child, parent)` holds
+
+    :returns: `numpy.ndarray` -- boolean, True for each ancestor reached
+    """
+    import numpy as np
+    parent = np.asarray(store.parent)
+    out = np.zeros(len(parent), dtype=bool)
+    cur = nodes
+    while len(cur):
+        up = parent[cur]
+        ok = up >= 0
+        if keep is not None:
+            ok[ok] = keep(cur[ok], up[ok])
+        cur = np.unique(up[ok])
+        cur = cur[~out[cur]]
+        out[cur] = True
+    return out
+
+def _up_chain(store, nodes, keep):
+    """
+    Follow each node up through its ancestors while `keep(child, parent)`
+    holds, returning the highest node reached from each
+    """
+    import numpy as np
+    parent = np.asarray(store.parent)
+    top = np.array(nodes, dtype=np.int64)
+    moving = np.ones(len(top), dtype=bool)
+    while moving.any():
+        up = parent[top[moving]]
+        ok = up >= 0
+        ok[ok] = keep(top[moving][ok], up[ok])
+        idx = np.flatnonzero(moving)
+        top[idx[ok]] = up[ok]
+        moving[idx[~ok]] = False
+    return top
+
+def _nth_child(store, direction, n, target):
+    """
+    `A <N B` and `A >N B`, counting from the end when N is negative
+    """
+    import numpy as np
+    parent = np.asarray(store.parent)
+    has_parent = parent >= 0
+    safe = np.where(has_parent, parent, 0)
+    rank = store.child_rank
+    if n < 0:
+        rank = np.where(has_parent, store.child_count[safe] - rank + 1, 0)
+        n = -n
+    is_nth = has_parent & (rank == n)
+    if direction == '>':
+        return is_nth & target[safe]
+    out = np.zeros(len(parent), dtype=bool)
+    out[parent[is_nth & target]] = True
+    return out
+
+def _relation(store, op, target):
+    """
+    Nodes standing in relation `op` to some node in `target`
+    """
+    import numpy as np
+    parent = np.asarray(store.parent)
+    end = np.asarray(store.end)
+    size = len(parent)
+    index = np.arange(size)
+    has_parent = parent >= 0
+    safe = np.where(has_parent, parent, 0)
+    is_first = has_parent & (index == safe + 1)
+    is_last = has_parent & (end == end[safe])
+    only = has_parent & (store.child_count[safe] == 1)
+    targets = np.flatnonzero(target)
+    out = np.zeros(size, dtype=bool)
+
+    # parents and children
+    if op in ['<', '<,', '<-', '<:']:
+        kids = target & has_parent
+        kids &= {'<': has_parent, '<,': is_first, '<-': is_last, '<:': only}[op]
+        out[parent[kids]] = True
+        return out
+    if op in ['>', '>,', '>-', '>:']:
+        kind = {'>': has_parent, '>,': is_first, '>-': is_last, '>:': only}[op]
+        return kind & target[safe]
+
+    # ancestors and descendants
+    if op == '<<':
+        return _climb(store, targets)
+    if op == '<<,':
+        return _climb(store, targets, lambda c, p: c == p + 1)
+    if op == '<<-':
+        return _climb(store, targets, lambda c, p: end[c] == end[p])
+    if op in ['>>', '>>,', '>>-']:
+        keep = {'>>': None,
+                '>>,': lambda c, p: c == p + 1,
+                '>>-': lambda c, p: end[c] == end[p]}[op]
+        cur = index.copy()
+        alive = np.ones(size, dtype=bool)
+        while alive.any():
+            up = np.where(alive, parent[cur], -1)
+            alive = up >= 0
+            if keep is not None:
+                alive[alive] = keep(cur[alive], up[alive])
+            cur = np.where(alive, up, 0)
+            out |= alive & target[cur]
+        return out
+
+    # sisters
+    if op == '$':
+        kids = target & has_parent
+        count = np.bincount(parent[kids], minlength=size)
+        return has_parent & (count[safe] - kids > 0)
+    if op in ['$.', '$,']:
+        # the sister after a node starts where the node ends
+        after = has_parent & (end < end[safe])
+        if op == '$.':
+            return after & target[np.where(after, end, 0)]
+        out[end[after & target]] = True
+        return out
+    if op in ['$..', '$,,']:
+        kids = np.flatnonzero(target & has_parent)
+        if op == '$..':
+            bound = np.full(size, -1)
+            np.maximum.at(bound, parent[kids], kids)
+            return has_parent & (bound[safe] > index)
+        bound = np.full(size, size)
+        np.minimum.at(bound, parent[kids], kids)
+        return has_parent & (bound[safe] < index)
+
+    # order of nodes in the sentence
+    row = store.sentence
+    rows = len(store.bounds)
+    if op == '..':
+        # some target starts after this node's subtree
+        bound = np.full(rows, -1)
+        np.maximum.at(bound, row[targets], targets)
+        return bound[row] >= end
+    if op == ',,':
+        # some target's subtree ends before this node
+        bound = np.full(rows, size + 1)
+        np.minimum.at(bound, row[targets], end[targets])
+        return bound[row] <= index
+    if op == '.':
+        # the next node after this subtree, and its leftmost descendants
+        reach = np.zeros(size + 1, dtype=bool)
+        reach[targets] = True
+        reach[:size] |= _climb(store, targets, lambda c, p: c == p + 1)
+        nxt = np.where(end < store.sentence_end, end, size)
+        return reach[nxt]
+    if op == ',':
+        # the sister before the lowest node that is not a first child,
+        # and its rightmost descendants
+        reach = np.zeros(size + 1, dtype=bool)
+        reach[targets] = True
+        reach[:size] |= _climb(store, targets, lambda c, p: end[c] == end[p])
+        low = _up_chain(store, index, lambda c, p: c == p + 1)
+        prev = np.full(size, size)
+        sisters = has_parent & (end < end[safe])
+        prev[end[sisters]] = np.flatnonzero(sisters)
+        return reach[prev[low]]
+    raise ValueError('Unsupported tgrep operator: %s' % op)
@@ -0,0 +1,390 @@
+"""
+corpkit: compact storage of constituency trees
+
+Reading bracketed ``# parse=`` strings into NLTK trees costs more than most
+tree searches. The functions here flatten the trees of a CONLL file once,
+into arrays of node labels, parent pointers and leaf spans, and save them
+as ``.npy`` files that are memory-mapped when the file is searched again.
+Stores are only saved by :func:`~corpkit.corpus.Corpus.build_cache`, or
+when interrogating with ``cache=True``; otherwise the arrays are built in
+memory for each search.
+
+Nodes of each sentence are stored in preorder, so that the descendants of
+a node are the nodes between it and its `end`. Leaves (the words) are nodes
+too, and `first` and `last` give the 1-based positions of the first and
+last leaf under each node, which match the token ids of the CONLL file.
+"""
+
+from __future__ import print_function
+
+from corpkit.lazyprop import lazyprop
+
+_FIELDS = ['label', 'parent', 'end', 'first', 'last', 'leaf']
+
+def tree_store_path(f):
+    """
+    Get the directory holding the tree store of a CONLL file
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :returns: `str` -- path inside the tree store directory
+    """
+    import os
+    import hashlib
+    from corpkit.constants import TREE_STORE_DIR
+    key = hashlib.md5(os.path.abspath(f).encode('utf-8')).hexdigest()
+    return os.path.join(TREE_STORE_DIR, key[:2], key)
+
+def build_tree_arrays(metadata):
+    """
+    Flatten the parse trees of a file
+
+    :param metadata: sentence id: sentence metadata, with a `parse` key
+    :type metadata: `dict`
+
+    :returns: `dict` -- name: `numpy.ndarray`. `sents` has a row of sentence id, first
+              node and end node for each sentence; `labels` is the vocabulary
+              that node labels index into.
+    """
+    import numpy as np
+    from nltk import Tree
+
+    vocab = {}
+    columns = {k: [] for k in _FIELDS}
+    sents = []
+
+    def add(node, parent, position):
+        """
+        Add a node and its descendants, returning the position of the last leaf
+        """
+        ix = len(columns['label'])
+        is_leaf = not isinstance(node, Tree)
+        text = node if is_leaf else node.label()
+        columns['label'].append(vocab.setdefault(text, len(vocab)))
+        columns['parent'].append(parent)
+        columns['leaf'].append(is_leaf)
+        columns['first'].append(position + 1)
+        columns['end'].append(0)
+        columns['last'].append(0)
+        if is_leaf:
+            position += 1
+        else:
+            for child in node:
+                position = add(child, ix, position)
+        columns['end'][ix] = len(columns['label'])
+        columns['last'][ix] = position
+        return position
+
+    for sent_id in sorted(metadata):
+        parse = metadata[sent_id].get('parse')
+        if not parse:
+            continue
+        try:
+            tree = Tree.fromstring(parse)
+        except ValueError:
+            continue
+        start = len(columns['label'])
+        add(tree, -1, 0)
+        sents.append((sent_id, start, len(columns['label'])))
+
+    arrays = {k: np.array(v, dtype=np.int32) for k, v in columns.items()}
+    arrays['leaf'] = arrays['leaf'].astype(bool)
+    arrays['sents'] = np.array(sents, dtype=np.int64).reshape(-1, 3)
+    labels = sorted(vocab, key=vocab.get)
+    arrays['labels'] = np.array(labels) if labels else np.array([], dtype='U1')
+    return arrays
+
+def write_tree_store(f, metadata=None):
+    """
+    Flatten and save the trees of a CONLL file
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :param metadata: The file's sentence metadata, if already
+                     read
+    :type metadata: `dict`
+
+    :returns: `str` -- path of the store, or None if the file has no trees
+    """
+    import os
+    import numpy as np
+    from corpkit.store import file_fingerprint, file_hash
+    from corpkit.process import atomic_path
+
+    if metadata is None:
+        from corpkit.conll import parse_conll
+        metadata = parse_conll(f, just_meta=True)
+    if not metadata:
+        return
+
+    arrays = build_tree_arrays(metadata)
+    if not len(arrays['sents']):
+        return
+    arrays['_fingerprint'] = np.array(file_fingerprint(f), dtype=float)
+    arrays['_hash'] = np.array(file_hash(f))
+
+    path = tree_store_path(f)
+    with atomic_path(path, directory=True) as tmp:
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, name + '.npy'), arr)
+    return path
+
+def read_tree_store(f):
+    """
+    Memory-map the tree store of a CONLL file
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :returns: `TreeStore` -- or None if there is no valid store for this file
+    """
+    import os
+    import numpy as np
+    from corpkit.store import _cache_is_valid
+    from corpkit.process import atomic_path
+
+    path = tree_store_path(f)
+    if not os.path.isdir(path):
+        return
+    arrays = {}
+    try:
+        for name in _FIELDS + ['sents', 'labels', '_fingerprint', '_hash']:
+            arrays[name] = np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+    except (IOError, ValueError):
+        return
+    def refresh(fingerprint):
+        try:
+            with atomic_path(os.path.join(path, '_fingerprint.npy')) as tmp:
+                with open(tmp, 'wb') as fo:
+                    np.save(fo, fingerprint)
+        except (IOError, OSError):
+            pass
+
+    if not _cache_is_valid(arrays, f, refresh=refresh):
+        return
+    return TreeStore(arrays)
+
+def load_tree_store(f, metadata=None, cache=None):
+    """
+    Get the tree store of a CONLL file. Without a valid saved store, the
+    trees are flattened in memory, and only saved if `cache` is True.
+
+    :param f: Filepath of CONLL file
+    :type f: `str`
+
+    :param metadata: The file's sentence metadata, if already read. Must
+                     cover every sentence in the file if the store is saved.
+    :type metadata: `dict`
+
+    :param cache: If None, use a saved store when there is a valid one. If
+                  True, also save one when there isn't. If False, ignore
+                  saved stores.
+    :type cache: `bool`
+
+    :returns: `TreeStore` -- or None if the file has no trees
+    """
+    if cache is not False:
+        store = read_tree_store(f)
+        if store is not None:
+            return store
+    if cache:
+        if write_tree_store(f, metadata=metadata):
+            return read_tree_store(f)
+        return
+    if metadata is None:
+        from corpkit.conll import parse_conll
+        metadata = parse_conll(f, just_meta=True)
+    if not metadata:
+        return
+    arrays = build_tree_arrays(metadata)
+    if not len(arrays['sents']):
+        return
+    return TreeStore(arrays)
+
+def delete_tree_store(f):
+    """
+    Remove the tree store of a CONLL file, if there is one
+    """
+    import os
+    import shutil
+    path = tree_store_path(f)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+class TreeStore(object):
+    """
+    The flattened trees of one file
+    """
+
+    def __init__(self, arrays):
+        for name in _FIELDS + ['labels']:
+            setattr(self, name, arrays[name])
+        self.bounds = arrays['sents']
+        self.sents = {int(s): (int(a), int(b)) for s, a, b in self.bounds}
+        self._tokens = {}
+
+    def __contains__(self, sent_id):
+        return sent_id in self.sents
+
+    def __len__(self):
+        return len(self.sents)
+
+    def root(self, sent_id):
+        """
+        Get the root node of a sentence
+        """
+        return StoredNode(self, self.sents[sent_id][0], sent_id)
+
+    def node(self, index, sent_id):
+        """
+        Get a node by its index
+        """
+        return StoredNode(self, index, sent_id)
+
+    @lazyprop
+    def sentence(self):
+        """
+        Row of `bounds` that each node belongs to
+        """
+        import numpy as np
+        sizes = self.bounds[:, 2] - self.bounds[:, 1]
+        return np.repeat(np.arange(len(sizes)), sizes)
+
+    @lazyprop
+    def sentence_end(self):
+        """
+        End of the sentence that each node belongs to
+        """
+        return self.bounds[:, 2][self.sentence]
+
+    @lazyprop
+    def child_count(self):
+        """
+        Number of children of each node
+        """
+        import numpy as np
+        parents = self.parent[self.parent >= 0]
+        return np.bincount(parents, minlength=len(self.label))
+
+    @lazyprop
+    def child_rank(self):
+        """
+        Position of each node among its sisters, from 1, or 0 for roots
+        """
+        import numpy as np
+        rank = np.zeros(len(self.label), dtype=np.int64)
+        kids = np.flatnonzero(self.parent >= 0)
+        # nodes are in preorder, so sisters are in order within each parent
+        order = kids[np.argsort(self.parent[kids], kind='stable')]
+        parents = self.parent[order]
+        starts = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        rank[order] = np.arange(len(order)) - group_start + 1
+        return rank
+
+    def tokens(self, sent_id):
+        """
+        Words and POS tags of a sentence, as `(word, tag)` tuples
+        """
+        if sent_id not in self._tokens:
+            start, end = self.sents[sent_id]
+            self._tokens[sent_id] = [(self.text(i), self.text(self.parent[i]))
+                                     for i in self.leaf_nodes(start, end)]
+        return self._tokens[sent_id]
+
+    def text(self, ix):
+        """
+        The label of a node, or the word of a leaf
+        """
+        return str(self.labels[self.label[ix]])
+
+    def leaf_nodes(self, start, end):
+        """
+        Indices of the leaves among nodes `start` to `end`
+        """
+        import numpy as np
+        return np.flatnonzero(self.leaf[start:end]) + start
+
+    def tree(self, sent_id, parented=False):
+        """
+        Rebuild an NLTK tree from the arrays, without parsing text
+
+        :param sent_id: Sentence id
+        :type sent_id: `int`
+
+        :param parented: Make a `ParentedTree`
+        :type parented: `bool`
+
+        :returns: `tuple` -- the tree, and a `dict` from the id of each subtree to its
+                  node index
+        """
+        from nltk.tree import Tree, ParentedTree
+        cls = ParentedTree if parented else Tree
+        nodes = {}
+
+        def build(ix):
+            if self.leaf[ix]:
+                return self.text(ix)
+            children = []
+            child = ix + 1
+            while child < self.end[ix]:
+                children.append(build(child))
+                child = int(self.end[child])
+            subtree = cls(self.text(ix), children)
+            nodes[id(subtree)] = ix
+            return subtree
+
+        return build(self.sents[sent_id][0]), nodes
+
+class StoredNode(object):
+    """
+    A node of a :class:`TreeStore`, with the bits of the NLTK `Tree`
+    interface that concordancing needs
+    """
+
+    def __init__(self, store, index, sent_id):
+        self.store = store
+        self.index = index
+        self.sent_id = sent_id
+
+    @property
+    def span(self):
+        """
+        Positions of the first and last leaf under this node
+        """
+        return int(self.store.first[self.index]), int(self.store.last[self.index])
+
+    def label(self):
+        return self.store.text(self.index)
+
+    def root(self):
+        return self.store.root(self.sent_id)
+
+    def leaves(self):
+        return [w for w, p in self.pos()]
+
+    def pos(self):
+        # the leaves under a node are a slice of the sentence
+        first, last = self.span
+        return self.store.tokens(self.sent_id)[first - 1:last]
+
+    def __str__(self):
+        store = self.store
+        out = []
+        closes = []
+        for ix in range(self.index, store.end[self.index]):
+            while closes and closes[-1] <= ix:
+                out.append(')')
+                closes.pop()
+            if store.leaf[ix]:
+                out.append(' ' + store.text(ix))
+            else:
+                out.append('%s(%s' % (' ' if out else '', store.text(ix)))
+                closes.append(store.end[ix])
+        out.append(')' * len(closes))
+        return ''.join(out)
+
+    def __repr__(self):
+        return "<%s: %s>" % (self.__class__.__name__, self.label())
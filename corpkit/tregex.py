@@ -0,0 +1,176 @@
+"""
+corpkit: a long-lived Tregex process
+
+Starting the JVM costs more than most Tregex queries. Rather than run
+``tregex.sh`` for each query, a small Java server (``TregexServer.java``,
+shipped compiled in ``tregex-server.jar``) is kept running, and command
+lines and trees are sent to it over stdin/stdout. It answers with what
+``tregex.sh`` would have printed. Each Python process, including those
+started for multiprocessing, gets its own worker when it first needs one,
+and keeps it until it exits.
+"""
+
+from __future__ import print_function
+
+# markers of the line protocol, shared with TregexServer.java
+END = '__CORPKIT_END__'
+STDERR = '__CORPKIT_STDERR__'
+BATCH = '__CORPKIT_BATCH__'
+
+# options of tregex.sh that TregexServer understands
+OPTIONS = set(['-C', '-T', '-f', '-filter', '-n', '-o', '-s', '-t', '-u', '-w', '-x'])
+
+_worker = None
+# set when java is missing, so we only try once
+_unavailable = False
+_registered = False
+
+class TregexWorkerError(IOError):
+    """The Tregex worker died or could not be started"""
+    pass
+
+class TregexWorker(object):
+    """
+    A running TregexServer, taking the same arguments as ``tregex.sh``
+    """
+
+    def __init__(self, classpath, memory=None):
+        import os
+        from subprocess import Popen, PIPE
+        from corpkit.constants import TREGEX_WORKER_MEMORY
+        memory = memory or TREGEX_WORKER_MEMORY
+        self.pid = os.getpid()
+        self.devnull = open(os.devnull, 'w')
+        self.proc = Popen(['java', '-Xmx%s' % memory, '-cp', classpath, 'TregexServer'],
+                          stdin=PIPE, stdout=PIPE, stderr=self.devnull)
+
+    @property
+    def alive(self):
+        return self.proc.poll() is None
+
+    @staticmethod
+    def supports(args):
+        """
+        Check that the worker understands a ``tregex.sh`` command line
+        """
+        for n, arg in enumerate(args):
+            if arg == '-h' or (n and args[n - 1] == '-h'):
+                continue
+            if arg.startswith('-') and len(arg) > 1 and arg not in OPTIONS:
+                return False
+        return True
+
+    def run(self, args, trees=None):
+        """
+        Run a Tregex command line
+
+        :param args: Arguments for ``tregex.sh``: options, query, path
+        :type args: `list`
+        :param trees: Bracketed trees to search, when using `-filter`
+        :type trees: `str`
+        :returns: `tuple` -- lines of stdout, lines of stderr
+        """
+        line = '\t'.join(a.replace('\t', ' ').replace('\n', ' ') for a in args)
+        request = line + '\n'
+        if trees:
+            request += trees.rstrip('\n') + '\n'
+        request += END + '\n'
+        try:
+            self.proc.stdin.write(request.encode('utf-8', errors='ignore'))
+            self.proc.stdin.flush()
+            out, err = [], []
+            current = out
+            while True:
+                got = self.proc.stdout.readline()
+                if not got:
+                    raise TregexWorkerError('Tregex worker stopped')
+                got = got.decode('utf-8').rstrip('\n')
+                if got == END:
+                    break
+                if got == STDERR and current is out:
+                    current = err
+                    continue
+                current.append(got)
+        except (IOError, OSError, ValueError) as error:
+            self.close()
+            raise TregexWorkerError(str(error))
+        return out, err
+
+    def batch(self, queries, trees):
+        """
+        Search trees with several patterns, reading each tree once
+
+        :param queries: Names and Tregex patterns
+        :type queries: `dict`
+        :param trees: Bracketed trees
+        :type trees: `str`
+        :returns: `dict` -- name: words of each matching node, one match
+                  per node as with Tregex's `-o`
+        """
+        args = [BATCH]
+        for name, query in sorted(queries.items()):
+            args += [name, getattr(query, 'pattern', query)]
+        out, err = self.run(args, trees=trees)
+        # nothing is written to stderr unless something went wrong
+        if err:
+            raise TregexWorkerError('\n'.join(err))
+        matches = {name: [] for name in queries}
+        for line in out:
+            name, words = line.split('\t', 1)
+            matches[name].append(words)
+        return matches
+
+    def close(self):
+        """
+        Stop the JVM
+        """
+        try:
+            self.proc.stdin.close()
+        except (IOError, OSError, ValueError):
+            pass
+        if self.alive:
+            self.proc.terminate()
+        self.proc.wait()
+        self.devnull.close()
+
+def tregex_worker():
+    """
+    Get this process's Tregex worker, starting it if need be
+
+    :returns: :class:`corpkit.tregex.TregexWorker`, or None if the worker
+              is turned off or can't be started
+    """
+    import os
+    import atexit
+    from corpkit.constants import TREGEX_WORKER
+    global _worker, _unavailable, _registered
+    if not TREGEX_WORKER or _unavailable:
+        return
+    # a forked process can't share its parent's pipes
+    if _worker is not None and _worker.pid == os.getpid() and _worker.alive:
+        return _worker
+    here = os.path.dirname(os.path.abspath(__file__))
+    jars = [os.path.join(here, 'stanford-tregex.jar'), os.path.join(here, 'tregex-server.jar')]
+    if not all(os.path.isfile(jar) for jar in jars):
+        _unavailable = True
+        return
+    try:
+        _worker = TregexWorker(os.pathsep.join(jars))
+    except OSError:
+        _worker = None
+        _unavailable = True
+        return
+    if not _registered:
+        atexit.register(close_worker)
+        _registered = True
+    return _worker
+
+def close_worker():
+    """
+    Stop this process's Tregex worker, if it is running
+    """
+    import os
+    global _worker
+    if _worker is not None and _worker.pid == os.getpid():
+        _worker.close()
+    _worker = None
@@ -45,7 +45,7 @@ setup(name='corpkit',
       scripts=['corpkit/new_project', 'corpkit/parse',
                'corpkit/corpkit', 'corpkit/corpkit.1'],
       package_dir={'corpkit': 'corpkit'},
-      package_data={'corpkit': ['*.jar', 'corpkit/*.jar', '*.sh', 'corpkit/*.sh', 
+      package_data={'corpkit': ['*.jar', 'corpkit/*.jar', '*.sh', 'corpkit/*.sh', '*.java',
                                 '*.ipynb', 'corpkit/*.ipynb', '*.p', 'dictionaries/*.p',
                                 '*.py', 'dictionaries/*.py']},
       author_email='mcdonaldd@unimelb.edu.au',